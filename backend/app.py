@@ -8,40 +8,103 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+from typing import List, Optional
 import asyncio
+import functools
+import json
+import time
 from contextlib import asynccontextmanager
 
+# Before anything imports transformers: it reads HF_HUB_OFFLINE/TRANSFORMERS_OFFLINE at import time
+from models.model_snapshot import enforce_offline_if_staged
+enforce_offline_if_staged()
+
 # Global variables for faster access
 mental_classifier = None
 recommendation_engine = None
+content_loader = None
+model_loader = None
+keyword_classifier = None
+session_manager = None
+usage_limits = None
+risk_refiner = None
+priority_executor = None
+latency = None
+
+# Deferred risk: answer on heuristic + classifier, refine SAFE/LOW with the LLM in the background
+DEFER_LLM_RISK = os.environ.get("HEALWISE_DEFER_LLM_RISK", "").lower() in ("1", "true", "yes")
+
+# Crisis fast lane: p99 target for crisis-keyword requests, reported by /metrics
+CRISIS_P99_MS = float(os.environ.get("HEALWISE_CRISIS_P99_MS", "500"))
+
+def _load_mental_classifier():
+    """Build the roberta classifier; runs on the ModelLoader background thread"""
+    from models.mental_classifier import MentalClassifier
+    return MentalClassifier()
+
+def _on_model_ready(loader):
+    global mental_classifier
+    mental_classifier = loader.classifier
+
+def _on_model_failed(loader):
+    global mental_classifier
+    mental_classifier = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup - load model once
-    global mental_classifier, recommendation_engine
+    # Startup - serve keyword fallback at once, load the model in the background
+    global mental_classifier, recommendation_engine, content_loader, model_loader, keyword_classifier
     print("🚀 Initializing HealWise recommendation services...")
     try:
-        from models.mental_classifier import MentalClassifier
+        from models.keyword_classifier import KeywordClassifier
+        from services.model_loader import ModelLoader
+
+        keyword_classifier = KeywordClassifier()
+        model_loader = ModelLoader(_load_mental_classifier, on_ready=_on_model_ready, on_failed=_on_model_failed)
+        model_loader.start()
+    except Exception as e:
+        print(f"⚠️ Model loader failed to start: {e}")
+        model_loader = None
+
+    try:
         from services.content_loader import ContentLoader
         from services.recommendation_engine import RecommendationEngine
         
-        mental_classifier = MentalClassifier()
         content_loader = ContentLoader()
+        # Hot reload backend/data/*.json edits without restarting (and reloading the model)
+        content_loader.start_watching(float(os.environ.get("HEALWISE_CONTENT_WATCH_SECONDS", "2.0")))
         recommendation_engine = RecommendationEngine(content_loader)
         print("✅ Recommendation services initialized successfully")
     except Exception as e:
-        print(f"⚠️ Model loading failed: {e}")
-        mental_classifier = None
+        print(f"⚠️ Recommendation services failed: {e}")
+        content_loader = None
         recommendation_engine = None
+
+    # Periodic batch sweep of working-session limits (checks themselves are O(1) per request)
+    _get_usage_limits().start_sweeping(
+        float(os.environ.get("HEALWISE_USAGE_SWEEP_SECONDS", "60")),
+        on_over_limit=lambda users: print(f"⏸️ {len(users)} user(s) reached the working-session limit"),
+    )
+
+    # While Ollama's circuit is open, a cheap health probe detects recovery
+    from safety.assessor import get_ollama_breaker
+    get_ollama_breaker().start_probing(float(os.environ.get("HEALWISE_LLM_PROBE_SECONDS", "5")))
     
     yield
     
     # Shutdown
     print("🔄 Shutting down HealWise...")
+    if content_loader:
+        content_loader.stop_watching()
+    if usage_limits:
+        usage_limits.stop_sweeping()
+    if priority_executor:
+        priority_executor.shutdown(wait=False)
+    get_ollama_breaker().stop_probing()
 
 app = FastAPI(
     title="HealWise API",
@@ -75,6 +138,7 @@ app.add_middleware(
 
 class AnalyzeRequest(BaseModel):
     text: str
+    user_preferences: Optional[dict] = None  # e.g. {"exclude_genres": ["drama"], "dietary_restrictions": ["vegan"]}
 
 class AnalyzeResponse(BaseModel):
     probs: dict
@@ -83,37 +147,329 @@ class AnalyzeResponse(BaseModel):
     suggested_next_steps: list
     helpful_resources: list
     recommendations: dict  # New field for comprehensive recommendations
+    risk_provisional: bool = False  # True when the LLM refinement is still pending (deferred risk)
+    refinement_id: Optional[str] = None  # Follow with GET /analyze/refinements/{refinement_id} (SSE)
+    llm_skipped: bool = False  # True when the LLM was saturated or down and the heuristic risk answered alone
+
+class BatchAnalyzeRequest(BaseModel):
+    texts: List[str]
+
+MAX_BATCH_TEXTS = 100
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint per copilot instructions"""
+    """Health check endpoint per copilot instructions (liveness only, never waits on the model)"""
     return {
         "status": "healthy",
         "model_loaded": mental_classifier is not None,
+        "content_version": content_loader.version if content_loader else None,
+        "sessions": session_manager.stats() if session_manager else None,
+        "usage_limits": usage_limits.stats() if usage_limits else None,
+        "risk_refiner": risk_refiner.stats() if risk_refiner else None,
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Per-lane latency percentiles (crisis p99 against its SLO), inference/LLM queues, Ollama circuit"""
+    from safety.assessor import get_llm_bulkhead, get_ollama_breaker
+    return {
+        "latency": _get_latency().snapshot(),
+        "inference_queue": priority_executor.stats() if priority_executor else None,
+        "llm_bulkhead": get_llm_bulkhead().stats(),
+        "ollama_breaker": get_ollama_breaker().stats(),
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: loading → warming → ready, with timings; 503 until the model serves"""
+    if model_loader is None:
+        return JSONResponse(status_code=503, content={"status": "not_started", "serving": "keyword_fallback", "timings": {}, "error": None})
+    status = model_loader.status()
+    return JSONResponse(status_code=200 if model_loader.ready else 503, content=status)
+
+def _get_usage_limits():
+    """Working-session limits shared by /analyze and /ws/session (created on first use)"""
+    global usage_limits
+    if usage_limits is None:
+        from safety.use_limits import UsageLimitService
+        usage_limits = UsageLimitService.from_env()
+    return usage_limits
+
+def _check_usage(user_id: Optional[str], text: str) -> Optional[dict]:
+    """Limit result when user_id must take a break, else None. Crisis text is never blocked."""
+    from safety.assessor import has_crisis_keywords
+
+    if not user_id or has_crisis_keywords(text):
+        return None
+    result = _get_usage_limits().check(user_id)
+    return None if result["allowed"] else result
+
 @app.post("/analyze", response_model=AnalyzeResponse)
-async def analyze_text(request: AnalyzeRequest):
+async def analyze_text(request: AnalyzeRequest, http_request: Request):
     """
     Analyze text for emotions and mental health risk.
     Contract per copilot instructions: { text } -> { probs, risk, supportive_message, suggested_next_steps, helpful_resources }
     Data flow: emotions via score_probs → risk via assess_crisis_signals → ACTIONS[risk] → de_stigmatize
+    Users past their working-session limit get 429 + Retry-After. The limit is advisory, not
+    access control: there is no authentication, so it keys on the client-asserted X-User-Id
+    header and requests without one are never limited (a client address can be a proxy
+    shared by many users).
+    Crisis-keyword text takes the fast lane (see _analyze_crisis).
     """
+    from safety.assessor import has_crisis_keywords
+
+    started = time.perf_counter()
+    crisis = has_crisis_keywords(request.text)  # Before any queuing
+    user_id = http_request.headers.get("x-user-id")
+    limit = _check_usage(user_id, request.text)
+    if limit:
+        return JSONResponse(
+            status_code=429,
+            headers={"Retry-After": str(limit["retry_after"])},
+            content={"detail": "Session limit reached - please take a break", **limit},
+        )
+
     try:
         # Add timeout for the entire analysis (15s per optimization)
-        return await asyncio.wait_for(
-            _analyze_with_timeout(request.text),
-            timeout=15.0
-        )
+        analysis = _analyze_crisis(request.text) if crisis else _analyze_with_timeout(request.text, request.user_preferences)
+        return await asyncio.wait_for(analysis, timeout=15.0)
     except asyncio.TimeoutError:
         print(f"⚠️ Analysis timeout for text: {request.text[:50]}...")
         # Return fallback response matching exact contract
-        return _get_fallback_response()
+        return _get_crisis_response(None) if crisis else _get_fallback_response()
     except Exception as e:
         print(f"❌ Analysis error: {e}")
-        return _get_fallback_response()
+        return _get_crisis_response(None) if crisis else _get_fallback_response()
+    finally:
+        _get_latency().record("crisis" if crisis else "standard", time.perf_counter() - started)
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: BatchAnalyzeRequest):
+    """
+    Bulk scoring (history re-scoring, imports): { texts } -> { results: [{ probs, risk }] }.
+    Risk comes from safety.assessor.assess_batch (several texts per LLM generation); no
+    support or recommendations, and no 15s budget - batches are expected to be slow.
+    """
+    from safety.assessor import assess_batch
+
+    if len(request.texts) > MAX_BATCH_TEXTS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_TEXTS} texts per batch")
+    started = time.perf_counter()
+    texts = [_clean_text(text) for text in request.texts]
+    # Fan out over the inference pool instead of classifying one text at a time
+    probs_list = await asyncio.gather(*(_stage_emotions(text) for text in texts))
+    risks = await asyncio.to_thread(assess_batch, texts, probs_list)
+    return {
+        "results": [{"probs": probs, "risk": risk.value} for probs, risk in zip(probs_list, risks)],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+@app.get("/analyze/refinements/{refinement_id}")
+async def risk_refinement_stream(refinement_id: str):
+    """
+    SSE channel for a deferred risk: one `risk` event with the refined level, plus an
+    `escalation` event (updated support) when the LLM raised it.
+    """
+    async def events():
+        result = await _get_risk_refiner().result(refinement_id)
+        if result is None:
+            yield f"event: error\ndata: {json.dumps({'error': 'refinement unknown, expired or timed out'})}\n\n"
+            return
+        yield f"event: risk\ndata: {json.dumps(result)}\n\n"
+        if result["escalated"]:
+            # Text isn't retained after the response; support follows from the risk level alone
+            event = _escalation_event("", {}, result)
+            yield f"event: escalation\ndata: {json.dumps(event)}\n\n"
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+# WebSocket sessions: idle connections are closed after this many seconds
+WS_IDLE_TTL_SECONDS = float(os.environ.get("HEALWISE_WS_IDLE_SECONDS", "300"))
+
+def _get_session_manager():
+    """Bounded session cache shared by every WebSocket connection (created on first use)"""
+    global session_manager
+    if session_manager is None:
+        from services.therapy_session import TherapySessionManager
+        session_manager = TherapySessionManager.from_env()
+    return session_manager
+
+# Top emotions that warrant the upbeat "positive" replies (only at SAFE/LOW risk)
+POSITIVE_EMOTIONS = {"joy", "optimism", "gratitude", "love", "excitement", "admiration",
+                     "amusement", "pride", "relief", "approval", "caring"}
+
+def _empathy_tag(probs: dict, risk: str) -> str:
+    """Map emotions/risk onto utils.empathy response tags"""
+    if risk in ["HIGH", "CRISIS"]:
+        return "suicide_high"
+    top_emotion = max(probs, key=probs.get) if probs else "neutral"
+    if top_emotion in ["nervousness", "fear"]:
+        return "anxiety_high"
+    if top_emotion in ["sadness", "grief", "disappointment"]:
+        return "depression_high"
+    if risk == "MODERATE" or top_emotion in ["anger", "annoyance", "disgust", "remorse", "embarrassment"]:
+        return "supportive"
+    if top_emotion in POSITIVE_EMOTIONS and risk in ["SAFE", "LOW"]:
+        return "positive"
+    return "neutral"
+
+async def _stream_analysis(websocket: WebSocket, session, text: str, user_preferences: Optional[dict] = None):
+    """
+    Run the /analyze stages for one message, sending each result as soon as it is ready.
+    Returns (refinement_id, text, probs) when the risk is provisional, else None.
+    Crisis-keyword messages take the fast lane: emotions jump the inference queue, the
+    LLM and recommendations are skipped and support is the precomputed crisis payload.
+    """
+    from models.pattern_analyzer import analyze_conversation_patterns, get_conversation_insights
+    from backend.safety.early_warning import generate_early_warnings
+    from safety.assessor import has_crisis_keywords
+    from utils.empathy import empathize
+    from utils.scheduling import CRISIS, STANDARD
+
+    started = time.perf_counter()
+    crisis = has_crisis_keywords(text)
+    text = _clean_text(text)
+    _get_session_manager().record_message(session, text)
+
+    probs = await _stage_emotions(text, priority=CRISIS if crisis else STANDARD)
+    await websocket.send_json({"type": "emotions", "probs": probs})
+
+    if crisis:
+        risk, provisional, llm_skipped = "CRISIS", False, False
+    else:
+        risk, provisional, llm_skipped = await _stage_risk_for_mode(text, probs)
+    patterns = analyze_conversation_patterns(text, state=session.patterns, emotions=probs)
+    warnings = generate_early_warnings(text, probs, risk, trend=session.trend)
+    refinement_id = await _get_risk_refiner().submit(text, probs, risk) if provisional else None
+    await websocket.send_json({
+        "type": "risk",
+        "risk": risk,
+        "provisional": provisional,
+        "refinement_id": refinement_id,
+        "llm_skipped": llm_skipped,
+        "warnings": warnings,
+        "trend": session.trend.summary(),
+        "insights": get_conversation_insights(patterns, risk_level=risk, state=session.patterns),
+    })
+
+    if crisis:
+        supportive_message, suggested_next_steps, helpful_resources = _crisis_payload()
+    else:
+        supportive_message, suggested_next_steps, helpful_resources = _stage_support(text, probs, risk)
+    empathy = empathize(_empathy_tag(probs, risk), list(session.history))
+    await websocket.send_json({
+        "type": "support",
+        "supportive_message": supportive_message,
+        "empathy": empathy,
+        "suggested_next_steps": list(suggested_next_steps[:4]),
+        "helpful_resources": list(helpful_resources[:3]),
+    })
+    manager = _get_session_manager()
+    if manager.store is not None:
+        # SQLite write (HEALWISE_PERSIST_SESSIONS=1) - keep it off the event loop
+        await asyncio.to_thread(manager.persist_exchange, session, text, supportive_message,
+                                {"probs": probs, "risk": risk}, {"risk": risk, "empathy": empathy})
+
+    if not crisis:
+        recommendations = await asyncio.to_thread(_stage_recommendations, risk, probs, user_preferences)
+        await websocket.send_json({"type": "recommendations", "recommendations": recommendations})
+    elapsed = time.perf_counter() - started
+    _get_latency().record("crisis" if crisis else "standard", elapsed)
+    await websocket.send_json({"type": "done", "elapsed_ms": round(elapsed * 1000, 1), "fast_lane": crisis})
+    return (refinement_id, text, probs) if refinement_id else None
+
+async def _publish_refinement(websocket: WebSocket, send_lock: asyncio.Lock, refinement_id: str, text: str, probs: dict):
+    """
+    Send risk_refined (+ escalation) once the LLM is done. Runs after the message's
+    done event and takes the connection's send lock, so it never interleaves with a
+    stage stream.
+    """
+    result = await _get_risk_refiner().result(refinement_id)
+    if result is None:
+        return
+    try:
+        async with send_lock:
+            await websocket.send_json({"type": "risk_refined", **result})
+            if result["escalated"]:
+                await websocket.send_json(_escalation_event(text, probs, result))
+    except Exception:
+        pass  # Connection closed - the result stays available over SSE
+
+@app.websocket("/ws/session")
+async def session_socket(websocket: WebSocket):
+    """
+    Chat session over one connection. Send {"text": ..., "user_preferences"?: {...}} (or plain text);
+    the server keeps history and trend state and streams emotions → risk → support →
+    recommendations → done events for each message (crisis messages skip recommendations). Idle connections are closed after
+    WS_IDLE_TTL_SECONDS; reconnect with ?session_id=... (and the same user_id) to resume a session.
+    Past the working-session limit, messages get a "limit" event instead of analysis.
+    Deferred risk refinements arrive later as risk_refined (+ escalation) events, always
+    between two messages' streams.
+    """
+    await websocket.accept()
+    # May read the session store to resume an expired session, so not on the event loop
+    session = await asyncio.to_thread(
+        _get_session_manager().get_or_create,
+        websocket.query_params.get("session_id"), websocket.query_params.get("user_id")
+    )
+    await websocket.send_json({
+        "type": "session",
+        "session_id": session.session_id,
+        "resumed": session.messages > 0,
+        "idle_ttl": WS_IDLE_TTL_SECONDS,
+    })
+    # One sender at a time: each message's stream and each refinement follow-up hold this lock
+    send_lock = asyncio.Lock()
+    followups = set()
+    try:
+        while True:
+            try:
+                raw = await asyncio.wait_for(websocket.receive_text(), timeout=WS_IDLE_TTL_SECONDS)
+            except asyncio.TimeoutError:
+                async with send_lock:
+                    await websocket.send_json({"type": "closed", "reason": "idle"})
+                    await websocket.close(code=1000)
+                return
+
+            async with send_lock:
+                refinement = await _handle_session_message(websocket, session, raw)
+            if refinement:
+                task = asyncio.create_task(_publish_refinement(websocket, send_lock, *refinement))
+                followups.add(task)
+                task.add_done_callback(followups.discard)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in followups:
+            task.cancel()
+
+async def _handle_session_message(websocket: WebSocket, session, raw: str):
+    """Validate one frame, enforce usage limits and stream its analysis"""
+    try:
+        message = json.loads(raw)
+    except json.JSONDecodeError:
+        message = {"text": raw}
+    if not isinstance(message, dict):
+        message = {"text": str(message)}
+    text = message.get("text")
+    if not isinstance(text, str) or not text.strip():
+        await websocket.send_json({"type": "error", "error": "text is required"})
+        return None
+    limit = _check_usage(session.user_id or session.session_id, text)
+    if limit:
+        await websocket.send_json({"type": "limit", **limit})
+        return None
+
+    try:
+        return await asyncio.wait_for(
+            _stream_analysis(websocket, session, text, message.get("user_preferences")),
+            timeout=15.0
+        )
+    except asyncio.TimeoutError:
+        print(f"⚠️ Session analysis timeout for text: {text[:50]}...")
+        await websocket.send_json({"type": "error", "error": "analysis timed out"})
+        return None
 
-async def _analyze_with_timeout(text: str) -> AnalyzeResponse:
+async def _analyze_with_timeout(text: str, user_preferences: Optional[dict] = None) -> AnalyzeResponse:
     """
     Internal analysis function following copilot instructions data flow:
     1. emotions via score_probs 
@@ -122,9 +478,68 @@ async def _analyze_with_timeout(text: str) -> AnalyzeResponse:
     4. de_stigmatize 
     5. ACTIONS[risk]
     6. kb.retrieve(k=2) - currently unused
+    Each step is a stage function shared with the /ws/session stream.
     """
+    text = _clean_text(text)
+    probs = await _stage_emotions(text)
+    risk, provisional, llm_skipped = await _stage_risk_for_mode(text, probs)
+    refinement_id = await _get_risk_refiner().submit(text, probs, risk) if provisional else None
+    supportive_message, suggested_next_steps, helpful_resources = _stage_support(text, probs, risk)
+    comprehensive_recommendations = _stage_recommendations(risk, probs, user_preferences)
+    
+    # Step 6: kb.retrieve(k=2) - currently unused per copilot instructions
+    # Note: copilot instructions mention kb retrieval but it's not implemented in current flow
     
-    # Clean text to handle Unicode issues
+    return AnalyzeResponse(
+        probs=probs,
+        risk=risk,
+        supportive_message=supportive_message,
+        suggested_next_steps=suggested_next_steps[:4],  # Limit for UI
+        helpful_resources=helpful_resources[:3],  # Limit for UI
+        recommendations=comprehensive_recommendations,
+        risk_provisional=provisional,
+        refinement_id=refinement_id,
+        llm_skipped=llm_skipped
+    )
+
+CRISIS_SUPPORTIVE_MESSAGE = (
+    "I'm really glad you told me, and I'm taking what you said seriously. You don't have to go through "
+    "this alone - please reach out to one of the people below right now. They are available 24/7 and want to help."
+)
+
+@functools.lru_cache(maxsize=1)
+def _crisis_payload() -> tuple:
+    """Crisis support computed once: (supportive_message, next_steps, resources)"""
+    try:
+        from safety.bias import de_stigmatize
+        from safety.ladder import ACTIONS, get_escalation_resources
+        return de_stigmatize(CRISIS_SUPPORTIVE_MESSAGE), tuple(ACTIONS["CRISIS"]), tuple(get_escalation_resources())
+    except Exception as e:
+        print(f"⚠️ Crisis payload fell back to built-in resources: {e}")
+        return CRISIS_SUPPORTIVE_MESSAGE, tuple(_get_contextual_suggestions("", {}, "CRISIS")), tuple(_get_contextual_resources("CRISIS"))
+
+def _get_crisis_response(probs: Optional[dict]) -> AnalyzeResponse:
+    supportive_message, suggested_next_steps, helpful_resources = _crisis_payload()
+    return AnalyzeResponse(
+        probs=probs or {},
+        risk="CRISIS",
+        supportive_message=supportive_message,
+        suggested_next_steps=list(suggested_next_steps[:4]),
+        helpful_resources=list(helpful_resources[:3]),
+        recommendations={"resources": list(helpful_resources)}  # No content recommendations in a crisis
+    )
+
+async def _analyze_crisis(text: str) -> AnalyzeResponse:
+    """
+    Crisis fast lane: the lexicon verdict is final (the LLM could only confirm it), so
+    the LLM, recommendations and sampling are skipped. Emotions still run, ahead of
+    every queued standard request.
+    """
+    from utils.scheduling import CRISIS
+    return _get_crisis_response(await _stage_emotions(_clean_text(text), priority=CRISIS))
+
+def _clean_text(text: str) -> str:
+    """Clean text to handle Unicode issues"""
     try:
         # Remove problematic characters and normalize text
         text = text.encode('utf-8', errors='ignore').decode('utf-8')
@@ -134,31 +549,102 @@ async def _analyze_with_timeout(text: str) -> AnalyzeResponse:
         print(f"⚠️ Text cleaning failed: {e}")
         # Fallback to basic cleaning
         text = ''.join(char for char in text if char.isprintable())
-    
-    # Step 1: Emotions via score_probs (per copilot instructions)
+    return text
+
+def _get_priority_executor():
+    """Inference pool shared by /analyze and /ws/session; crisis work is dequeued first"""
+    global priority_executor
+    if priority_executor is None:
+        from utils.scheduling import PriorityExecutor
+        priority_executor = PriorityExecutor(int(os.environ.get("HEALWISE_INFERENCE_WORKERS", "2")))
+    return priority_executor
+
+def _get_latency():
+    """Per-lane request latency (created on first use)"""
+    global latency
+    if latency is None:
+        from utils.metrics import LatencyTracker
+        latency = LatencyTracker(slo_ms={"crisis": CRISIS_P99_MS})
+    return latency
+
+async def _stage_emotions(text: str, priority: Optional[int] = None) -> dict:
+    """Step 1: Emotions via score_probs (per copilot instructions)"""
+    from utils.scheduling import STANDARD
     try:
         if mental_classifier:
-            probs = await asyncio.to_thread(mental_classifier.score_probs, text, top_k=5)
-        else:
-            print("⚠️ Using fallback emotions - model not loaded")
-            probs = {"neutral": 0.7, "optimism": 0.2, "curiosity": 0.1}
+            return await _get_priority_executor().run(
+                mental_classifier.score_probs, text, top_k=5, priority=STANDARD if priority is None else priority
+            )
+        if keyword_classifier:
+            # Model still loading/warming - keyword fallback keeps responses meaningful
+            return keyword_classifier.score_probs(text, top_k=5)
+        print("⚠️ Using fallback emotions - model not loaded")
     except Exception as e:
         print(f"⚠️ Emotion analysis failed: {e}")
-        probs = {"neutral": 0.7, "optimism": 0.2, "curiosity": 0.1}
-    
-    # Step 2: Risk via assess_crisis_signals (may call Ollama per copilot instructions)
+    return {"neutral": 0.7, "optimism": 0.2, "curiosity": 0.1}
+
+async def _stage_risk(text: str, probs: dict):
+    """Step 2: (risk, llm_skipped) via assess_crisis_signals (may call Ollama per copilot instructions)"""
     try:
-        from safety.assessor import assess_crisis_signals
-        risk_result = await asyncio.wait_for(
-            asyncio.to_thread(assess_crisis_signals, text, probs),
+        from safety.assessor import assess_risk
+        risk_result, llm_skipped = await asyncio.wait_for(
+            asyncio.to_thread(assess_risk, text, probs),
             timeout=10.0
         )
         # Convert Risk enum to string per copilot instructions contract
-        risk = risk_result.value if hasattr(risk_result, 'value') else str(risk_result)
+        return (risk_result.value if hasattr(risk_result, 'value') else str(risk_result)), llm_skipped
     except (asyncio.TimeoutError, Exception) as e:
         print(f"⚠️ Risk assessment failed/timeout: {e}")
-        risk = "SAFE"  # Fallback to SAFE per copilot instructions
-    
+        return "SAFE", False  # Fallback to SAFE per copilot instructions
+
+async def _stage_provisional_risk(text: str, probs: dict):
+    """Step 2 with deferred LLM: (risk, provisional) from crisis keywords + heuristic"""
+    try:
+        from safety.assessor import assess_provisional
+        risk_result, provisional = await asyncio.wait_for(
+            asyncio.to_thread(assess_provisional, text, probs),
+            timeout=10.0
+        )
+        return risk_result.value, provisional
+    except (asyncio.TimeoutError, Exception) as e:
+        print(f"⚠️ Risk assessment failed/timeout: {e}")
+        return "SAFE", False
+
+async def _stage_risk_for_mode(text: str, probs: dict):
+    """(risk, provisional, llm_skipped): deferred when HEALWISE_DEFER_LLM_RISK is set, else the full assessment"""
+    if DEFER_LLM_RISK:
+        return (*await _stage_provisional_risk(text, probs), False)
+    risk, llm_skipped = await _stage_risk(text, probs)
+    return risk, False, llm_skipped
+
+def _refine_risk(text: str, probs: dict, provisional: str) -> str:
+    """Blocking LLM refinement of a provisional risk (runs on the RiskRefiner workers)"""
+    from safety.assessor import Risk, refine_risk
+    return refine_risk(text, probs, Risk(provisional)).value
+
+def _get_risk_refiner():
+    """Background refinement workers for deferred risk (created on first use)"""
+    global risk_refiner
+    if risk_refiner is None:
+        from services.risk_refiner import RiskRefiner
+        risk_refiner = RiskRefiner(_refine_risk)
+    return risk_refiner
+
+def _escalation_event(text: str, probs: dict, result: dict) -> dict:
+    """Follow-up sent when the LLM raises a provisional risk: updated support for the new level"""
+    supportive_message, suggested_next_steps, helpful_resources = _stage_support(text, probs, result["risk"])
+    return {
+        "type": "escalation",
+        "refinement_id": result["refinement_id"],
+        "previous_risk": result["provisional_risk"],
+        "risk": result["risk"],
+        "supportive_message": supportive_message,
+        "suggested_next_steps": suggested_next_steps[:4],
+        "helpful_resources": helpful_resources[:3],
+    }
+
+def _stage_support(text: str, probs: dict, risk: str):
+    """Steps 3-4: supportive message, ACTIONS[risk] next steps and resources"""
     # Step 3: Empathy tag + de_stigmatize (per copilot instructions)
     supportive_message = _generate_supportive_message(text, probs, risk)
     try:
@@ -177,33 +663,22 @@ async def _analyze_with_timeout(text: str) -> AnalyzeResponse:
         # Rich fallback suggestions based on emotion and risk
         suggested_next_steps = _get_contextual_suggestions(text, probs, risk)
         helpful_resources = _get_contextual_resources(risk)
-    
-    # Step 5: Generate comprehensive recommendations using RecommendationEngine
+    return supportive_message, suggested_next_steps, helpful_resources
+
+def _stage_recommendations(risk: str, probs: dict, user_preferences: Optional[dict] = None) -> dict:
+    """Step 5: Generate comprehensive recommendations using RecommendationEngine"""
     try:
         if recommendation_engine:
             print(f"📋 Generating recommendations for risk={risk}, emotions={list(probs.keys())[:3]}")
-            comprehensive_recommendations = recommendation_engine.get_personalized_recommendations(risk, probs)
+            comprehensive_recommendations = recommendation_engine.get_personalized_recommendations(risk, probs, user_preferences)
             print(f"✅ Generated {len(comprehensive_recommendations)} recommendation categories")
-        else:
-            print("⚠️ RecommendationEngine not available, using fallback")
-            comprehensive_recommendations = _get_fallback_recommendations(risk, probs)
+            return comprehensive_recommendations
+        print("⚠️ RecommendationEngine not available, using fallback")
     except Exception as e:
         print(f"⚠️ Recommendation generation failed: {e}")
         import traceback
         traceback.print_exc()
-        comprehensive_recommendations = _get_fallback_recommendations(risk, probs)
-    
-    # Step 6: kb.retrieve(k=2) - currently unused per copilot instructions
-    # Note: copilot instructions mention kb retrieval but it's not implemented in current flow
-    
-    return AnalyzeResponse(
-        probs=probs,
-        risk=risk,
-        supportive_message=supportive_message,
-        suggested_next_steps=suggested_next_steps[:4],  # Limit for UI
-        helpful_resources=helpful_resources[:3],  # Limit for UI
-        recommendations=comprehensive_recommendations
-    )
+    return _get_fallback_recommendations(risk, probs)
 
 def _generate_supportive_message(text: str, probs: dict, risk: str) -> str:
     """Generate contextual, thoughtful supportive message with empathy per copilot instructions"""
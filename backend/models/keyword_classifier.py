@@ -0,0 +1,77 @@
+# backend/models/keyword_classifier.py
+"""
+Keyword-based emotion fallback for HealWise
+Serves go_emotions-style probabilities while the roberta model is still loading
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+# go_emotions label → indicative keywords (lowercase; a trailing "*" matches any word ending)
+EMOTION_KEYWORDS: Dict[str, List[str]] = {
+    "sadness": ["sad", "depress*", "down", "cry", "crying", "tears", "lonely", "empty", "heartbroken", "miserable", "hopeless"],
+    "nervousness": ["anxious", "anxiety", "nervous", "worried", "worry", "panic*", "overwhelm*", "stress*", "tense"],
+    "fear": ["afraid", "scared", "fear*", "terrified", "frightened", "unsafe"],
+    "anger": ["angry", "furious", "mad", "hate", "rage", "frustrat*", "annoyed", "irritat*"],
+    "disappointment": ["disappoint*", "let down", "failed", "failure", "regret*"],
+    "grief": ["grief", "grieving", "loss", "lost", "passed away", "mourning"],
+    "remorse": ["sorry", "guilty", "guilt", "ashamed", "shame"],
+    "joy": ["happy", "joy", "wonderful", "great", "fantastic", "amazing", "glad", "delighted"],
+    "optimism": ["hope", "hopeful", "better", "improving", "looking forward", "optimistic"],
+    "gratitude": ["grateful", "thankful", "thanks", "thank you", "appreciate*"],
+    "love": ["love", "loved", "caring", "adore"],
+    "pride": ["proud", "accomplished", "achieved"],
+    "excitement": ["excited", "exciting", "thrilled", "can't wait"],
+    "relief": ["relieved", "relief", "calm", "calmer"],
+    "confusion": ["confused", "confusing", "don't understand", "unsure"],
+}
+
+NEUTRAL_BASELINE = 0.5
+
+
+def _keyword_regex(keyword: str) -> str:
+    if keyword.endswith("*"):
+        return re.escape(keyword[:-1]) + r"\w*"
+    return re.escape(keyword) + r"\b"
+
+
+def _compile_lexicon(lexicon: Dict[str, List[str]]) -> Tuple["re.Pattern", List[List[str]]]:
+    """
+    Compile every keyword into one alternation so a text is scanned once.
+    Returns the pattern plus group index → emotion labels for that keyword.
+    """
+    labels_by_keyword: Dict[str, List[str]] = {}
+    for label, keywords in lexicon.items():
+        for keyword in keywords:
+            labels_by_keyword.setdefault(keyword, []).append(label)
+
+    # Longest first so "hopeless" wins over "hope"
+    keywords = sorted(labels_by_keyword, key=len, reverse=True)
+    pattern = re.compile(r"\b(?:" + "|".join(f"({_keyword_regex(kw)})" for kw in keywords) + ")")
+    group_labels = [[]] + [labels_by_keyword[kw] for kw in keywords]
+    return pattern, group_labels
+
+
+_KEYWORD_PATTERN, _GROUP_LABELS = _compile_lexicon(EMOTION_KEYWORDS)
+
+
+class KeywordClassifier:
+    """Drop-in stand-in for MentalClassifier.score_probs with no model dependency"""
+
+    def score_probs(self, text: str, top_k: int = 5) -> dict:
+        """
+        Score emotion probabilities from keyword hits.
+        Returns dict of {emotion: probability} for top_k emotions, neutral when nothing matches.
+        """
+        if not text or not text.strip():
+            return {"neutral": 1.0}
+
+        counts: Dict[str, float] = {}
+        for match in _KEYWORD_PATTERN.finditer(text.lower()):
+            for label in _GROUP_LABELS[match.lastindex]:
+                counts[label] = counts.get(label, 0.0) + 1.0
+
+        counts["neutral"] = NEUTRAL_BASELINE
+        total = sum(counts.values())
+        ranked = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return {emotion: count / total for emotion, count in ranked}
@@ -1,17 +1,20 @@
+import json
+from typing import Iterator
+
 import requests
 
 OLLAMA_HOST = "http://127.0.0.1:11434"
 
-def query_gemma(propmt:str,model:str = "gemma3:1b") -> str:
+def query_gemma(prompt:str,model:str = "gemma3:1b") -> str:
     """ send a prompt to gemma3 via ollama and return the response text"""
-    
+
     url = f"{OLLAMA_HOST}/api/generate"
     payload = {
         "model": model,
         "prompt": prompt,
         "stream": False
     }
-    
+
     try:
         response = requests.post(url,json = payload , timeout = 60)
         response.raise_for_status()
@@ -19,4 +22,36 @@ def query_gemma(propmt:str,model:str = "gemma3:1b") -> str:
         return data.get("response","").strip()
     except Exception as e:
         return f"[Error querying Gemma:{str(e)}]"
-    
\ No newline at end of file
+
+def stream_gemma(prompt:str,model:str = "gemma3:1b") -> Iterator[str]:
+    """ stream gemma3's response via ollama, de-stigmatized on the fly (safety.bias rules)"""
+    from safety.bias import StreamingDeStigmatizer
+
+    url = f"{OLLAMA_HOST}/api/generate"
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": True
+    }
+    rewriter = StreamingDeStigmatizer()
+
+    try:
+        with requests.post(url,json = payload , timeout = 60 , stream = True) as response:
+            response.raise_for_status()
+            # Ollama streams one JSON object per line: {"response": "<token>", "done": false}
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                text = rewriter.feed(data.get("response",""))
+                if text:
+                    yield text
+                if data.get("done"):
+                    break
+    except Exception as e:
+        yield rewriter.flush()
+        yield f"[Error querying Gemma:{str(e)}]"
+        return
+    tail = rewriter.flush()
+    if tail:
+        yield tail
@@ -6,6 +6,9 @@ Simple emotion classifier for HealWise per copilot-instructions.md
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import torch
 import time
+import os
+
+from models.model_snapshot import ModelSnapshot, SnapshotError
 
 class MentalClassifier:
     def __init__(self):
@@ -17,11 +20,29 @@ class MentalClassifier:
             self.device = torch.device("cpu")
             
             model_name = "SamLowe/roberta-base-go_emotions"
-            print(f"🔽 Loading tokenizer from {model_name}...")
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            
-            print(f"🔽 Loading model from {model_name}...")
-            self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+            snapshot = ModelSnapshot(model_name=model_name)
+            self.snapshot = None
+            if snapshot.exists():
+                # Zero-network startup from the staged snapshot; checksums are verified
+                # after /ready (verify_integrity) so hashing ~500MB doesn't delay cold start
+                snapshot.verify(hash_files=False)
+                self.snapshot = snapshot
+                print(f"📂 Loading tokenizer + model from snapshot {snapshot.path} (offline)...")
+                self.tokenizer = snapshot.load_tokenizer()
+                # Shared read-only weights across uvicorn workers unless explicitly disabled
+                self.model = snapshot.load_model(
+                    mmap_weights=os.environ.get("HEALWISE_MMAP_WEIGHTS", "1") != "0"
+                )
+            elif os.environ.get("HEALWISE_REQUIRE_SNAPSHOT") == "1":
+                raise SnapshotError(
+                    f"No model snapshot at {snapshot.path}; run `python -m models.model_snapshot stage`"
+                )
+            else:
+                print(f"🔽 Loading tokenizer from {model_name}...")
+                self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+                
+                print(f"🔽 Loading model from {model_name}...")
+                self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
             self.model.to(self.device)
             self.model.eval()  # Set to evaluation mode per copilot instructions
             
@@ -35,6 +56,11 @@ class MentalClassifier:
             print(f"❌ Failed to load mental classifier: {e}")
             raise
     
+    def verify_integrity(self):
+        """Full checksum pass over the snapshot the model came from; raises SnapshotError"""
+        if self.snapshot is not None:
+            self.snapshot.verify()
+
     def score_probs(self, text: str, top_k: int = 5) -> dict:
         """
         Score emotion probabilities for given text.
@@ -77,6 +103,21 @@ class MentalClassifier:
             # Fallback response
             return {"neutral": 0.8, "optimism": 0.2}
 
+    def warmup(self, lengths=(8, 64, 256)) -> dict:
+        """
+        Run one forward pass per representative input length so the first real
+        request does not pay for lazy kernel/allocator initialisation.
+        Returns dict of {length: seconds}.
+        """
+        timings = {}
+        for length in lengths:
+            # ~1 token per word for this filler; truncation caps it at max_length anyway
+            text = " ".join(["feeling"] * max(1, length - 2))
+            start_time = time.time()
+            self.score_probs(text, top_k=1)
+            timings[length] = time.time() - start_time
+        return timings
+
 # Test if run directly
 if __name__ == "__main__":
     classifier = MentalClassifier()
@@ -0,0 +1,89 @@
+# backend/models/mmap_weights.py
+"""
+Memory-mapped safetensors weights for HealWise
+Tensors point straight into a read-only mmap of the weights file, so every
+uvicorn worker on a node shares one copy of the roberta weights in page cache
+instead of holding ~500MB of private memory each.
+"""
+
+import json
+import mmap
+import struct
+import warnings
+from pathlib import Path
+from typing import Dict, Tuple
+
+import torch
+
+# safetensors dtype tags → torch dtypes
+SAFETENSORS_DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+
+def read_safetensors_header(f) -> Tuple[Dict, int]:
+    """
+    Parse the safetensors header: 8-byte little-endian length + JSON.
+    Returns (header, byte offset where tensor data starts).
+    """
+    (header_len,) = struct.unpack("<Q", f.read(8))
+    header = json.loads(f.read(header_len))
+    header.pop("__metadata__", None)
+    return header, 8 + header_len
+
+
+def load_mmap_state_dict(path: Path) -> Tuple[Dict[str, torch.Tensor], mmap.mmap]:
+    """
+    Build a state dict whose tensors are zero-copy views into a shared, read-only mmap.
+    The caller must keep the returned mmap alive as long as the tensors are used.
+    """
+    with open(path, "rb") as f:
+        header, data_start = read_safetensors_header(f)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    state_dict = {}
+    with warnings.catch_warnings():
+        # torch warns that the buffer is not writable; inference never writes weights
+        warnings.simplefilter("ignore", UserWarning)
+        for name, info in header.items():
+            dtype = SAFETENSORS_DTYPES[info["dtype"]]
+            begin, end = info["data_offsets"]
+            count = (end - begin) // torch.empty((), dtype=dtype).element_size()
+            if count == 0:
+                state_dict[name] = torch.empty(info["shape"], dtype=dtype)
+                continue
+            tensor = torch.frombuffer(mapped, dtype=dtype, count=count, offset=data_start + begin)
+            state_dict[name] = tensor.view(info["shape"])
+    return state_dict, mapped
+
+
+def load_model_with_mmap_weights(model_dir: Path, weights_name: str = "model.safetensors"):
+    """
+    Instantiate the model from its config without initialising weights, then
+    assign the mmap-backed tensors in place of the (never touched) parameters.
+    """
+    from transformers import AutoConfig, AutoModelForSequenceClassification
+
+    try:
+        from transformers.modeling_utils import no_init_weights
+    except ImportError:  # Older/newer transformers: fall back to regular init
+        from contextlib import nullcontext as no_init_weights
+
+    config = AutoConfig.from_pretrained(model_dir, local_files_only=True)
+    with no_init_weights():
+        model = AutoModelForSequenceClassification.from_config(config)
+
+    state_dict, mapped = load_mmap_state_dict(Path(model_dir) / weights_name)
+    # assign=True swaps parameters for our tensors instead of copying into them
+    model.load_state_dict(state_dict, strict=True, assign=True)
+    model._healwise_weights_mmap = mapped  # Keep the mapping alive with the model
+    return model
@@ -0,0 +1,217 @@
+# backend/models/model_snapshot.py
+"""
+Offline model snapshots for HealWise
+Stages tokenizer + safetensors weights into a local directory with a checksum
+manifest so startup never touches the Hugging Face hub.
+
+Usage (from backend/):
+    python -m models.model_snapshot stage     # needs network once
+    python -m models.model_snapshot verify
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_MODEL_NAME = "SamLowe/roberta-base-go_emotions"
+DEFAULT_SNAPSHOT_DIR = Path(__file__).parent / "snapshots" / "roberta-base-go_emotions"
+MANIFEST_NAME = "manifest.json"
+# Records (size, mtime_ns) of files whose hashes were checked; restarts only skip
+# re-hashing them when HEALWISE_SNAPSHOT_TRUST_MTIME=1 (mtime can be forged)
+VERIFIED_STAMP_NAME = ".verified.json"
+WEIGHTS_NAME = "model.safetensors"
+OFFLINE_ENV = {"HF_HUB_OFFLINE": "1", "TRANSFORMERS_OFFLINE": "1"}
+
+_HASH_CHUNK_BYTES = 1 << 20
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is missing, incomplete or fails checksum verification"""
+
+
+def enforce_offline() -> None:
+    """
+    Force transformers/huggingface_hub into offline mode for this process. They read
+    these variables at import time, so call it before their first import; afterwards
+    only local_files_only keeps the loads offline.
+    """
+    already_offline = all(os.environ.get(key) == value for key, value in OFFLINE_ENV.items())
+    if not already_offline and any(module in sys.modules for module in ("transformers", "huggingface_hub")):
+        print("⚠️ Offline mode set after transformers was imported - relying on local_files_only")
+    for key, value in OFFLINE_ENV.items():
+        os.environ[key] = value
+
+
+def enforce_offline_if_staged(path: Optional[Path] = None) -> bool:
+    """Process startup hook: offline mode when a snapshot is staged or required"""
+    if ModelSnapshot(path).exists() or os.environ.get("HEALWISE_REQUIRE_SNAPSHOT") == "1":
+        enforce_offline()
+        return True
+    return False
+
+
+def file_sha256(path: Path) -> str:
+    """Stream a file through sha256 without loading it into memory"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(directory: Path, model_name: str) -> Dict:
+    """Checksum every staged file (excluding the manifest itself)"""
+    files = {}
+    for path in sorted(Path(directory).rglob("*")):
+        if not path.is_file() or path.name in (MANIFEST_NAME, VERIFIED_STAMP_NAME):
+            continue
+        rel = path.relative_to(directory).as_posix()
+        files[rel] = {"sha256": file_sha256(path), "size": path.stat().st_size}
+    return {"model_name": model_name, "created_at": time.time(), "files": files}
+
+
+class ModelSnapshot:
+    def __init__(self, path: Optional[Path] = None, model_name: str = DEFAULT_MODEL_NAME):
+        self.path = Path(path or os.environ.get("HEALWISE_MODEL_DIR") or DEFAULT_SNAPSHOT_DIR)
+        self.model_name = model_name
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.path / MANIFEST_NAME
+
+    @property
+    def weights_path(self) -> Path:
+        return self.path / WEIGHTS_NAME
+
+    def exists(self) -> bool:
+        return self.manifest_path.is_file()
+
+    def stage(self) -> Dict:
+        """
+        Download tokenizer + model once and stage them as safetensors with a manifest.
+        Staging happens in a temp dir next to the target and is renamed into place,
+        so a crashed stage never leaves a half-written snapshot behind.
+        """
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=self.path.parent))
+        try:
+            print(f"🔽 Staging {self.model_name} into {self.path}...")
+            AutoTokenizer.from_pretrained(self.model_name).save_pretrained(staging)
+            model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            model.save_pretrained(staging, safe_serialization=True)
+
+            if not (staging / WEIGHTS_NAME).is_file():
+                raise SnapshotError(f"{WEIGHTS_NAME} was not produced - is safetensors installed?")
+
+            manifest = build_manifest(staging, self.model_name)
+            with open(staging / MANIFEST_NAME, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+
+            if self.path.exists():
+                shutil.rmtree(self.path)
+            os.replace(staging, self.path)
+            print(f"✅ Snapshot staged ({len(manifest['files'])} files)")
+            return manifest
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+
+    def verify(self, trust_mtime: Optional[bool] = None, hash_files: bool = True) -> Dict:
+        """
+        Check every manifest entry exists with matching size and sha256.
+        With trust_mtime (default: HEALWISE_SNAPSHOT_TRUST_MTIME=1), files unchanged since
+        the last successful check (same size + mtime) are not re-hashed. hash_files=False
+        only checks presence and sizes - the quick pre-load check; MentalClassifier runs
+        the full pass after the model is ready (ModelLoader integrity check).
+        """
+        if trust_mtime is None:
+            trust_mtime = os.environ.get("HEALWISE_SNAPSHOT_TRUST_MTIME", "0") == "1"
+        if not self.exists():
+            raise SnapshotError(f"No snapshot manifest at {self.manifest_path}")
+
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        stamp_path = self.path / VERIFIED_STAMP_NAME
+        try:
+            with open(stamp_path, "r", encoding="utf-8") as f:
+                stamps = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            stamps = {}
+
+        new_stamps = {}
+        for rel, expected in manifest.get("files", {}).items():
+            path = self.path / rel
+            if not path.is_file():
+                raise SnapshotError(f"Snapshot file missing: {rel}")
+            stat = path.stat()
+            if stat.st_size != expected["size"]:
+                raise SnapshotError(f"Size mismatch for {rel}: {stat.st_size} != {expected['size']}")
+
+            if not hash_files:
+                continue
+            stamp = [stat.st_size, stat.st_mtime_ns, expected["sha256"]]
+            if not trust_mtime or stamps.get(rel) != stamp:
+                if file_sha256(path) != expected["sha256"]:
+                    raise SnapshotError(f"Checksum mismatch for {rel}")
+            new_stamps[rel] = stamp
+
+        if hash_files and new_stamps != stamps:
+            try:
+                with open(stamp_path, "w", encoding="utf-8") as f:
+                    json.dump(new_stamps, f)
+            except OSError:
+                pass  # Read-only snapshot dirs just re-hash next time
+        return manifest
+
+    def load_tokenizer(self):
+        """Load the staged tokenizer with offline mode enforced"""
+        enforce_offline()
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(self.path, local_files_only=True)
+
+    def load_model(self, mmap_weights: bool = True):
+        """
+        Load the staged safetensors model with offline mode enforced.
+        With mmap_weights the parameters are read-only views into the page cache,
+        shared by every worker process on the node (see models/mmap_weights.py).
+        """
+        enforce_offline()
+        if mmap_weights:
+            try:
+                from models.mmap_weights import load_model_with_mmap_weights
+                return load_model_with_mmap_weights(self.path, WEIGHTS_NAME)
+            except Exception as e:
+                # e.g. state-dict keys this transformers version renames, or no assign= support
+                print(f"⚠️ mmap weight loading failed ({e}); falling back to from_pretrained")
+        return self._load_pretrained()
+
+    def _load_pretrained(self):
+        from transformers import AutoModelForSequenceClassification
+        return AutoModelForSequenceClassification.from_pretrained(
+            self.path, local_files_only=True, use_safetensors=True
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the offline HealWise model snapshot")
+    parser.add_argument("command", choices=["stage", "verify"])
+    parser.add_argument("--dir", type=Path, default=None, help="Snapshot directory (default: HEALWISE_MODEL_DIR or models/snapshots)")
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    args = parser.parse_args()
+
+    snapshot = ModelSnapshot(args.dir, args.model)
+    if args.command == "stage":
+        snapshot.stage()
+    snapshot.verify()
+    print(f"✅ Snapshot verified at {snapshot.path}")
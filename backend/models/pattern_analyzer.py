@@ -1,18 +1,167 @@
 """
 Pattern analyzer for HealWise conversation analysis
 Per copilot-instructions.md: New models under backend/models/
+Per-session ConversationState keeps rolling aggregates, so each new message
+costs one scan of that message - history is never re-scanned.
 """
+import re
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
 
-def analyze_conversation_patterns(text, history=None):
+# Pattern category → keywords (substring match, as the original checks used)
+PATTERN_KEYWORDS: Dict[str, List[str]] = {
+    "concern": ["again", "still", "keep", "always", "never stops"],
+    "escalation": ["worse", "getting bad", "can't handle", "giving up"],
+    "improvement": ["better", "improving", "helping", "progress", "hope"],
+}
+CATEGORIES: Tuple[str, ...] = tuple(PATTERN_KEYWORDS)
+
+WINDOW_SIZE = 20          # Messages kept in the rolling window
+EMOTION_ALPHA = 0.3       # EWMA weight of the newest message's emotions
+ENGAGEMENT_FAST_ALPHA = 0.5
+ENGAGEMENT_SLOW_ALPHA = 0.1
+ENGAGEMENT_TREND_RATIO = 1.25  # Fast/slow length EWMA ratio that counts as a trend
+RECURRING_THRESHOLD = 2   # Window hits before a pattern counts as recurring
+EWMA_FLOOR = 1e-3         # Emotions decayed below this are dropped
+
+
+def _compile_patterns(lexicon: Dict[str, List[str]]):
+    """One alternation over every keyword; group index → category"""
+    keywords = sorted(
+        ((keyword, category) for category, words in lexicon.items() for keyword in words),
+        key=lambda pair: len(pair[0]), reverse=True,
+    )
+    pattern = re.compile("|".join(f"({re.escape(keyword)})" for keyword, _ in keywords))
+    return pattern, [None] + [CATEGORIES.index(category) for _, category in keywords]
+
+
+_PATTERN, _GROUP_CATEGORY = _compile_patterns(PATTERN_KEYWORDS)
+
+
+def _engagement_level(length: int) -> str:
+    if length < 10:
+        return "low"
+    if length > 100:
+        return "high"
+    return "medium"
+
+
+def _scan(text: str) -> List[int]:
+    """Keyword hit counts per category for one message, in a single pass"""
+    counts = [0] * len(CATEGORIES)
+    for match in _PATTERN.finditer(text):
+        counts[_GROUP_CATEGORY[match.lastindex]] += 1
+    return counts
+
+
+class ConversationState:
+    """
+    Rolling per-session pattern state.
+    Window counts are kept as running sums: a new message adds its counts and the
+    message falling out of the window subtracts its own, so updates are O(1)
+    beyond scanning the new text.
+    """
+
+    def __init__(self, window_size: int = WINDOW_SIZE):
+        self.window: Deque[List[int]] = deque()
+        self.window_size = window_size
+        self.window_counts = [0] * len(CATEGORIES)
+        self.window_hits = [0] * len(CATEGORIES)  # Messages with at least one hit
+        self.messages_seen = 0
+        self.length_fast = 0.0
+        self.length_slow = 0.0
+        self.emotion_ewma: Dict[str, float] = {}
+
+    def update(self, text: str, emotions: Optional[Dict[str, float]] = None) -> List[int]:
+        """Fold one message (and optionally its emotion probs) into the state"""
+        text_lower = (text or "").lower()
+        counts = _scan(text_lower)
+        length = len(text_lower)
+
+        self.window.append(counts)
+        for i, count in enumerate(counts):
+            self.window_counts[i] += count
+            self.window_hits[i] += count > 0
+        if len(self.window) > self.window_size:
+            old_counts = self.window.popleft()
+            for i, count in enumerate(old_counts):
+                self.window_counts[i] -= count
+                self.window_hits[i] -= count > 0
+
+        if self.messages_seen == 0:
+            self.length_fast = self.length_slow = float(length)
+        else:
+            self.length_fast += ENGAGEMENT_FAST_ALPHA * (length - self.length_fast)
+            self.length_slow += ENGAGEMENT_SLOW_ALPHA * (length - self.length_slow)
+        self.messages_seen += 1
+
+        if emotions:
+            self._update_emotions(emotions)
+        return counts
+
+    def _update_emotions(self, emotions: Dict[str, float]):
+        decay = 1.0 - EMOTION_ALPHA
+        for label in list(self.emotion_ewma):
+            if label not in emotions:
+                value = self.emotion_ewma[label] * decay
+                if value < EWMA_FLOOR:
+                    del self.emotion_ewma[label]
+                else:
+                    self.emotion_ewma[label] = value
+        for label, prob in emotions.items():
+            self.emotion_ewma[label] = self.emotion_ewma.get(label, 0.0) * decay + EMOTION_ALPHA * prob
+
+    @property
+    def engagement_trend(self) -> str:
+        if self.messages_seen < 3 or self.length_slow <= 0:
+            return "stable"
+        ratio = self.length_fast / self.length_slow
+        if ratio >= ENGAGEMENT_TREND_RATIO:
+            return "rising"
+        if ratio <= 1 / ENGAGEMENT_TREND_RATIO:
+            return "falling"
+        return "stable"
+
+    def dominant_emotion(self) -> Optional[str]:
+        if not self.emotion_ewma:
+            return None
+        return max(self.emotion_ewma, key=self.emotion_ewma.get)
+
+    def summary(self) -> dict:
+        """Rolling aggregates for responses and insights"""
+        return {
+            "messages_seen": self.messages_seen,
+            "window_messages": len(self.window),
+            "window_counts": dict(zip(CATEGORIES, self.window_counts)),
+            "recurring": {
+                category: hits >= RECURRING_THRESHOLD for category, hits in zip(CATEGORIES, self.window_hits)
+            },
+            "engagement_trend": self.engagement_trend,
+            "emotion_ewma": dict(sorted(self.emotion_ewma.items(), key=lambda item: item[1], reverse=True)[:5]),
+            "dominant_emotion": self.dominant_emotion(),
+        }
+
+
+def _history_text(message) -> str:
+    if isinstance(message, dict):
+        return message.get("text", "")
+    return message or ""
+
+
+def analyze_conversation_patterns(text, history=None, state: Optional[ConversationState] = None,
+                                  emotions: Optional[Dict[str, float]] = None):
     """
     Analyze conversation patterns for HealWise
-    
+
     Args:
         text (str): Current user input
-        history (list, optional): Previous conversation history (currently unused per instructions)
-    
+        history (list, optional): Previous messages (str or {"text": ...}); only used to
+            seed a fresh state when no state is passed
+        state (ConversationState, optional): Session state, updated in place
+        emotions (dict, optional): Emotion probs for text, folded into the emotion EWMA
+
     Returns:
-        dict: Pattern analysis results
+        dict: Pattern analysis results; includes "rolling" aggregates when a state is used
     """
     # Basic implementation following HealWise conventions
     patterns = {
@@ -21,42 +170,42 @@ def analyze_conversation_patterns(text, history=None):
         "improvement_indicators": False,
         "engagement_level": "medium"
     }
-    
+
+    if state is None and history:
+        state = ConversationState()
+        for message in list(history)[-WINDOW_SIZE:]:
+            state.update(_history_text(message))
+
     if not text or not text.strip():
+        if state is not None:
+            patterns["rolling"] = state.summary()
         return patterns
-    
-    text_lower = text.lower()
-    
-    # Check for repetitive concerns
-    concern_keywords = ["again", "still", "keep", "always", "never stops"]
-    patterns["repetitive_concerns"] = any(keyword in text_lower for keyword in concern_keywords)
-    
-    # Check for escalating risk indicators
-    escalation_keywords = ["worse", "getting bad", "can't handle", "giving up"]
-    patterns["escalating_risk"] = any(keyword in text_lower for keyword in escalation_keywords)
-    
-    # Check for improvement indicators
-    improvement_keywords = ["better", "improving", "helping", "progress", "hope"]
-    patterns["improvement_indicators"] = any(keyword in text_lower for keyword in improvement_keywords)
-    
-    # Determine engagement level
-    if len(text_lower) < 10:
-        patterns["engagement_level"] = "low"
-    elif len(text_lower) > 100:
-        patterns["engagement_level"] = "high"
+
+    if state is not None:
+        counts = state.update(text, emotions)
     else:
-        patterns["engagement_level"] = "medium"
-    
+        counts = _scan(text.lower())
+
+    concern, escalation, improvement = counts  # CATEGORIES order
+    patterns["repetitive_concerns"] = concern > 0
+    patterns["escalating_risk"] = escalation > 0
+    patterns["improvement_indicators"] = improvement > 0
+    patterns["engagement_level"] = _engagement_level(len(text))
+
+    if state is not None:
+        patterns["rolling"] = state.summary()
     return patterns
 
-def get_conversation_insights(patterns, risk_level=None):
+def get_conversation_insights(patterns, risk_level=None, state: Optional[ConversationState] = None):
     """
     Generate insights based on conversation patterns
-    
+
     Args:
         patterns (dict): Results from analyze_conversation_patterns
         risk_level (str, optional): Current risk assessment
-    
+        state (ConversationState, optional): Session state; its rolling aggregates
+            take precedence over patterns["rolling"]
+
     Returns:
         dict: Conversation insights and recommendations
     """
@@ -65,22 +214,43 @@ def get_conversation_insights(patterns, risk_level=None):
         "recommendations": [],
         "flags": []
     }
-    
+
     if patterns.get("repetitive_concerns"):
         insights["flags"].append("repetitive_concerns")
         insights["recommendations"].append("Consider exploring new coping strategies")
-    
+
     if patterns.get("escalating_risk"):
         insights["flags"].append("escalating_risk")
         insights["recommendations"].append("Monitor for increasing distress levels")
-    
+
     if patterns.get("improvement_indicators"):
         insights["flags"].append("positive_progress")
         insights["recommendations"].append("Acknowledge and reinforce positive changes")
-    
+
     if patterns.get("engagement_level") == "low":
         insights["recommendations"].append("Encourage more detailed expression")
     elif patterns.get("engagement_level") == "high":
         insights["recommendations"].append("Validate detailed sharing")
-    
-    return insights
\ No newline at end of file
+
+    rolling = state.summary() if state is not None else patterns.get("rolling")
+    if rolling:
+        recurring = rolling.get("recurring", {})
+        if recurring.get("concern"):
+            insights["flags"].append("recurring_concerns")
+            insights["recommendations"].append("Revisit the concern that keeps coming up")
+        if recurring.get("escalation"):
+            insights["flags"].append("sustained_escalation")
+            insights["recommendations"].append("Check in about safety and consider professional support")
+        if recurring.get("improvement"):
+            insights["flags"].append("sustained_progress")
+        if rolling.get("engagement_trend") == "falling":
+            insights["flags"].append("declining_engagement")
+            insights["recommendations"].append("Gently invite the user to share more")
+        dominant = rolling.get("dominant_emotion")
+        insights["summary"] = (
+            f"{rolling.get('messages_seen', 0)} messages, engagement {rolling.get('engagement_trend', 'stable')}"
+            + (f", mostly {dominant}" if dominant else "")
+        )
+        insights["rolling"] = rolling
+
+    return insights
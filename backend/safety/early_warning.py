@@ -1,20 +1,130 @@
 """
 Early warning system for HealWise mental health monitoring
 Per copilot-instructions.md: safety extension point for crisis prevention
+Trend warnings come from SessionTrend, a constant-memory streaming summary of
+the session (distress EWMA, elevated-risk run length, recent distress slope),
+so old messages are never re-scored.
 """
 
-from typing import List, Dict, Any
+from collections import deque
+from typing import Deque, List, Dict, Any, Optional
 from .assessor import Risk
 
-def generate_early_warnings(text: str, probs: Dict[str, float], risk: Risk, history: List[str] = None) -> List[str]:
+# Per-emotion contribution to a message's distress score (negative = protective)
+DISTRESS_WEIGHTS: Dict[str, float] = {
+    "sadness": 1.0, "grief": 1.0, "fear": 1.0, "nervousness": 0.8,
+    "anger": 0.6, "remorse": 0.6, "disappointment": 0.5, "embarrassment": 0.3,
+    "joy": -0.5, "optimism": -0.5, "relief": -0.5, "gratitude": -0.3, "love": -0.3,
+}
+RISK_SCORES: Dict[str, float] = {
+    Risk.SAFE: 0.0, Risk.LOW: 0.25, Risk.MODERATE: 0.5, Risk.HIGH: 0.75, Risk.CRISIS: 1.0,
+}
+ELEVATED_RISKS = (Risk.MODERATE, Risk.HIGH, Risk.CRISIS)
+
+TREND_WINDOW = 5            # Messages in the sliding slope window
+DISTRESS_ALPHA = 0.3        # EWMA weight of the newest message
+RISING_SLOPE = 0.05         # Distress increase per message that counts as rising
+SUSTAINED_DISTRESS = 0.6    # EWMA level that counts as sustained distress
+ELEVATED_RUN = 3            # Consecutive MODERATE+ messages before warning
+
+RISING_WARNING = f"Distress rising across the last {TREND_WINDOW} messages - checking in with someone you trust may help"
+SUSTAINED_WARNING = "Sustained high distress this session - additional support may be helpful"
+ELEVATED_RUN_WARNING = "Elevated risk for several messages in a row - professional support is recommended"
+
+
+def _risk_name(risk) -> str:
+    """Accept either assessor's Risk (plain strings or Enum) or a risk string"""
+    return str(getattr(risk, "value", risk) or Risk.SAFE).upper()
+
+
+def distress_score(probs: Dict[str, float], risk) -> float:
+    """0..1 distress for one message from its emotions and risk level"""
+    emotional = sum(DISTRESS_WEIGHTS.get(label, 0.0) * prob for label, prob in (probs or {}).items())
+    score = 0.5 * min(max(emotional, 0.0), 1.0) + 0.5 * RISK_SCORES.get(_risk_name(risk), 0.0)
+    return min(max(score, 0.0), 1.0)
+
+
+class SessionTrend:
+    """
+    Streaming per-session distress aggregates, O(1) time and memory per message.
+    The slope is a least-squares fit over the last TREND_WINDOW scores, kept as
+    running sums of y and x*y that are adjusted when a score leaves the window.
+    """
+
+    def __init__(self, window: int = TREND_WINDOW):
+        self.window_size = window
+        self.scores: Deque[float] = deque()
+        self._sum_y = 0.0
+        self._sum_xy = 0.0
+        self.ewma: Optional[float] = None
+        self.messages_seen = 0
+        self.current_risk = Risk.SAFE
+        self.risk_run = 0
+        self.elevated_run = 0
+
+    def update(self, probs: Dict[str, float], risk) -> float:
+        """Fold one message into the aggregates and return its distress score"""
+        score = distress_score(probs, risk)
+        risk = _risk_name(risk)
+
+        if len(self.scores) == self.window_size:
+            oldest = self.scores.popleft()
+            # Remaining scores shift one position left: x*y loses one y each
+            self._sum_y -= oldest
+            self._sum_xy -= self._sum_y
+        self._sum_xy += len(self.scores) * score
+        self._sum_y += score
+        self.scores.append(score)
+
+        self.ewma = score if self.ewma is None else self.ewma + DISTRESS_ALPHA * (score - self.ewma)
+        self.risk_run = self.risk_run + 1 if risk == self.current_risk else 1
+        self.current_risk = risk
+        self.elevated_run = self.elevated_run + 1 if risk in ELEVATED_RISKS else 0
+        self.messages_seen += 1
+        return score
+
+    @property
+    def slope(self) -> float:
+        """Distress change per message over the window (0 until it has 2 points)"""
+        n = len(self.scores)
+        if n < 2:
+            return 0.0
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        return (n * self._sum_xy - sum_x * self._sum_y) / (n * sum_xx - sum_x * sum_x)
+
+    def warnings(self) -> List[str]:
+        warnings = []
+        if len(self.scores) == self.window_size and self.slope >= RISING_SLOPE:
+            warnings.append(RISING_WARNING)
+        if self.elevated_run >= ELEVATED_RUN:
+            warnings.append(ELEVATED_RUN_WARNING)
+        if self.ewma is not None and self.ewma >= SUSTAINED_DISTRESS and self.messages_seen >= self.window_size:
+            warnings.append(SUSTAINED_WARNING)
+        return warnings
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "distress_ewma": round(self.ewma or 0.0, 3),
+            "distress_slope": round(self.slope, 3),
+            "risk": self.current_risk,
+            "risk_run": self.risk_run,
+            "elevated_run": self.elevated_run,
+            "messages_seen": self.messages_seen,
+        }
+
+
+def generate_early_warnings(text: str, probs: Dict[str, float], risk: Risk, history: List[str] = None,
+                            trend: Optional[SessionTrend] = None) -> List[str]:
     """
     Generate early warning signals based on text analysis and risk assessment
     
     Args:
         text (str): Current user input
         probs (Dict[str, float]): Emotion probabilities from mental_classifier
-        risk (Risk): Risk level from assess_crisis_signals
-        history (List[str], optional): Conversation history (currently unused per instructions)
+        risk (Risk): Risk level from assess_crisis_signals (Risk or its string value)
+        history (List[str], optional): Conversation history (kept for compatibility; trends use trend)
+        trend (SessionTrend, optional): Session aggregates, updated in place with this message
     
     Returns:
         List[str]: Early warning messages for escalating mental health concerns
@@ -25,6 +135,7 @@ def generate_early_warnings(text: str, probs: Dict[str, float], risk: Risk, hist
         return warnings
     
     text_lower = text.lower()
+    risk = _risk_name(risk)
     
     # Risk-based warnings per HealWise Risk enum (SAFE/LOW/MODERATE/HIGH/CRISIS)
     if risk in [Risk.HIGH, Risk.CRISIS]:
@@ -36,6 +147,11 @@ def generate_early_warnings(text: str, probs: Dict[str, float], risk: Risk, hist
     elif risk == Risk.MODERATE:
         warnings.append("Elevated emotional distress detected - additional support may be helpful")
     
+    # Trend warnings from the session's streaming aggregates
+    if trend is not None:
+        trend.update(probs, risk)
+        warnings.extend(trend.warnings())
+    
     # Emotion-based early warnings using SamLowe/roberta-base-go_emotions categories
     high_sadness = probs.get("sadness", 0) > 0.7
     high_fear = probs.get("fear", 0) > 0.7
@@ -92,6 +208,8 @@ def assess_warning_urgency(warnings: List[str], risk: Risk) -> str:
     if not warnings:
         return "low"
     
+    risk = _risk_name(risk)
+    
     # Crisis-level risk always critical urgency
     if risk == Risk.CRISIS:
         return "critical"
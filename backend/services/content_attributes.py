@@ -0,0 +1,191 @@
+# backend/services/content_attributes.py
+"""
+Filterable attributes of HealWise content items
+Shared by every storage backend so JSON and SQLite catalogs filter identically.
+User preferences compile to filters over these attributes; the in-memory
+snapshot evaluates them against precomputed per-attribute bitsets.
+"""
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(?:-\s*(\d+(?:\.\d+)?))?\s*(minute|min|hour|hr)", re.IGNORECASE)
+
+
+def duration_minutes(duration: str) -> Optional[float]:
+    """Upper bound of a duration like "5-10 minutes" or "1-2 hours", in minutes (None if unparseable)"""
+    match = _DURATION_PATTERN.search(duration or "")
+    if not match:
+        return None
+    upper = float(match.group(2) or match.group(1))
+    return upper * 60 if match.group(3).lower().startswith("h") else upper
+
+
+# Ingredients that rule an item out of a diet, matched on whole words of the item text.
+# They only veto explicit tags (a mistagged item); they never grant a diet.
+_MEAT = ('meat', 'beef', 'pork', 'chicken', 'turkey', 'bacon', 'fish', 'salmon', 'tuna', 'sardines?', 'mackerel', 'shrimp')
+_DAIRY = ('(?<!almond )(?<!oat )(?<!soy )milk', 'cheese', 'yogh?urt', 'cream', 'whey')
+DIET_CONFLICTS: Dict[str, Tuple[str, ...]] = {
+    'vegetarian': _MEAT,
+    'vegan': _MEAT + _DAIRY + ('eggs?', 'honey'),
+    'dairy-free': _DAIRY,
+    # Oats are usually processed alongside wheat, so count them too
+    'gluten-free': ('bread', 'toast', 'wheat', 'pasta', 'barley', 'rye', 'couscous', 'oats?', 'oatmeal'),
+    'nut-free': ('nuts?', 'almonds?', 'walnuts?', 'cashews?', 'peanuts?', 'pecans?', 'pistachios?', 'trail mix'),
+}
+_DIET_PATTERNS = {
+    diet: re.compile(r"\b(?:" + "|".join(words) + r")\b", re.IGNORECASE)
+    for diet, words in DIET_CONFLICTS.items()
+}
+
+
+def dietary_tags(item: dict) -> List[str]:
+    """
+    Diets an item is suitable for: its explicit "dietary" list, minus any diet its
+    food, description or preparation names a conflict for. Untagged items match no
+    dietary restriction - a missing ingredient list is not evidence of suitability.
+    """
+    if not isinstance(item.get('dietary'), list):
+        return []
+    text = " ".join(str(item.get(field, "")) for field in ('food', 'description', 'preparation'))
+    tags = {str(tag).strip().lower() for tag in item['dietary']}
+    return sorted(tag for tag in tags if tag not in _DIET_PATTERNS or not _DIET_PATTERNS[tag].search(text))
+
+
+def _split_values(value: str) -> List[str]:
+    return [part.strip().lower() for part in value.split(",") if part.strip()]
+
+
+def item_attributes(content_type: str, item) -> Dict[str, object]:
+    """
+    Categorical attributes map to a list of lowercase values; numeric ones to a float.
+    e.g. movies → {"genre": ["comedy", "drama"]}, exercises → {"duration_minutes": 10.0}
+    """
+    if not isinstance(item, dict):
+        return {}
+
+    attributes: Dict[str, object] = {}
+    if content_type == 'movies' and item.get('genre'):
+        attributes['genre'] = _split_values(item['genre'])
+    if content_type in ('activities', 'resources') and item.get('type'):
+        attributes['type'] = [item['type'].strip().lower()]
+    if content_type in ('exercises', 'activities') and item.get('duration'):
+        minutes = duration_minutes(item['duration'])
+        if minutes is not None:
+            attributes['duration_minutes'] = minutes
+    if content_type == 'nutrition':
+        attributes['dietary'] = dietary_tags(item)
+    return attributes
+
+
+# Filter operators: an item passes ("any", name, values) when it has one of the
+# values, ("none", ...) when it has none of them, ("all", ...) when it has every
+# value, and ("max", name, limit) unless its number exceeds limit. Items without
+# a numeric attribute (e.g. "As needed") are never excluded by "max".
+Filter = Tuple[str, str, object]
+
+# user_preferences key → (content_type, operator, attribute)
+PREFERENCE_FILTERS: Dict[str, Tuple[str, str, str]] = {
+    'genres': ('movies', 'any', 'genre'),
+    'exclude_genres': ('movies', 'none', 'genre'),
+    'max_exercise_minutes': ('exercises', 'max', 'duration_minutes'),
+    'max_activity_minutes': ('activities', 'max', 'duration_minutes'),
+    'exclude_activity_types': ('activities', 'none', 'type'),
+    'dietary_restrictions': ('nutrition', 'all', 'dietary'),
+}
+
+
+def preference_filters(user_preferences: Optional[Dict]) -> Dict[str, Tuple[Filter, ...]]:
+    """
+    Compile user_preferences into per-category filters; unknown keys and empty values are ignored.
+    e.g. {"exclude_genres": ["Drama"], "max_exercise_minutes": 15}
+         → {"movies": (("none", "genre", ("drama",)),), "exercises": (("max", "duration_minutes", 15.0),)}
+    """
+    filters: Dict[str, List[Filter]] = {}
+    for key, value in (user_preferences or {}).items():
+        if key not in PREFERENCE_FILTERS or value in (None, "", []):
+            continue
+        content_type, op, name = PREFERENCE_FILTERS[key]
+        if op == 'max':
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                continue
+        else:
+            values = [value] if isinstance(value, str) else list(value)
+            value = tuple(sorted({str(v).strip().lower() for v in values}))
+        filters.setdefault(content_type, []).append((op, name, value))
+    return {content_type: tuple(clauses) for content_type, clauses in filters.items()}
+
+
+class AttributeBitsets:
+    """
+    Packed bitsets over one bucket's items: one per categorical value, plus one
+    per distinct numeric value marking items at or below it. Any filter combination
+    then costs a few bitwise ANDs/ORs over len(items) / 8 bytes.
+    """
+
+    def __init__(self, content_type: str, items: Sequence):
+        self.size = len(items)
+        nbytes = (self.size + 7) // 8
+        self._all = np.packbits(np.ones(self.size, dtype=bool))
+        self._empty = np.zeros(nbytes, dtype=np.uint8)
+        values: Dict[Tuple[str, str], np.ndarray] = {}
+        numbers: Dict[str, Dict[int, float]] = {}
+        for row, item in enumerate(items):
+            for name, value in item_attributes(content_type, item).items():
+                if isinstance(value, list):
+                    for v in value:
+                        values.setdefault((name, v), np.zeros(self.size, dtype=bool))[row] = True
+                else:
+                    numbers.setdefault(name, {})[row] = value
+        self._values = {key: np.packbits(bits) for key, bits in values.items()}
+
+        # Cumulative "≤ threshold" bitsets; rows missing the attribute are always set
+        self._thresholds: Dict[str, List[float]] = {}
+        self._at_most: Dict[str, List[np.ndarray]] = {}
+        for name, row_values in numbers.items():
+            bits = np.ones(self.size, dtype=bool)
+            bits[list(row_values)] = False
+            thresholds = sorted(set(row_values.values()))
+            by_value: Dict[float, List[int]] = {}
+            for row, value in row_values.items():
+                by_value.setdefault(value, []).append(row)
+            self._thresholds[name] = thresholds
+            self._at_most[name] = [np.packbits(bits)]  # Below the smallest threshold
+            for threshold in thresholds:
+                bits[by_value[threshold]] = True
+                self._at_most[name].append(np.packbits(bits))
+
+    def _any(self, name: str, values: Iterable[str]) -> np.ndarray:
+        bits = self._empty
+        for value in values:
+            bits = bits | self._values.get((name, value), self._empty)
+        return bits
+
+    def _clause(self, op: str, name: str, value) -> np.ndarray:
+        if op == 'any':
+            return self._any(name, value)
+        if op == 'none':
+            return self._all & ~self._any(name, value)
+        if op == 'all':
+            bits = self._all
+            for v in value:
+                bits = bits & self._values.get((name, v), self._empty)
+            return bits
+        if op == 'max':
+            if name not in self._thresholds:
+                return self._all
+            return self._at_most[name][bisect_right(self._thresholds[name], value)]
+        raise ValueError(f"Unknown filter operator: {op}")
+
+    def mask(self, filters: Sequence[Filter]) -> Optional[np.ndarray]:
+        """Boolean row mask for the filters, or None when nothing is filtered"""
+        if not filters:
+            return None
+        bits = self._all
+        for op, name, value in filters:
+            bits = bits & self._clause(op, name, value)
+        return np.unpackbits(bits, count=self.size).astype(bool)
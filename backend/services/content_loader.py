@@ -1,39 +1,349 @@
 # backend/services/content_loader.py
+"""
+Therapeutic content catalog for HealWise
+Content is parsed, validated and precomputed into an immutable ContentSnapshot.
+A watcher thread polls backend/data/*.json mtimes and swaps in a new snapshot
+atomically, so edits go live without a restart and in-flight requests keep
+reading the snapshot they started with.
+
+Large catalogs can use the SQLite backend instead (HEALWISE_CONTENT_BACKEND=sqlite):
+the JSON files are imported into an indexed database (see content_store) that is
+rebuilt only when they change, so startups usually just open it.
+"""
 import json
+import math
+import os
+import sqlite3
+import threading
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .content_attributes import AttributeBitsets, Filter
+from .emotion_index import EmotionIndex
+
+CONTENT_FILES: Dict[str, str] = {
+    'quotes': "quotes.json",
+    'movies': "movies.json",
+    'books': "books.json",
+    'exercises': "exercises.json",
+    'nutrition': "nutrition.json",
+    'activities': "activities.json",
+    'resources': "resources.json",
+}
+
+# Fields RecommendationEngine formats for each category (quotes are plain strings)
+REQUIRED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'quotes': (),
+    'movies': ('title', 'description'),
+    'books': ('title', 'author', 'description'),
+    'exercises': ('exercise', 'duration', 'benefit'),
+    'nutrition': ('food', 'benefit'),
+    'activities': ('type', 'suggestion'),
+    'resources': ('title', 'description'),
+}
+
+# A replaced SQLite store stays open this long so requests still holding it can finish
+RETIRED_STORE_GRACE_SECONDS = 30.0
+
+
+class ContentValidationError(ValueError):
+    """Raised when a content file does not match the expected risk → items layout"""
+
+
+def validate_content(content_type: str, data) -> Dict[str, list]:
+    """Check a parsed content file and normalise risk keys to lowercase"""
+    if not isinstance(data, dict):
+        raise ContentValidationError(f"{content_type}: expected an object keyed by risk level")
+
+    required = REQUIRED_FIELDS.get(content_type, ())
+    normalized = {}
+    for risk, items in data.items():
+        if not isinstance(items, list):
+            raise ContentValidationError(f"{content_type}.{risk}: expected a list of items")
+        for i, item in enumerate(items):
+            if not required:
+                if not isinstance(item, str):
+                    raise ContentValidationError(f"{content_type}.{risk}[{i}]: expected a string")
+                continue
+            if not isinstance(item, dict):
+                raise ContentValidationError(f"{content_type}.{risk}[{i}]: expected an object")
+            missing = [field for field in required if field not in item]
+            if missing:
+                raise ContentValidationError(f"{content_type}.{risk}[{i}]: missing {', '.join(missing)}")
+            _validate_emotion_weights(f"{content_type}.{risk}[{i}]", item.get("emotions"))
+        normalized[risk.lower()] = items
+    return normalized
+
+
+def _validate_emotion_weights(where: str, emotions) -> None:
+    """Optional "emotions": {label: weight} tag - weights must be finite, non-negative numbers"""
+    if emotions is None:
+        return
+    if not isinstance(emotions, dict):
+        raise ContentValidationError(f"{where}.emotions: expected an object of label → weight")
+    for label, weight in emotions.items():
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not math.isfinite(weight) or weight < 0:
+            raise ContentValidationError(f"{where}.emotions.{label}: expected a non-negative number, got {weight!r}")
+
+
+class ContentSnapshot:
+    """Immutable view of every content category at one content version"""
+
+    def __init__(self, content: Dict[str, Dict[str, list]], version: int,
+                 previous: Optional["ContentSnapshot"] = None):
+        """
+        Args:
+            content: Parsed + validated content, content_type → risk → items
+            version: Monotonic content version
+            previous: Prior snapshot; categories whose parsed content is unchanged
+                reuse its precomputed structures instead of rebuilding them
+        """
+        self.version = version
+        self._source = content
+        self._content = {}
+        self._indexes = {}
+        self._bitsets = {}
+        for content_type, buckets in content.items():
+            if previous is not None and previous._source.get(content_type) is buckets:
+                self._content[content_type] = previous._content[content_type]
+                self._indexes[content_type] = previous._indexes[content_type]
+                self._bitsets[content_type] = previous._bitsets[content_type]
+                continue
+            # Tuples so a published snapshot cannot be mutated by callers
+            self._content[content_type] = {risk: tuple(items) for risk, items in buckets.items()}
+            # Precomputed item × emotion matrices, built off the request path
+            self._indexes[content_type] = {
+                risk: EmotionIndex(items) for risk, items in self._content[content_type].items()
+            }
+            # Attribute bitsets so preference filters are bitwise ops, not item scans
+            self._bitsets[content_type] = {
+                risk: AttributeBitsets(content_type, items) for risk, items in self._content[content_type].items()
+            }
+
+    def get_content_by_risk(self, content_type: str, risk_level: str) -> List:
+        content = self._content.get(content_type, {})
+        return list(content.get(risk_level.lower(), ()))
+
+    def category(self, content_type: str) -> Dict[str, tuple]:
+        return self._content.get(content_type, {})
+
+    def select(self, content_type: str, risk_level: str, emotions: Dict[str, float], k: int = 3,
+               rng: Optional[np.random.Generator] = None, jitter: float = 0.05,
+               filters: Sequence[Filter] = ()) -> List:
+        """
+        Top-k items of a risk bucket for the request's emotions (see EmotionIndex.top_k).
+        filters (see content_attributes.preference_filters) narrow the bucket first.
+        """
+        risk = risk_level.lower()
+        items = self._content.get(content_type, {}).get(risk, ())
+        if not items:
+            return []
+        index = self._indexes[content_type][risk]
+        mask = self._bitsets[content_type][risk].mask(filters)
+        return [items[i] for i in index.top_k(emotions, k, jitter=jitter, rng=rng, mask=mask)]
+
 
 class ContentLoader:
-    def __init__(self):
-        self.data_dir = Path(__file__).parent.parent / "data"
+    def __init__(self, data_dir: Optional[Path] = None, backend: Optional[str] = None,
+                 db_path: Optional[Path] = None):
+        """
+        Args:
+            data_dir: Directory holding the content JSON files
+            backend: "json" (in-memory snapshots) or "sqlite"; defaults to HEALWISE_CONTENT_BACKEND
+            db_path: SQLite catalog location, built from data_dir on first use
+        """
+        self.data_dir = Path(data_dir) if data_dir else Path(__file__).parent.parent / "data"
+        self.backend = (backend or os.environ.get("HEALWISE_CONTENT_BACKEND", "json")).lower()
+        if self.backend not in ("json", "sqlite"):
+            raise ValueError(f"Unknown content backend: {self.backend}")
+        self.db_path = Path(db_path) if db_path else self.data_dir / "content.sqlite3"
+        self.last_error: Optional[str] = None
+        self._reload_lock = threading.Lock()
+        self._watch_stop = threading.Event()
+        self._watch_thread: Optional[threading.Thread] = None
+        self._signatures: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._parsed: Dict[str, Dict[str, list]] = {}
         self._load_all_content()
-    
+
     def _load_all_content(self):
-        self.quotes = self._load_json("quotes.json")
-        self.movies = self._load_json("movies.json")
-        self.books = self._load_json("books.json")
-        self.exercises = self._load_json("exercises.json")
-        self.nutrition = self._load_json("nutrition.json")
-        self.activities = self._load_json("activities.json")
-        self.resources = self._load_json("resources.json")
-    
+        """Initial load - invalid content fails loudly at startup"""
+        if self.backend == "sqlite":
+            from .content_store import SQLiteContentStore, build_database
+            self._signatures = self._json_signatures()
+            db_mtime = self._path_signature(self.db_path)
+            if db_mtime is None or any(sig and sig[0] > db_mtime[0] for sig in self._signatures.values()):
+                build_database(self.data_dir, self.db_path)  # Missing or older than its JSON source
+            self._db_signature = self._path_signature(self.db_path)
+            self._snapshot = SQLiteContentStore(self.db_path, version=1)
+            return
+
+        for content_type, filename in CONTENT_FILES.items():
+            self._signatures[content_type] = self._file_signature(filename)
+            self._parsed[content_type] = validate_content(content_type, self._load_json(filename))
+        self._snapshot = ContentSnapshot(self._parsed, version=1)
+
     def _load_json(self, filename: str) -> Dict:
         try:
             with open(self.data_dir / filename, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except FileNotFoundError:
             return {}
-    
+
+    def _file_signature(self, filename: str) -> Optional[Tuple[int, int]]:
+        return self._path_signature(self.data_dir / filename)
+
+    def _json_signatures(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        return {content_type: self._file_signature(filename) for content_type, filename in CONTENT_FILES.items()}
+
+    @staticmethod
+    def _path_signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    @property
+    def snapshot(self):
+        """Current ContentSnapshot or SQLiteContentStore; grab it once per request for a consistent view"""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Re-parse changed files and publish a new snapshot.
+        Unchanged files reuse their parsed content, so a reload costs one file parse.
+        Returns True when a new snapshot was swapped in; on invalid content the
+        current snapshot stays live and the error is kept in last_error.
+        """
+        if self.backend == "sqlite":
+            return self._reload_database(force)
+
+        with self._reload_lock:
+            changed = {}
+            for content_type, filename in CONTENT_FILES.items():
+                signature = self._file_signature(filename)
+                if force or signature != self._signatures.get(content_type):
+                    changed[content_type] = signature
+            if not changed:
+                return False
+
+            parsed = dict(self._parsed)
+            try:
+                for content_type in changed:
+                    parsed[content_type] = validate_content(content_type, self._load_json(CONTENT_FILES[content_type]))
+                snapshot = ContentSnapshot(parsed, version=self._snapshot.version + 1, previous=self._snapshot)
+            except (ValueError, TypeError) as e:
+                # JSONDecodeError and ContentValidationError are ValueErrors; TypeError/ValueError
+                # can also come from building the snapshot's indexes
+                self.last_error = str(e)
+                print(f"⚠️ Content reload rejected, keeping version {self.version}: {e}")
+                return False
+
+            self._parsed = parsed
+            self._signatures.update(changed)
+            self.last_error = None
+            # Single reference assignment: readers see the old or the new snapshot, never a mix
+            self._snapshot = snapshot
+            print(f"🔄 Content reloaded ({', '.join(sorted(changed))}) → version {snapshot.version}")
+            return True
+
+    def _reload_database(self, force: bool = False) -> bool:
+        """
+        Swap in a new store when the database file was replaced. Edits to the JSON
+        source (or force) rebuild the database from it first.
+        """
+        from .content_store import SQLiteContentStore, build_database
+
+        with self._reload_lock:
+            json_signatures = self._json_signatures()
+            try:
+                if force or json_signatures != self._signatures:
+                    build_database(self.data_dir, self.db_path)
+                signature = self._path_signature(self.db_path)
+                if signature is None or signature == self._db_signature:
+                    self._signatures = json_signatures
+                    return False
+                store = SQLiteContentStore(self.db_path, version=self._snapshot.version + 1)
+            except (ValueError, TypeError, sqlite3.Error) as e:
+                self.last_error = str(e)
+                print(f"⚠️ Content reload rejected, keeping version {self.version}: {e}")
+                return False
+
+            previous = self._snapshot
+            self._signatures = json_signatures
+            self._db_signature = signature
+            self.last_error = None
+            self._snapshot = store
+            self._retire(previous)
+            print(f"🔄 Content database reloaded → version {store.version}")
+            return True
+
+    def _retire(self, store):
+        """Close a replaced store's connections once requests still holding it are done"""
+        if RETIRED_STORE_GRACE_SECONDS <= 0:
+            store.close()
+            return
+        timer = threading.Timer(RETIRED_STORE_GRACE_SECONDS, store.close)
+        timer.daemon = True
+        timer.start()
+
+    def start_watching(self, interval: float = 2.0) -> threading.Thread:
+        """Poll data file mtimes on a daemon thread and reload on change"""
+        if self._watch_thread is None or not self._watch_thread.is_alive():
+            self._watch_stop.clear()
+            self._watch_thread = threading.Thread(
+                target=self._watch_loop, args=(interval,), name="healwise-content-watcher", daemon=True
+            )
+            self._watch_thread.start()
+        return self._watch_thread
+
+    def stop_watching(self):
+        self._watch_stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join(timeout=5)
+            self._watch_thread = None
+
+    def _watch_loop(self, interval: float):
+        while not self._watch_stop.wait(interval):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"⚠️ Content watcher error: {e}")
+
     def get_content_by_risk(self, content_type: str, risk_level: str) -> List:
-        content_map = {
-            'quotes': self.quotes,
-            'movies': self.movies,
-            'books': self.books,
-            'exercises': self.exercises,
-            'nutrition': self.nutrition,
-            'activities': self.activities,
-            'resources': self.resources
-        }
-        
-        content = content_map.get(content_type, {})
-        return content.get(risk_level.lower(), [])
\ No newline at end of file
+        return self._snapshot.get_content_by_risk(content_type, risk_level)
+
+    # Backward-compatible attribute access to the current snapshot
+    @property
+    def quotes(self) -> Dict:
+        return self._snapshot.category('quotes')
+
+    @property
+    def movies(self) -> Dict:
+        return self._snapshot.category('movies')
+
+    @property
+    def books(self) -> Dict:
+        return self._snapshot.category('books')
+
+    @property
+    def exercises(self) -> Dict:
+        return self._snapshot.category('exercises')
+
+    @property
+    def nutrition(self) -> Dict:
+        return self._snapshot.category('nutrition')
+
+    @property
+    def activities(self) -> Dict:
+        return self._snapshot.category('activities')
+
+    @property
+    def resources(self) -> Dict:
+        return self._snapshot.category('resources')
@@ -0,0 +1,228 @@
+# backend/services/content_store.py
+"""
+SQLite storage backend for the HealWise content catalog
+Catalogs are imported once from backend/data/*.json into an indexed database;
+startup then only opens the file. Items stay on disk and are fetched per
+request with fixed, statement-cached queries, so memory stays flat as the
+catalog grows to tens of thousands of items.
+
+Build / rebuild (from backend/):
+    python -m services.content_store build
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .content_attributes import Filter, item_attributes
+from .content_loader import CONTENT_FILES, validate_content
+from .emotion_index import GO_EMOTIONS_LABELS, emotion_matrix, top_k_rows
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "data" / "content.sqlite3"
+# Random candidates scored per request when a bucket is larger than this
+CANDIDATE_POOL = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    content_type TEXT NOT NULL,
+    risk TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    emotions BLOB NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_items_bucket ON items(content_type, risk, seq);
+CREATE TABLE IF NOT EXISTS item_attributes (
+    item_id INTEGER NOT NULL REFERENCES items(id),
+    name TEXT NOT NULL,
+    value TEXT,
+    num REAL
+);
+CREATE INDEX IF NOT EXISTS idx_attr_value ON item_attributes(name, value, item_id);
+CREATE INDEX IF NOT EXISTS idx_attr_num ON item_attributes(name, num, item_id);
+CREATE TABLE IF NOT EXISTS buckets (
+    content_type TEXT NOT NULL,
+    risk TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    PRIMARY KEY (content_type, risk)
+);
+"""
+
+# Fixed SQL text so sqlite3's statement cache keeps each one prepared
+SQL_BUCKET_SIZES = "SELECT content_type, risk, size FROM buckets"
+SQL_BUCKET_ALL = "SELECT payload, emotions FROM items WHERE content_type = ? AND risk = ? ORDER BY seq"
+SQL_BUCKET_BY_SEQ = (
+    "SELECT payload, emotions FROM items WHERE content_type = ? AND risk = ? "
+    "AND seq IN (SELECT value FROM json_each(?))"
+)
+SQL_FILTERED = (
+    "SELECT payload, emotions FROM items WHERE content_type = ? AND risk = ?{clauses} "
+    "ORDER BY random() LIMIT ?"
+)
+# One fixed fragment per filter operator (see content_attributes.Filter), so each
+# combination of preferences maps to one cached statement
+SQL_CLAUSES = {
+    'any': " AND id IN (SELECT item_id FROM item_attributes WHERE name = ? AND value IN (SELECT value FROM json_each(?)))",
+    'none': " AND id NOT IN (SELECT item_id FROM item_attributes WHERE name = ? AND value IN (SELECT value FROM json_each(?)))",
+    'all': (" AND id IN (SELECT item_id FROM item_attributes WHERE name = ? AND value IN (SELECT value FROM json_each(?))"
+            " GROUP BY item_id HAVING COUNT(DISTINCT value) = ?)"),
+    'max': " AND id NOT IN (SELECT item_id FROM item_attributes WHERE name = ? AND num > ?)",
+}
+
+def build_database(data_dir: Path, db_path: Path) -> Dict[str, int]:
+    """
+    Import every content JSON file into a fresh database, then atomically replace db_path.
+    Returns bucket sizes keyed "content_type/risk".
+    """
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=".content-", suffix=".sqlite3", dir=db_path.parent)
+    os.close(fd)
+    sizes = {}
+    try:
+        conn = sqlite3.connect(tmp_name)
+        conn.executescript(SCHEMA)
+        for content_type, filename in CONTENT_FILES.items():
+            try:
+                with open(Path(data_dir) / filename, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                data = {}
+            for risk, items in validate_content(content_type, data).items():
+                weights = emotion_matrix(items)
+                for seq, item in enumerate(items):
+                    cursor = conn.execute(
+                        "INSERT INTO items (content_type, risk, seq, payload, emotions) VALUES (?, ?, ?, ?, ?)",
+                        (content_type, risk, seq, json.dumps(item), weights[seq].tobytes()),
+                    )
+                    for name, value in item_attributes(content_type, item).items():
+                        if isinstance(value, list):
+                            conn.executemany(
+                                "INSERT INTO item_attributes (item_id, name, value) VALUES (?, ?, ?)",
+                                [(cursor.lastrowid, name, v) for v in value],
+                            )
+                        else:
+                            conn.execute(
+                                "INSERT INTO item_attributes (item_id, name, num) VALUES (?, ?, ?)",
+                                (cursor.lastrowid, name, value),
+                            )
+                conn.execute("INSERT INTO buckets VALUES (?, ?, ?)", (content_type, risk, len(items)))
+                sizes[f"{content_type}/{risk}"] = len(items)
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.close()
+        os.replace(tmp_name, db_path)
+    finally:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+    return sizes
+
+
+class SQLiteContentStore:
+    """
+    Read-only view of one content database file; the SQLite counterpart of ContentSnapshot.
+    Rebuilds replace the file atomically, so connections never see a half-written catalog.
+    """
+
+    def __init__(self, db_path: Path, version: int = 1):
+        self.db_path = Path(db_path).resolve()
+        self.version = version
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._sizes = {(ct, risk): size for ct, risk, size in self._connection().execute(SQL_BUCKET_SIZES)}
+
+    def _connection(self) -> sqlite3.Connection:
+        # One read-only connection per thread; sqlite3 connections are not thread-safe
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def bucket_size(self, content_type: str, risk_level: str) -> int:
+        return self._sizes.get((content_type, risk_level.lower()), 0)
+
+    def get_content_by_risk(self, content_type: str, risk_level: str) -> List:
+        rows = self._connection().execute(SQL_BUCKET_ALL, (content_type, risk_level.lower()))
+        return [json.loads(payload) for payload, _ in rows]
+
+    def category(self, content_type: str) -> Dict[str, list]:
+        """Whole category in memory - compatibility only, avoid on large catalogs"""
+        return {
+            risk: self.get_content_by_risk(content_type, risk)
+            for (ct, risk) in self._sizes if ct == content_type
+        }
+
+    def _filtered(self, content_type: str, risk: str, filters: Sequence[Filter], limit: int) -> list:
+        """Random rows of a bucket passing the filters, via the attribute indexes"""
+        clauses, params = [], [content_type, risk]
+        for op, name, value in filters:
+            clauses.append(SQL_CLAUSES[op])
+            if op == 'max':
+                params += [name, value]
+            elif op == 'all':
+                params += [name, json.dumps(list(value)), len(set(value))]
+            else:
+                params += [name, json.dumps(list(value))]
+        params.append(limit)
+        return list(self._connection().execute(SQL_FILTERED.format(clauses="".join(clauses)), params))
+
+    def _candidates(self, content_type: str, risk: str, rng: np.random.Generator,
+                    filters: Sequence[Filter] = ()) -> list:
+        size = self.bucket_size(content_type, risk)
+        if size == 0:
+            return []
+        if filters:
+            return self._filtered(content_type, risk, filters, CANDIDATE_POOL)
+        if size <= CANDIDATE_POOL:
+            return list(self._connection().execute(SQL_BUCKET_ALL, (content_type, risk)))
+        seqs = rng.choice(size, CANDIDATE_POOL, replace=False)
+        return list(self._connection().execute(SQL_BUCKET_BY_SEQ, (content_type, risk, json.dumps(seqs.tolist()))))
+
+    def sample(self, content_type: str, risk_level: str, k: int = 3, filters: Sequence[Filter] = ()) -> List:
+        """Random items of a bucket narrowed by the attribute indexes"""
+        return [json.loads(payload) for payload, _ in self._filtered(content_type, risk_level.lower(), filters, k)]
+
+    def select(self, content_type: str, risk_level: str, emotions: Dict[str, float], k: int = 3,
+               rng: Optional[np.random.Generator] = None, jitter: float = 0.05,
+               filters: Sequence[Filter] = ()) -> List:
+        """
+        Top-k emotion matches among a random candidate pool of the bucket.
+        Work and memory are bounded by CANDIDATE_POOL regardless of catalog size.
+        """
+        rng = rng or np.random.default_rng()
+        rows = self._candidates(content_type, risk_level.lower(), rng, filters)
+        if not rows:
+            return []
+        matrix = np.frombuffer(b"".join(blob for _, blob in rows), dtype=np.float32)
+        matrix = matrix.reshape(len(rows), len(GO_EMOTIONS_LABELS))
+        return [json.loads(rows[i][0]) for i in top_k_rows(matrix, emotions, k, jitter, rng)]
+
+    def close(self):
+        """Close every thread's connection (each thread opens its own)"""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the HealWise SQLite content catalog")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--data-dir", type=Path, default=Path(__file__).parent.parent / "data")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH)
+    args = parser.parse_args()
+
+    sizes = build_database(args.data_dir, args.db)
+    print(f"✅ Built {args.db} with {sum(sizes.values())} items in {len(sizes)} buckets")
@@ -0,0 +1,129 @@
+# backend/services/emotion_index.py
+"""
+Emotion-indexed content selection for HealWise
+Each content item carries a weight per go_emotions label. Items of one category
+and risk bucket are stacked into a NumPy matrix, so picking the best matches for
+a request is a single matrix-vector product plus a partial sort.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# SamLowe/roberta-base-go_emotions label order
+GO_EMOTIONS_LABELS: List[str] = [
+    "admiration", "amusement", "anger", "annoyance", "approval", "caring",
+    "confusion", "curiosity", "desire", "disappointment", "disapproval", "disgust",
+    "embarrassment", "excitement", "fear", "gratitude", "grief", "joy",
+    "love", "nervousness", "optimism", "pride", "realization", "relief",
+    "remorse", "sadness", "surprise", "neutral",
+]
+LABEL_INDEX: Dict[str, int] = {label: i for i, label in enumerate(GO_EMOTIONS_LABELS)}
+
+# Words in an item's text suggesting it helps with a given emotion.
+# Used when an item has no explicit "emotions": {label: weight} tag.
+EMOTION_CUES: Dict[str, List[str]] = {
+    "sadness": ["hope", "comfort", "uplift", "heartwarming", "depression", "mood", "warm", "kind", "gentle", "lonel", "connect"],
+    "grief": ["loss", "grief", "healing", "heal", "memory"],
+    "nervousness": ["calm", "anxiety", "anxious", "breath", "relax", "sooth", "stress", "ground", "nervous", "peace"],
+    "fear": ["safe", "safety", "courage", "brave", "grounding", "secure", "crisis", "support"],
+    "anger": ["anger", "frustrat", "release", "tension", "energy", "physical", "movement"],
+    "annoyance": ["tension", "release", "stretch"],
+    "disappointment": ["resilien", "growth", "self-compassion", "compassion", "strength"],
+    "remorse": ["forgive", "self-compassion", "compassion", "imperfect"],
+    "confusion": ["clarity", "journal", "reflect", "mindful", "understand"],
+    "joy": ["fun", "joy", "celebrat", "laugh", "adventure", "play", "happy"],
+    "optimism": ["goal", "future", "inspir", "motivat", "growth"],
+    "gratitude": ["gratitude", "grateful", "thank"],
+    "love": ["love", "relationship", "friend", "family"],
+    "neutral": [],
+}
+
+# Every item keeps a little neutral mass so untagged items still rank sensibly
+NEUTRAL_BASELINE = 0.1
+
+
+def item_text(item) -> str:
+    """Flatten a content item (string or object) into lowercase searchable text"""
+    if isinstance(item, str):
+        return item.lower()
+    if isinstance(item, dict):
+        return " ".join(str(v) for k, v in item.items() if k != "emotions" and isinstance(v, str)).lower()
+    return str(item).lower()
+
+
+def item_emotion_weights(item) -> Dict[str, float]:
+    """Explicit "emotions" tag when present, otherwise cue-word inference from the item text"""
+    if isinstance(item, dict) and isinstance(item.get("emotions"), dict):
+        return {label: float(weight) for label, weight in item["emotions"].items() if label in LABEL_INDEX}
+
+    text = item_text(item)
+    weights = {}
+    for label, cues in EMOTION_CUES.items():
+        hits = sum(1 for cue in cues if cue in text)
+        if hits:
+            weights[label] = float(hits)
+    return weights
+
+
+def emotion_vector(emotions: Dict[str, float]) -> np.ndarray:
+    """Dense go_emotions vector for a request's {label: prob} dict (unknown labels ignored)"""
+    vector = np.zeros(len(GO_EMOTIONS_LABELS), dtype=np.float32)
+    for label, prob in (emotions or {}).items():
+        idx = LABEL_INDEX.get(label)
+        if idx is not None:
+            vector[idx] = prob
+    return vector
+
+
+def emotion_matrix(items: Sequence) -> np.ndarray:
+    """Row-normalised item × emotion weight matrix (float32)"""
+    matrix = np.zeros((len(items), len(GO_EMOTIONS_LABELS)), dtype=np.float32)
+    for row, item in enumerate(items):
+        for label, weight in item_emotion_weights(item).items():
+            matrix[row, LABEL_INDEX[label]] = weight
+    matrix[:, LABEL_INDEX["neutral"]] += NEUTRAL_BASELINE
+    # Row-normalise so long descriptions don't outrank short, focused items
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-6)
+
+
+def top_k_rows(matrix: np.ndarray, emotions: Dict[str, float], k: int = 3, jitter: float = 0.05,
+               rng: Optional[np.random.Generator] = None, mask: Optional[np.ndarray] = None) -> List[int]:
+    """
+    Row indices of the k best-matching items, best first.
+    A uniform jitter in [0, jitter) keeps near-ties rotating between requests.
+    mask (boolean, one per row) restricts the choice to rows where it is True.
+    """
+    if mask is not None:
+        rows = np.flatnonzero(mask)
+        picked = top_k_rows(matrix[rows], emotions, k, jitter, rng)
+        return rows[picked].tolist()
+    size = matrix.shape[0]
+    if size == 0 or k <= 0:
+        return []
+    scores = matrix @ emotion_vector(emotions)
+    if jitter > 0:
+        rng = rng or np.random.default_rng()
+        scores = scores + jitter * rng.random(size, dtype=np.float32)
+    k = min(k, size)
+    if k < size:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(size)
+    return candidates[np.argsort(-scores[candidates])].tolist()
+
+
+class EmotionIndex:
+    """Item × emotion weight matrix for one category/risk bucket"""
+
+    def __init__(self, items: Sequence):
+        self.size = len(items)
+        self.matrix = emotion_matrix(items)
+
+    def scores(self, emotions: Dict[str, float]) -> np.ndarray:
+        return self.matrix @ emotion_vector(emotions)
+
+    def top_k(self, emotions: Dict[str, float], k: int = 3, jitter: float = 0.05,
+              rng: Optional[np.random.Generator] = None, mask: Optional[np.ndarray] = None) -> List[int]:
+        """Indices of the k best-matching items, best first (see top_k_rows)"""
+        return top_k_rows(self.matrix, emotions, k, jitter, rng, mask)
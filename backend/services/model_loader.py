@@ -0,0 +1,114 @@
+# backend/services/model_loader.py
+"""
+Background model loading for HealWise fast cold starts
+The API serves keyword-fallback emotions while the classifier loads and warms up.
+Slow integrity checks (classifier.verify_integrity, e.g. snapshot checksums) run
+after the model is published; a failure unpublishes it again.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# Lifecycle states reported by /ready
+PENDING = "pending"
+LOADING = "loading"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class ModelLoader:
+    def __init__(self, factory: Callable[[], Any], warmup_lengths: Sequence[int] = (8, 64, 256),
+                 on_ready: Optional[Callable[["ModelLoader"], None]] = None,
+                 on_failed: Optional[Callable[["ModelLoader"], None]] = None):
+        """
+        Args:
+            factory: Zero-argument callable that builds the classifier (e.g. MentalClassifier)
+            warmup_lengths: Representative input lengths (tokens) for the warm-up pass
+            on_ready: Called with the loader once the warmed-up classifier is published
+            on_failed: Called with the loader if a published classifier fails its integrity check
+        """
+        self.factory = factory
+        self.on_ready = on_ready
+        self.on_failed = on_failed
+        self.warmup_lengths = tuple(warmup_lengths)
+        self.state = PENDING
+        self.classifier = None
+        self.error: Optional[str] = None
+        self.timings: Dict[str, Any] = {}
+        self._started_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready_event = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def start(self) -> threading.Thread:
+        """Start loading on a daemon thread and return immediately"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="healwise-model-loader", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the model is ready or failed; returns True when ready"""
+        self._ready_event.wait(timeout)
+        return self.ready
+
+    def _run(self):
+        self._started_at = time.time()
+        try:
+            self.state = LOADING
+            classifier = self.factory()
+            self.timings["load_seconds"] = time.time() - self._started_at
+
+            self.state = WARMING
+            warmup_start = time.time()
+            if hasattr(classifier, "warmup"):
+                per_length = classifier.warmup(self.warmup_lengths)
+                self.timings["warmup_by_length"] = {str(k): v for k, v in per_length.items()}
+            self.timings["warmup_seconds"] = time.time() - warmup_start
+
+            # Publish only after warm-up so no request pays for it
+            self.classifier = classifier
+            self.state = READY
+            if self.on_ready:
+                self.on_ready(self)
+            print(f"✅ Model ready in {time.time() - self._started_at:.2f}s")
+        except Exception as e:
+            self.error = str(e)
+            self.state = FAILED
+            print(f"⚠️ Model loading failed, staying on keyword fallback: {e}")
+        finally:
+            self.timings["total_seconds"] = time.time() - self._started_at
+            self._ready_event.set()
+        if self.ready and hasattr(self.classifier, "verify_integrity"):
+            self._verify_integrity()
+
+    def _verify_integrity(self):
+        started = time.time()
+        try:
+            self.classifier.verify_integrity()
+        except Exception as e:
+            # Corrupt or tampered weights: stop serving them
+            self.classifier = None
+            self.error = f"integrity check failed: {e}"
+            self.state = FAILED
+            if self.on_failed:
+                self.on_failed(self)
+            print(f"❌ Model integrity check failed, back on keyword fallback: {e}")
+        finally:
+            self.timings["verify_seconds"] = time.time() - started
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness snapshot for /ready"""
+        timings = dict(self.timings)
+        if self._started_at is not None and "total_seconds" not in timings:
+            timings["elapsed_seconds"] = time.time() - self._started_at
+        return {
+            "status": self.state,
+            "serving": "model" if self.ready else "keyword_fallback",
+            "timings": timings,
+            "error": self.error,
+        }
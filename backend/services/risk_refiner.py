@@ -0,0 +1,116 @@
+# backend/services/risk_refiner.py
+"""
+Background LLM risk refinement for HealWise
+With deferred risk (HEALWISE_DEFER_LLM_RISK), /analyze and /ws/session answer on
+the heuristic + classifier result and mark it provisional. RiskRefiner runs the
+slow LLM pass on a small pool of worker tasks, then publishes the outcome to the
+caller's channel (WebSocket event, SSE stream) and keeps it briefly for polling.
+"""
+import asyncio
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+RISK_ORDER = ["SAFE", "LOW", "MODERATE", "HIGH", "CRISIS"]
+DEFAULT_MAX_PENDING = 100
+DEFAULT_MAX_RESULTS = 1000
+
+Publish = Callable[[Dict], Awaitable[None]]
+
+
+def is_escalation(provisional: str, refined: str) -> bool:
+    return RISK_ORDER.index(refined) > RISK_ORDER.index(provisional)
+
+
+class RiskRefiner:
+    def __init__(self, refine: Callable[[str, dict, str], str], workers: int = 1,
+                 max_pending: int = DEFAULT_MAX_PENDING, max_results: int = DEFAULT_MAX_RESULTS):
+        """
+        Args:
+            refine: Blocking (text, probs, provisional_risk) -> refined risk string
+            workers: Concurrent refinements (the LLM serves few generations at once)
+            max_pending: Queued refinements before new ones are dropped (left provisional)
+            max_results: Finished/pending results kept for SSE and polling
+        """
+        self.refine = refine
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_results = max_results
+        self.completed = 0
+        self.escalations = 0
+        self.dropped = 0
+        self._results: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+
+    def _ensure_workers(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or the previous event loop is gone
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._results.clear()
+            self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, text: str, probs: dict, provisional: str,
+                     publish: Optional[Publish] = None) -> Optional[str]:
+        """Queue a refinement; returns its id, or None when the queue is full"""
+        self._ensure_workers()
+        refinement_id = uuid.uuid4().hex
+        try:
+            self._queue.put_nowait((refinement_id, text, probs, provisional, publish))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return None
+        self._results[refinement_id] = self._loop.create_future()
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+        return refinement_id
+
+    async def _worker(self):
+        while True:
+            refinement_id, text, probs, provisional, publish = await self._queue.get()
+            try:
+                try:
+                    refined = await asyncio.to_thread(self.refine, text, probs, provisional)
+                except Exception as e:
+                    print(f"⚠️ Risk refinement failed: {e}")
+                    refined = provisional
+                escalated = is_escalation(provisional, refined)
+                result = {
+                    "refinement_id": refinement_id,
+                    "provisional_risk": provisional,
+                    "risk": refined,
+                    "escalated": escalated,
+                }
+                self.completed += 1
+                self.escalations += escalated
+                future = self._results.get(refinement_id)
+                if future is not None and not future.done():
+                    future.set_result(result)
+                if publish is not None:
+                    try:
+                        await publish(result)
+                    except Exception:
+                        pass  # Channel closed - result stays available for polling
+            finally:
+                self._queue.task_done()
+
+    async def result(self, refinement_id: str, timeout: float = 60.0) -> Optional[Dict]:
+        """Wait for a refinement; None when unknown, expired or still running after timeout"""
+        future = self._results.get(refinement_id)
+        if future is None:
+            return None
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def stats(self) -> Dict:
+        return {
+            "pending": self._queue.qsize() if self._queue else 0,
+            "completed": self.completed,
+            "escalations": self.escalations,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,223 @@
+# backend/services/session_store.py
+"""
+Persistent conversation history for HealWise
+Each message is one appended row in a SQLite database running in WAL mode, so
+writers never rewrite history and readers don't block writers. Indexes on
+(session_id, id) and (user_id, ts) keep "last N messages" and per-user reads
+bounded regardless of how much history has accumulated.
+
+Import the legacy conversations.json (from backend/):
+    python -m services.session_store import ../conversations.json --user-id <id>
+Re-score a user's history offline (batched LLM risk, JSON lines on stdout):
+    python -m services.session_store rescore --user-id <id>
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "data" / "sessions.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    user_id TEXT,
+    ts REAL NOT NULL,
+    role TEXT NOT NULL,
+    text TEXT NOT NULL,
+    meta TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages(session_id, id);
+CREATE INDEX IF NOT EXISTS idx_messages_user ON messages(user_id, ts);
+"""
+
+SQL_APPEND = "INSERT INTO messages (session_id, user_id, ts, role, text, meta) VALUES (?, ?, ?, ?, ?, ?)"
+SQL_LAST = (
+    "SELECT id, session_id, user_id, ts, role, text, meta FROM messages "
+    "WHERE session_id = ? ORDER BY id DESC LIMIT ?"
+)
+SQL_FOR_USER = (
+    "SELECT id, session_id, user_id, ts, role, text, meta FROM messages "
+    "WHERE user_id = ? AND ts >= ? AND ts < ? ORDER BY ts DESC LIMIT ?"
+)
+SQL_HAS_SESSION = "SELECT 1 FROM messages WHERE session_id = ? LIMIT 1"
+
+
+def _timestamp(value) -> float:
+    """Epoch seconds from an epoch number or an ISO-8601 string (frontend format)"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+def _row_to_message(row) -> Dict:
+    message_id, session_id, user_id, ts, role, text, meta = row
+    return {
+        "id": message_id,
+        "session_id": session_id,
+        "user_id": user_id,
+        "ts": ts,
+        "role": role,
+        "text": text,
+        "meta": json.loads(meta) if meta else {},
+    }
+
+
+class SessionStore:
+    """Append-only message log with bounded reads, safe to share across threads"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path or os.environ.get("HEALWISE_SESSION_DB") or DEFAULT_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets them read while another writes
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Durable at checkpoints, not every commit - fine for chat history
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def append(self, session_id: str, role: str, text: str, user_id: Optional[str] = None,
+               ts: Optional[float] = None, meta: Optional[Dict] = None) -> int:
+        """Append one message and return its id"""
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(SQL_APPEND, (
+                session_id, user_id, time.time() if ts is None else ts, role, text,
+                json.dumps(meta) if meta else None,
+            ))
+        return cursor.lastrowid
+
+    def append_many(self, messages: Iterable[Dict]) -> int:
+        """Append a batch of {session_id, role, text, user_id?, ts?, meta?} dicts in one transaction"""
+        now = time.time()
+        rows = [
+            (m["session_id"], m.get("user_id"), m.get("ts", now), m["role"], m["text"],
+             json.dumps(m["meta"]) if m.get("meta") else None)
+            for m in messages
+        ]
+        conn = self._connection()
+        with conn:
+            conn.executemany(SQL_APPEND, rows)
+        return len(rows)
+
+    def last_messages(self, session_id: str, n: int = 20) -> List[Dict]:
+        """The session's last n messages, oldest first"""
+        rows = self._connection().execute(SQL_LAST, (session_id, n)).fetchall()
+        return [_row_to_message(row) for row in reversed(rows)]
+
+    def messages_for_user(self, user_id: str, since: float = 0.0, until: Optional[float] = None,
+                          limit: int = 100) -> List[Dict]:
+        """A user's messages across sessions in [since, until), newest first"""
+        until = float("inf") if until is None else until
+        rows = self._connection().execute(SQL_FOR_USER, (user_id, since, until, limit))
+        return [_row_to_message(row) for row in rows]
+
+    def has_session(self, session_id: str) -> bool:
+        return self._connection().execute(SQL_HAS_SESSION, (session_id,)).fetchone() is not None
+
+    def import_conversations_json(self, path: Path, user_id: Optional[str] = None) -> int:
+        """
+        Import a conversations file in either layout:
+            backend: {session_id: [{"user": ..., "bot": ...}, ...]}  (one exchange per entry)
+            frontend export: {session_id: {"messages": [{"from": "user"|"bot", "text", "timestamp", ...}]}}
+        Sessions already in the store are skipped, so re-running an import is harmless.
+        Returns the number of messages imported.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            conversations = json.load(f)
+
+        batch = []
+        for session_id, conversation in conversations.items():
+            if self.has_session(session_id):
+                continue
+            messages = conversation.get("messages", []) if isinstance(conversation, dict) else conversation
+            for message in messages:
+                if "text" not in message and ("user" in message or "bot" in message):
+                    # Exchange pair: user turn then bot turn (ids keep the order)
+                    ts = _timestamp(message.get("timestamp"))
+                    for role in ("user", "bot"):
+                        if message.get(role):
+                            batch.append({"session_id": session_id, "user_id": user_id, "ts": ts,
+                                          "role": role, "text": message[role]})
+                    continue
+                extra = {k: v for k, v in message.items() if k not in ("from", "role", "text", "timestamp")}
+                batch.append({
+                    "session_id": session_id,
+                    "user_id": user_id,
+                    "ts": _timestamp(message.get("timestamp")),
+                    "role": message.get("from") or message.get("role") or "user",
+                    "text": message.get("text", ""),
+                    "meta": extra,
+                })
+        return self.append_many(batch)
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def rescore_messages(messages: List[Dict], batch_size: int = 8) -> List[Dict]:
+    """Offline risk for stored user messages: keyword emotions + safety.assessor.assess_batch"""
+    from models.keyword_classifier import KeywordClassifier
+    from safety.assessor import assess_batch
+
+    user_messages = [m for m in messages if m["role"] == "user"]
+    classifier = KeywordClassifier()
+    texts = [m["text"] for m in user_messages]
+    risks = assess_batch(texts, [classifier.score_probs(text) for text in texts], batch_size=batch_size)
+    return [
+        {"id": m["id"], "session_id": m["session_id"], "ts": m["ts"], "risk": risk.value}
+        for m, risk in zip(user_messages, risks)
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HealWise session store tools")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    importer = subcommands.add_parser("import", help="Import a conversations.json file")
+    importer.add_argument("path", type=Path)
+    importer.add_argument("--user-id", default=None)
+    importer.add_argument("--db", type=Path, default=None)
+    rescorer = subcommands.add_parser("rescore", help="Re-score a user's messages with the batched LLM assessor")
+    rescorer.add_argument("--user-id", required=True)
+    rescorer.add_argument("--limit", type=int, default=1000)
+    rescorer.add_argument("--batch-size", type=int, default=8)
+    rescorer.add_argument("--db", type=Path, default=None)
+    args = parser.parse_args()
+
+    store = SessionStore(args.db)
+    if args.command == "import":
+        count = store.import_conversations_json(args.path, args.user_id)
+        print(f"✅ Imported {count} messages into {store.db_path}")
+    else:
+        # safety/ lives at the repo root, like app.py's imports
+        import sys
+        sys.path.append(str(Path(__file__).resolve().parents[2]))
+        for row in rescore_messages(store.messages_for_user(args.user_id, limit=args.limit), args.batch_size):
+            print(json.dumps(row))
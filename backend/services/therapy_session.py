@@ -0,0 +1,272 @@
+# backend/services/therapy_session.py
+"""
+Bounded in-memory therapy sessions for HealWise
+TherapySessionManager caps both the number of sessions and their estimated
+memory, evicting least-recently-used sessions first. Idle sessions expire via a
+hashed timer wheel: each session sits in the slot of its deadline tick, so
+expiry only visits the slots that came due instead of scanning every session.
+With HEALWISE_PERSIST_SESSIONS=1 each exchange (user message + bot reply) is also
+appended to the SQLite SessionStore, and a session_id that is no longer live is
+resumed by its owner from the last persisted messages; replaying their stored
+probs and risk rebuilds the pattern and trend state. Store I/O blocks, so async
+callers run get_or_create and persist_exchange in a worker thread.
+"""
+import math
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+# Rough fixed cost of a session: object, deque, pattern and trend state
+SESSION_BASE_BYTES = 4096
+HISTORY_LIMIT = 50
+DEFAULT_MAX_SESSIONS = 10_000
+DEFAULT_MAX_MEMORY_MB = 64.0
+DEFAULT_IDLE_TTL_SECONDS = 900.0
+DEFAULT_TICK_SECONDS = 1.0
+
+
+class TherapySession:
+    """One user's conversation state: bounded history plus incremental pattern and trend aggregates"""
+
+    def __init__(self, session_id: str, user_id: Optional[str] = None, history_limit: int = HISTORY_LIMIT):
+        from models.pattern_analyzer import ConversationState
+        from backend.safety.early_warning import SessionTrend
+
+        self.session_id = session_id
+        self.user_id = user_id
+        self.history: Deque[str] = deque(maxlen=history_limit)
+        self.patterns = ConversationState()
+        self.trend = SessionTrend()
+        self.created_at = time.time()
+        self.messages = 0
+        self.memory_bytes = SESSION_BASE_BYTES
+        self._deadline_tick = -1  # Owned by the manager's timer wheel
+
+    def add_message(self, text: str) -> int:
+        """Append a user message; returns the change in estimated memory (bytes)"""
+        delta = sys.getsizeof(text)
+        if len(self.history) == self.history.maxlen:
+            delta -= sys.getsizeof(self.history[0])
+        self.history.append(text)
+        self.messages += 1
+        self.memory_bytes += delta
+        return delta
+
+    def replay(self, text: str, probs: Optional[Dict[str, float]] = None, risk=None):
+        """Re-apply a persisted user message, rebuilding pattern and trend state from its probs/risk"""
+        from models.pattern_analyzer import analyze_conversation_patterns
+
+        self.add_message(text)
+        if probs:
+            analyze_conversation_patterns(text, state=self.patterns, emotions=probs)
+            self.trend.update(probs, risk)
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel of sessions. Deadlines are whole ticks and a session sits in
+    slot deadline % len(slots); sweeping a slot only takes the sessions whose
+    deadline has passed, so deadlines further than one revolution out stay put.
+    """
+
+    def __init__(self, span_seconds: float, tick_seconds: float, now: float):
+        self.tick_seconds = tick_seconds
+        self.slots: List[Set[TherapySession]] = [set() for _ in range(int(span_seconds / tick_seconds) + 2)]
+        self.current_tick = self._tick(now)
+
+    def _tick(self, now: float) -> int:
+        return int(now // self.tick_seconds)
+
+    def schedule(self, session: TherapySession, deadline: float):
+        # Round up so a session never expires before its deadline
+        tick = max(math.ceil(deadline / self.tick_seconds), self.current_tick + 1)
+        if tick == session._deadline_tick:
+            return
+        self.cancel(session)
+        self.slots[tick % len(self.slots)].add(session)
+        session._deadline_tick = tick
+
+    def cancel(self, session: TherapySession):
+        if session._deadline_tick >= 0:
+            self.slots[session._deadline_tick % len(self.slots)].discard(session)
+            session._deadline_tick = -1
+
+    def advance(self, now: float) -> List[TherapySession]:
+        """Remove and return sessions whose deadline passed since the last advance"""
+        target = self._tick(now)
+        due: List[TherapySession] = []
+        # At most one revolution - later ticks map onto the same slots again
+        start = max(self.current_tick + 1, target - len(self.slots) + 1)
+        for tick in range(start, target + 1):
+            slot = self.slots[tick % len(self.slots)]
+            expired = [session for session in slot if session._deadline_tick <= target]
+            for session in expired:
+                slot.discard(session)
+                session._deadline_tick = -1
+            due.extend(expired)
+        self.current_tick = max(self.current_tick, target)
+        return due
+
+
+class TherapySessionManager:
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, max_memory_bytes: Optional[int] = None,
+                 idle_ttl: float = DEFAULT_IDLE_TTL_SECONDS, tick_seconds: float = DEFAULT_TICK_SECONDS,
+                 history_limit: int = HISTORY_LIMIT, clock: Callable[[], float] = time.monotonic,
+                 store=None):
+        """
+        Args:
+            max_sessions: Hard cap on live sessions
+            max_memory_bytes: Hard cap on estimated session memory
+            idle_ttl: Seconds without activity before a session expires
+            tick_seconds: Timer wheel resolution
+            history_limit: Messages kept per session
+            clock: Monotonic time source (injectable for tests)
+            store: Optional services.session_store.SessionStore messages are persisted to
+        """
+        self.max_sessions = max_sessions
+        self.max_memory_bytes = max_memory_bytes or int(DEFAULT_MAX_MEMORY_MB * 1024 * 1024)
+        self.idle_ttl = idle_ttl
+        self.history_limit = history_limit
+        self.clock = clock
+        self.store = store
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {"lru": 0, "ttl": 0}
+        self._sessions: "OrderedDict[str, TherapySession]" = OrderedDict()
+        self._wheel = TimerWheel(idle_ttl, tick_seconds, clock())
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TherapySessionManager":
+        store = None
+        if os.environ.get("HEALWISE_PERSIST_SESSIONS", "0") == "1":
+            from services.session_store import SessionStore
+            store = SessionStore()
+        return cls(
+            max_sessions=int(os.environ.get("HEALWISE_MAX_SESSIONS", DEFAULT_MAX_SESSIONS)),
+            max_memory_bytes=int(float(os.environ.get("HEALWISE_SESSION_MEMORY_MB", DEFAULT_MAX_MEMORY_MB)) * 1024 * 1024),
+            idle_ttl=float(os.environ.get("HEALWISE_SESSION_TTL_SECONDS", DEFAULT_IDLE_TTL_SECONDS)),
+            store=store,
+        )
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[TherapySession]:
+        """Existing live session (refreshing its LRU position and TTL), or None"""
+        with self._lock:
+            self._expire(self.clock())
+            session = self._sessions.get(session_id)
+            if session is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touch(session)
+            return session
+
+    def get_or_create(self, session_id: Optional[str] = None, user_id: Optional[str] = None) -> TherapySession:
+        """
+        Resume session_id when it is still live (or persisted), otherwise start a new session.
+        A session with an owner is only resumed by that user_id, and a persisted one only
+        by a caller with a matching user_id; anyone else gets a fresh session id.
+        """
+        session = self.get(session_id) if session_id else None
+        if session is not None:
+            if session.user_id is None or session.user_id == user_id:
+                return session
+            session_id = None
+        messages = self.store.last_messages(session_id, 2 * self.history_limit) if session_id and self.store else []
+        if messages and (user_id is None or any(message["user_id"] != user_id for message in messages)):
+            messages, session_id = [], None
+        session = TherapySession(session_id or uuid.uuid4().hex, user_id, self.history_limit)
+        # Expired or evicted (or another process's): rebuild it from the stored user turns
+        for message in messages:
+            if message["role"] == "user":
+                session.replay(message["text"], message["meta"].get("probs"), message["meta"].get("risk"))
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self.memory_bytes += session.memory_bytes
+            self._touch(session)
+            self._enforce_limits(keep=session)
+            return session
+
+    def record_message(self, session: TherapySession, text: str):
+        """Add a message to a session, refresh it and enforce the memory cap"""
+        with self._lock:
+            delta = session.add_message(text)
+            if self._sessions.get(session.session_id) is session:
+                self.memory_bytes += delta
+                self._touch(session)
+                self._enforce_limits(keep=session)
+
+    def persist_exchange(self, session: TherapySession, text: str, reply: str,
+                         meta: Optional[Dict] = None, reply_meta: Optional[Dict] = None) -> int:
+        """Append a user message and the bot reply to the store (no-op without one)"""
+        if self.store is None:
+            return 0
+        return self.store.append_many([
+            {"session_id": session.session_id, "user_id": session.user_id, "role": "user", "text": text, "meta": meta},
+            {"session_id": session.session_id, "user_id": session.user_id, "role": "bot", "text": reply,
+             "meta": reply_meta},
+        ])
+
+    def remove(self, session_id: str) -> bool:
+        with self._lock:
+            return self._drop(session_id) is not None
+
+    def expire(self) -> int:
+        """Expire idle sessions now; also happens lazily on every access"""
+        with self._lock:
+            return self._expire(self.clock())
+
+    def _touch(self, session: TherapySession):
+        self._sessions.move_to_end(session.session_id)
+        self._wheel.schedule(session, self.clock() + self.idle_ttl)
+
+    def _drop(self, session_id: str) -> Optional[TherapySession]:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._wheel.cancel(session)
+            self.memory_bytes -= session.memory_bytes
+        return session
+
+    def _expire(self, now: float) -> int:
+        expired = 0
+        for session in self._wheel.advance(now):
+            if self._sessions.get(session.session_id) is session:
+                self._drop(session.session_id)
+                expired += 1
+        self.evictions["ttl"] += expired
+        return expired
+
+    def _enforce_limits(self, keep: TherapySession):
+        """Evict least-recently-used sessions (never keep) until both caps hold"""
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or self.memory_bytes > self.max_memory_bytes
+        ):
+            oldest_id = next(iter(self._sessions))
+            if oldest_id == keep.session_id:
+                self._sessions.move_to_end(oldest_id)
+                oldest_id = next(iter(self._sessions))
+            self._drop(oldest_id)
+            self.evictions["lru"] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "memory_bytes": self.memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": dict(self.evictions),
+                "idle_ttl": self.idle_ttl,
+            }
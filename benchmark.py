@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+HealWise performance benchmarks
+Run from the repo root, e.g.:
+    python benchmark.py workers --counts 1 2 4
+    python benchmark.py all | tee bench_output.txt
+"""
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+
+# Same import layout as run_backend.py / app.py
+repo_root = Path(__file__).parent
+for path in [repo_root, repo_root / "backend"]:
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+def _read_memory_kb(pid: int) -> dict:
+    """Rss/Pss for one process from /proc (Linux). Pss splits shared pages across sharers."""
+    values = {"Rss": 0, "Pss": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in values:
+                    values[key] = int(rest.split()[0])
+    except FileNotFoundError:
+        pass
+    return values
+
+
+def _classifier_worker(mmap_weights: bool, results, stop):
+    """Load MentalClassifier in a fresh process, report, and hold it until told to stop"""
+    os.environ["HEALWISE_MMAP_WEIGHTS"] = "1" if mmap_weights else "0"
+    try:
+        from models.mental_classifier import MentalClassifier
+        classifier = MentalClassifier()
+        classifier.score_probs("warming up the worker", top_k=1)
+        results.put(None)
+    except Exception as e:
+        results.put(f"{type(e).__name__}: {e}")
+    stop.wait()
+
+
+def _wait_for_workers(results, procs, timeout: float) -> list:
+    """One report per worker; a worker that died or stalled past timeout becomes an error"""
+    reports, deadline = [], time.monotonic() + timeout
+    while len(reports) < len(procs):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return reports + [f"timed out after {timeout:.0f}s"]
+        try:
+            reports.append(results.get(timeout=min(remaining, 1.0)))
+        except queue.Empty:
+            # Workers block on stop after reporting, so any exit here is a crash (OOM kill, segfault)
+            dead = [proc for proc in procs if proc.exitcode is not None]
+            if dead and results.empty():
+                return reports + [f"worker exited with code {dead[0].exitcode}"]
+    return reports
+
+
+def bench_workers(counts, timeout: float = 600.0):
+    """Total node memory for N classifier workers, private weights vs shared mmap weights"""
+    print("\n📊 Classifier memory vs worker count")
+    print("   Sum RSS double-counts shared pages; sum PSS is the real node total.")
+    from models.model_snapshot import ModelSnapshot
+    if not ModelSnapshot().exists():
+        print("   ⚠️ No model snapshot staged - both modes load privately from the hub.")
+        print("      Run `cd backend && python -m models.model_snapshot stage` first.")
+    print(f"{'mode':<10}{'workers':>8}{'sum RSS MB':>12}{'sum PSS MB':>12}{'PSS/worker':>12}")
+
+    ctx = mp.get_context("spawn")
+    for mmap_weights in (False, True):
+        mode = "mmap" if mmap_weights else "private"
+        for count in counts:
+            results, stop = ctx.Queue(), ctx.Event()
+            procs = [ctx.Process(target=_classifier_worker, args=(mmap_weights, results, stop), daemon=True)
+                     for _ in range(count)]
+            for proc in procs:
+                proc.start()
+            errors = [err for err in _wait_for_workers(results, procs, timeout) if err]
+
+            if errors:
+                print(f"{mode:<10}{count:>8}  ⚠️ worker failed: {errors[0]}")
+            else:
+                mem = [_read_memory_kb(proc.pid) for proc in procs]
+                rss = sum(m["Rss"] for m in mem) / 1024
+                pss = sum(m["Pss"] for m in mem) / 1024
+                print(f"{mode:<10}{count:>8}{rss:>12.1f}{pss:>12.1f}{pss / count:>12.1f}")
+
+            stop.set()
+            for proc in procs:
+                proc.join(timeout=10)
+                if proc.is_alive():
+                    proc.terminate()
+
+
+def _timed(fn, repeat: int) -> float:
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def bench_recommendations(sizes):
+    """Emotion-indexed top-k selection cost as a risk bucket grows"""
+    import random
+    import numpy as np
+    from services.emotion_index import EmotionIndex, EMOTION_CUES
+
+    print("\n📊 Recommendation selection vs bucket size (top-3)")
+    print(f"{'items':>8}{'index build ms':>16}{'top_k µs':>12}{'random.sample µs':>18}")
+    cue_words = [cue for cues in EMOTION_CUES.values() for cue in cues]
+    rng = np.random.default_rng(0)
+    emotions = {"sadness": 0.6, "nervousness": 0.3, "neutral": 0.1}
+    for size in sizes:
+        items = [{"title": f"Item {i}", "description": " ".join(random.sample(cue_words, 3))} for i in range(size)]
+        start = time.perf_counter()
+        index = EmotionIndex(items)
+        build_ms = (time.perf_counter() - start) * 1000
+        top_k_us = _timed(lambda: index.top_k(emotions, 3, rng=rng), 200)
+        sample_us = _timed(lambda: random.sample(items, 3), 200)
+        print(f"{size:>8}{build_ms:>16.1f}{top_k_us:>12.1f}{sample_us:>18.1f}")
+
+
+def bench_catalog(sizes):
+    """JSON snapshot vs SQLite catalog: startup time, resident growth and selection latency"""
+    import json
+    import random
+    import tempfile
+    from services.content_loader import ContentLoader
+    from services.emotion_index import EMOTION_CUES
+
+    print("\n📊 Content catalog backends (movies, one risk bucket)")
+    print(f"{'items':>8}{'backend':>9}{'startup ms':>12}{'Δ RSS MB':>10}{'select µs':>11}")
+    cue_words = [cue for cues in EMOTION_CUES.values() for cue in cues]
+    genres = ["comedy", "drama", "family", "animation", "documentary"]
+    emotions = {"sadness": 0.6, "nervousness": 0.3, "neutral": 0.1}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            movies = [{"title": f"Movie {i}", "genre": random.choice(genres),
+                       "description": " ".join(random.sample(cue_words, 3))} for i in range(size)]
+            Path(tmp, "movies.json").write_text(json.dumps({"safe": movies}), encoding="utf-8")
+            ContentLoader(tmp, backend="sqlite")  # One-off import, not part of startup
+            del movies
+            for backend in ("sqlite", "json"):
+                rss_before = _read_memory_kb(os.getpid())["Rss"]
+                start = time.perf_counter()
+                loader = ContentLoader(tmp, backend=backend)
+                startup_ms = (time.perf_counter() - start) * 1000
+                rss_mb = (_read_memory_kb(os.getpid())["Rss"] - rss_before) / 1024
+                snapshot = loader.snapshot
+                select_us = _timed(lambda: snapshot.select("movies", "safe", emotions, 3), 200)
+                print(f"{size:>8}{backend:>9}{startup_ms:>12.1f}{rss_mb:>10.1f}{select_us:>11.1f}")
+                del loader, snapshot
+
+
+def bench_sessions(count: int):
+    """Session store append throughput and bounded-read latency"""
+    import tempfile
+    from services.session_store import SessionStore
+
+    print(f"\n📊 Session store ({count} messages over 100 sessions)")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionStore(Path(tmp) / "sessions.sqlite3")
+        start = time.perf_counter()
+        for i in range(count):
+            store.append(f"session-{i % 100}", "user", f"message {i}", user_id=f"user-{i % 10}")
+        elapsed = time.perf_counter() - start
+        print(f"  single appends : {count / elapsed:>10.0f} msg/s")
+
+        batch = [{"session_id": f"session-{i % 100}", "role": "bot", "text": f"reply {i}"} for i in range(count)]
+        start = time.perf_counter()
+        for offset in range(0, count, 100):
+            store.append_many(batch[offset:offset + 100])
+        elapsed = time.perf_counter() - start
+        print(f"  batched (100)  : {count / elapsed:>10.0f} msg/s")
+
+        print(f"  last 20 msgs   : {_timed(lambda: store.last_messages('session-42', 20), 500):>10.1f} µs")
+        print(f"  user window    : {_timed(lambda: store.messages_for_user('user-3', limit=50), 500):>10.1f} µs")
+        store.close()
+
+
+LLM_SAMPLE_TEXTS = [
+    "Had an ok day at work, a bit tired",
+    "I feel hopeless and can't cope with anything lately",
+    "Grateful for my friends this weekend",
+    "Everyone would be better off without me",
+    "Stressed about exams but managing",
+    "I haven't slept properly in weeks and feel numb",
+]
+
+
+def bench_llm_batch(count: int, batch_size: int):
+    """Ollama risk assessment throughput: one generation per text vs batched prompts"""
+    import shutil
+    from safety.assessor import _batched_llm_assessment, _therapeutic_llm_assessment
+
+    print(f"\n📊 LLM risk assessment ({count} texts, batch size {batch_size})")
+    if shutil.which("ollama") is None:
+        print("  skipped: ollama not installed")
+        return
+    texts = [LLM_SAMPLE_TEXTS[i % len(LLM_SAMPLE_TEXTS)] for i in range(count)]
+    probs = [{"sadness": 0.4, "nervousness": 0.2}] * count
+
+    start = time.perf_counter()
+    for text, p in zip(texts, probs):
+        _therapeutic_llm_assessment(text, p)
+    single = count / (time.perf_counter() - start)
+    print(f"  single-item    : {single:>8.2f} texts/s")
+
+    failed = 0
+    start = time.perf_counter()
+    for offset in range(0, count, batch_size):
+        risks = _batched_llm_assessment(texts[offset:offset + batch_size], probs[offset:offset + batch_size])
+        failed += sum(risk is None for risk in risks)
+    batched = count / (time.perf_counter() - start)
+    print(f"  batched        : {batched:>8.2f} texts/s ({batched / single:.1f}x, {failed} items to retry)")
+
+
+BENCHMARKS = {
+    "workers": lambda args: bench_workers(args.counts, args.timeout),
+    "recommendations": lambda args: bench_recommendations(args.sizes),
+    "catalog": lambda args: bench_catalog(args.sizes),
+    "sessions": lambda args: bench_sessions(args.messages),
+    "llm": lambda args: bench_llm_batch(args.texts, args.batch_size),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HealWise benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS) + ["all"])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 2, 4], help="Worker counts for the workers benchmark")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds to wait for each round of workers to load")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 50_000], help="Catalog sizes for content benchmarks")
+    parser.add_argument("--messages", type=int, default=20_000, help="Messages for the sessions benchmark")
+    parser.add_argument("--texts", type=int, default=24, help="Texts for the llm benchmark")
+    parser.add_argument("--batch-size", type=int, default=8, help="Texts per prompt for the llm benchmark")
+    args = parser.parse_args()
+
+    print(f"🏁 HealWise benchmarks ({time.strftime('%Y-%m-%d %H:%M:%S')})")
+    names = sorted(BENCHMARKS) if args.benchmark == "all" else [args.benchmark]
+    for name in names:
+        BENCHMARKS[name](args)
+
+
+if __name__ == "__main__":
+    main()
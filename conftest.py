@@ -17,6 +17,20 @@ for path in [repo_root, backend_path]:
     if path not in sys.path:
         sys.path.insert(0, path)
 
+class FakeClock:
+    """Manually advanced time source for services that take an injectable clock"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock():
+    """FakeClock shared by TTL/rate tests: advance with clock.now += seconds"""
+    return FakeClock()
+
 @pytest.fixture
 def sample_user_text():
     """Sample user inputs for HealWise contract testing"""
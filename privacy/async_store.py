@@ -0,0 +1,124 @@
+"""
+Async SecureStore I/O for HealWise
+Encryption and disk I/O run on a dedicated thread pool, so async handlers never
+block the event loop. Saves are atomic (temp file + fsync + rename) and their
+directory fsyncs, like record-log fsyncs, go through a GroupCommitter: writers
+that arrive within one commit window share a single fsync per directory/log.
+"""
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from privacy.record_log import RecordLog
+from privacy.store import SecureStore, fsync_dir
+
+DEFAULT_IO_WORKERS = 4
+DEFAULT_COMMIT_WINDOW_SECONDS = 0.002
+
+
+class GroupCommitter:
+    """
+    Batches durability work: submit(key, sync) returns a future resolved once a
+    sync for key has run after the submit. Everything submitted while a batch is
+    being gathered or synced is covered by the next batch, one sync per key.
+    """
+
+    def __init__(self, window: float = DEFAULT_COMMIT_WINDOW_SECONDS):
+        self.window = window
+        self.batches = 0
+        self.syncs = 0
+        self.requests = 0
+        self._pending: Dict[Hashable, Tuple[Callable[[], None], List[concurrent.futures.Future]]] = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="healwise-group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, key: Hashable, sync: Callable[[], None]) -> concurrent.futures.Future:
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("GroupCommitter is closed")
+            self._pending.setdefault(key, (sync, []))[1].append(future)
+            self.requests += 1
+            self._condition.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending and self._closed:
+                    return
+            if self.window > 0:
+                time.sleep(self.window)  # Let concurrent writers join this batch
+            with self._condition:
+                batch, self._pending = self._pending, {}
+            self.batches += 1
+            for sync, futures in batch.values():
+                self.syncs += 1
+                try:
+                    sync()
+                except Exception as e:
+                    for future in futures:
+                        future.set_exception(e)
+                else:
+                    for future in futures:
+                        future.set_result(None)
+
+    def stats(self) -> Dict:
+        return {"requests": self.requests, "batches": self.batches, "syncs": self.syncs}
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout=5)
+
+
+class AsyncSecureStore:
+    def __init__(self, store: SecureStore, max_workers: int = DEFAULT_IO_WORKERS,
+                 commit_window: float = DEFAULT_COMMIT_WINDOW_SECONDS):
+        """
+        Args:
+            store: SecureStore doing the encryption (e.g. KeyManager.store_for(user_id))
+            max_workers: Threads in the dedicated I/O pool
+            commit_window: Seconds a group commit waits for more writers
+        """
+        self.store = store
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="healwise-securestore")
+        self.committer = GroupCommitter(commit_window)
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def save(self, path, data: dict):
+        """Encrypt and atomically replace path; returns once the rename is durable"""
+        path = os.fspath(path)
+
+        def write():
+            # File contents are fsynced before the rename; the directory fsync is grouped
+            with self.store.open_writer(path) as writer:
+                writer.write_record(data)
+
+        await self._run(write)
+        directory = os.path.dirname(os.path.abspath(path))
+        await asyncio.wrap_future(self.committer.submit(("dir", directory), lambda: fsync_dir(path)))
+
+    async def load(self, path) -> Any:
+        return await self._run(self.store.load, path)
+
+    async def append(self, log: RecordLog, record: Any) -> int:
+        """Append to a record log; returns the id once the append is fsynced (group commit)"""
+        record_id = await self._run(log.append, record)
+        await asyncio.wrap_future(self.committer.submit(("log", log.path), log.sync))
+        return record_id
+
+    def close(self):
+        self.committer.close()
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,159 @@
+"""
+Blind index for keyword search over encrypted HealWise records
+At write time each record's words and adjacent word pairs are turned into keyed
+HMAC tokens and appended to a separate postings file, so a lookup (e.g. a crisis
+term) hashes the query and only the matching records are ever decrypted.
+Tokens are deterministic per key: they hide the words, not how often a token
+repeats, which is the usual blind-index trade-off.
+
+Layout:
+    index = entry*, entry = token (16 bytes, truncated HMAC-SHA256) | record id (u64 BE)
+"""
+import hashlib
+import hmac
+import os
+import re
+import struct
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Set
+
+ENTRY = struct.Struct(">16sQ")
+TOKEN_SIZE = 16
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def words(text: str) -> List[str]:
+    """Normalized words: lowercase, apostrophes kept ("can't"), single letters dropped"""
+    return [word for word in WORD_PATTERN.findall(text.lower()) if len(word) > 1]
+
+
+def record_text(record: Any) -> str:
+    """All string values of a JSON record, joined (what gets indexed)"""
+    if isinstance(record, str):
+        return record
+    if isinstance(record, dict):
+        return "\n".join(record_text(value) for value in record.values())
+    if isinstance(record, list):
+        return "\n".join(record_text(value) for value in record)
+    return ""
+
+
+class BlindIndex:
+    def __init__(self, path, key: bytes):
+        """
+        Args:
+            path: Postings file (append-only)
+            key: HMAC key, independent of the record encryption key
+        """
+        self.path = os.fspath(path)
+        self._key = key
+        self._postings: Dict[bytes, array] = {}
+        self._lock = threading.Lock()
+        self.max_id = -1
+        self._max_tokens: Set[bytes] = set()  # Tokens posted for max_id
+        self._load()
+        self._file = open(self.path, "ab")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        whole = len(raw) - len(raw) % ENTRY.size
+        for token, record_id in ENTRY.iter_unpack(raw[:whole]):
+            self._postings.setdefault(token, array("Q")).append(record_id)
+            self._track_max(record_id, [token])
+        if whole < len(raw):
+            os.truncate(self.path, whole)  # Torn final entry
+
+    def _track_max(self, record_id: int, tokens: Iterable[bytes]):
+        if record_id > self.max_id:
+            self.max_id = record_id
+            self._max_tokens = set()
+        if record_id == self.max_id:
+            self._max_tokens.update(tokens)
+
+    def token(self, term: str) -> bytes:
+        return hmac.new(self._key, term.encode("utf-8"), hashlib.sha256).digest()[:TOKEN_SIZE]
+
+    def tokens(self, text: str) -> Set[bytes]:
+        """Tokens for every word and adjacent word pair in text"""
+        terms = words(text)
+        return {self.token(term) for term in terms} | {
+            self.token(f"{first} {second}") for first, second in zip(terms, terms[1:])
+        }
+
+    def add(self, record_id: int, tokens: Iterable[bytes]):
+        entries = [ENTRY.pack(token, record_id) for token in tokens]
+        with self._lock:
+            self._file.write(b"".join(entries))
+            self._file.flush()
+            for entry in entries:
+                self._postings.setdefault(entry[:TOKEN_SIZE], array("Q")).append(record_id)
+            self._track_max(record_id, (entry[:TOKEN_SIZE] for entry in entries))
+
+    def reindex_last(self, tokens: Iterable[bytes]):
+        """
+        Complete max_id's postings. A crash can tear its write at an entry boundary, leaving
+        only some of them; the missing entries are appended so the record is found again.
+        """
+        with self._lock:
+            missing = set(tokens) - self._max_tokens
+        if missing:
+            self.add(self.max_id, missing)
+
+    def query_tokens(self, query: str) -> List[bytes]:
+        """One word → its token; a phrase → the tokens of its adjacent word pairs"""
+        terms = words(query)
+        if len(terms) == 1:
+            return [self.token(terms[0])]
+        return [self.token(f"{first} {second}") for first, second in zip(terms, terms[1:])]
+
+    def lookup(self, query: str) -> Set[int]:
+        """Candidate record ids whose postings hold every token of the query"""
+        tokens = self.query_tokens(query)
+        if not tokens:
+            return set()
+        with self._lock:
+            postings = [self._postings.get(token) for token in tokens]
+        if any(posting is None for posting in postings):
+            return set()
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+        return candidates
+
+    def rewrite(self, keep: Set[int]):
+        """Drop postings of records that no longer exist (run after log compaction)"""
+        with self._lock:
+            self._postings = {
+                token: kept for token, kept in (
+                    (token, array("Q", (record_id for record_id in ids if record_id in keep)))
+                    for token, ids in self._postings.items()
+                ) if kept
+            }
+            tmp_path = self.path + ".compact"
+            with open(tmp_path, "wb") as f:
+                f.write(b"".join(
+                    ENTRY.pack(token, record_id) for token, ids in self._postings.items() for record_id in ids
+                ))
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "ab")
+
+    def sync(self):
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"tokens": len(self._postings), "postings": sum(len(ids) for ids in self._postings.values())}
+
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,210 @@
+"""
+Envelope encryption keys for HealWise SecureStore
+Every user gets their own data key; only its wrapped form (encrypted under the
+master key) is persisted in the keyring. Unwrapped keys live in a bounded
+LRU cache with a TTL, as ready-to-use SecureStore objects, so hot users cost a
+dict lookup per operation. Rotating the master key re-wraps the data keys and
+never touches stored payloads.
+
+Keyring: a SQLite database with one row per user, so adding a user writes one row
+whatever the number of users, and several processes can share it safely (SQLite
+serializes the writers; a user created concurrently keeps the first key written).
+Each thread has its own connection and keyring I/O runs outside the cache lock, so
+a miss waiting on another process's write never holds up other users' cache hits.
+    meta(name, value)               master_key_id = "<sha256 prefix>"
+    wrapped_keys(user_id, wrapped)  wrapped data key
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from privacy.store import SecureStore
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL_SECONDS = 300.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS wrapped_keys (user_id TEXT PRIMARY KEY, wrapped TEXT NOT NULL);
+"""
+
+
+def key_id(key: bytes) -> str:
+    """Short, non-secret fingerprint of a key"""
+    return hashlib.sha256(key).hexdigest()[:16]
+
+
+class KeyManager:
+    def __init__(self, master_key: bytes, path, cache_size: int = DEFAULT_CACHE_SIZE,
+                 cache_ttl: float = DEFAULT_CACHE_TTL_SECONDS, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            master_key: Fernet key that wraps every data key (keep it outside the keyring)
+            path: Keyring SQLite database of wrapped data keys
+            cache_size: Unwrapped data keys kept in memory
+            cache_ttl: Seconds an unwrapped key may stay cached
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.path = os.fspath(path)
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.clock = clock
+        # (Fernet, key id), replaced as one reference so readers never mix two masters
+        self._wrapping = (Fernet(master_key), key_id(master_key))
+        self._cache: "OrderedDict[str, Tuple[float, SecureStore]]" = OrderedDict()
+        self._lock = threading.Lock()  # Cache dict and counters only - no keyring I/O under it
+        self._rotate_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        db = self._connection()
+        db.executescript(SCHEMA)
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("INSERT OR IGNORE INTO meta VALUES ('master_key_id', ?)", (self._master_id,))
+            self._check_master(db, self._master_id)
+        finally:
+            db.execute("COMMIT")
+
+    @property
+    def _master_id(self) -> str:
+        return self._wrapping[1]
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; SQLite (WAL, 30s busy timeout) serializes the writers
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: transactions are explicit (BEGIN IMMEDIATE below)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def _check_master(db: sqlite3.Connection, master_id: str):
+        """Caller holds a write transaction, so a concurrent rotation can't slip in"""
+        row = db.execute("SELECT value FROM meta WHERE name = 'master_key_id'").fetchone()
+        if row[0] != master_id:
+            raise ValueError("Keyring was wrapped with a different master key")
+
+    def _unwrap_or_create(self, user_id: str) -> bytes:
+        wrapping = self._wrapping
+        try:
+            return self._unwrap_or_create_with(user_id, *wrapping)
+        except ValueError:
+            with self._rotate_lock:
+                pass  # Let a rotation that already committed publish its master
+            if self._wrapping is wrapping:
+                raise
+            # This process rotated the master mid-lookup - retry under the new one
+            return self._unwrap_or_create_with(user_id, *self._wrapping)
+
+    def _unwrap_or_create_with(self, user_id: str, master: Fernet, master_id: str) -> bytes:
+        db = self._connection()
+        row = db.execute("SELECT wrapped FROM wrapped_keys WHERE user_id = ?", (user_id,)).fetchone()
+        if row is not None:
+            try:
+                return master.decrypt(row[0].encode("ascii"))
+            except InvalidToken:
+                raise ValueError("Keyring was re-wrapped with a different master key") from None
+        candidate = master.encrypt(Fernet.generate_key()).decode("ascii")
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            self._check_master(db, master_id)
+            # Another process (or thread) may have created this user first - its key wins
+            db.execute("INSERT OR IGNORE INTO wrapped_keys VALUES (?, ?)", (user_id, candidate))
+            wrapped = db.execute("SELECT wrapped FROM wrapped_keys WHERE user_id = ?", (user_id,)).fetchone()[0]
+        finally:
+            db.execute("COMMIT")
+        return master.decrypt(wrapped.encode("ascii"))
+
+    def store_for(self, user_id: str) -> SecureStore:
+        """SecureStore keyed with the user's data key, created on first use"""
+        now = self.clock()
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached is not None and cached[0] > now:
+                self._cache.move_to_end(user_id)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        # May wait on another process's write transaction - outside the cache lock
+        store = SecureStore(self._unwrap_or_create(user_id))
+        with self._lock:
+            self._cache[user_id] = (now + self.cache_ttl, store)
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return store
+
+    def has_key(self, user_id: str) -> bool:
+        return self._connection().execute("SELECT 1 FROM wrapped_keys WHERE user_id = ?", (user_id,)).fetchone() is not None
+
+    def forget(self, user_id: str) -> bool:
+        """Destroy a user's data key - everything encrypted under it becomes unreadable"""
+        deleted = self._connection().execute("DELETE FROM wrapped_keys WHERE user_id = ?", (user_id,)).rowcount > 0
+        with self._lock:
+            self._cache.pop(user_id, None)
+        return deleted
+
+    def rotate_master(self, new_master_key: bytes) -> int:
+        """
+        Re-wrap every data key under new_master_key and persist the keyring; returns
+        the number of keys re-wrapped. Data keys (and so all payloads) are unchanged,
+        which also keeps the unwrapped-key cache valid.
+        """
+        new_wrapping = (Fernet(new_master_key), key_id(new_master_key))
+        with self._rotate_lock:
+            master, master_id = self._wrapping
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                self._check_master(db, master_id)
+                rows = db.execute("SELECT user_id, wrapped FROM wrapped_keys").fetchall()
+                db.executemany("UPDATE wrapped_keys SET wrapped = ? WHERE user_id = ?", [
+                    (new_wrapping[0].encrypt(master.decrypt(wrapped.encode("ascii"))).decode("ascii"), user_id)
+                    for user_id, wrapped in rows
+                ])
+                db.execute("UPDATE meta SET value = ? WHERE name = 'master_key_id'", (new_wrapping[1],))
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+            self._wrapping = new_wrapping
+            return len(rows)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict:
+        users = self._connection().execute("SELECT COUNT(*) FROM wrapped_keys").fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "users": users,
+                "cached": len(self._cache),
+                "cache_size": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "master_key_id": self._master_id,
+            }
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,374 @@
+"""
+Append-only encrypted record log for HealWise SecureStore
+Each record is sealed on its own (AES-GCM, random nonce, record id and kind as
+associated data) and appended as one length-prefixed frame, so adding a
+conversation turn costs O(record size) however long the history is. A sidecar
+index of (id, offset, length, kind) entries gives random access without
+scanning the log. Deletes append tombstones; compaction copies live frames
+verbatim (no re-encryption) into a fresh log on a background thread.
+With a search key, records are also blind-indexed (privacy/blind_index.py) so
+search() decrypts only the records whose tokens match.
+
+Layout:
+    log   = MAGIC | frame*
+    frame = length (u32 BE) | kind (u8) | id (u64 BE) | nonce (12) | ciphertext+tag
+    index = entry*, entry = id (u64) | offset (u64) | size (u32) | kind (u8), in log order
+"""
+import json
+import os
+import struct
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from privacy.blind_index import BlindIndex, record_text, words
+
+MAGIC = b"HWL1"
+FRAME_HEADER = struct.Struct(">IBQ")
+INDEX_ENTRY = struct.Struct(">QQIB")
+NONCE_SIZE = 12
+DATA, TOMBSTONE = 0, 1
+DEFAULT_GARBAGE_RATIO = 0.5  # Compact once dead bytes exceed this share of the log
+
+Entry = Tuple[int, int, int, int]  # (id, offset, size, kind); size includes the frame header
+
+
+def _aad(kind: int, record_id: int) -> bytes:
+    return struct.pack(">BQ", kind, record_id)
+
+
+class RecordLog:
+    def __init__(self, path, key: bytes, search_key: Optional[bytes] = None):
+        """
+        Args:
+            path: Log file; the index lives next to it as <path>.idx
+            key: 32-byte AES-GCM key (SecureStore.open_log derives it from the Fernet key)
+            search_key: HMAC key for the blind index at <path>.bidx (None disables search)
+        """
+        self.path = os.fspath(path)
+        self.index_path = self.path + ".idx"
+        self._aead = AESGCM(key)
+        self._lock = threading.RLock()
+        self._compact_stop = threading.Event()
+        self._compact_thread: Optional[threading.Thread] = None
+        self.compactions = 0
+        self._open()
+        self.blind_index = BlindIndex(self.path + ".bidx", search_key) if search_key else None
+        if self.blind_index is not None:
+            # Records that reached the log but not (or only partly) the blind index before a crash
+            last_indexed = self.blind_index.max_id
+            for record_id in self.ids():
+                if record_id == last_indexed:
+                    self.blind_index.reindex_last(self.blind_index.tokens(record_text(self.get(record_id))))
+                elif record_id > last_indexed:
+                    self.blind_index.add(record_id, self.blind_index.tokens(record_text(self.get(record_id))))
+
+    def _open(self):
+        if not os.path.exists(self.path):
+            with open(self.path, "wb") as f:
+                f.write(MAGIC)
+            open(self.index_path, "wb").close()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND)
+        if os.pread(self._fd, len(MAGIC), 0) != MAGIC:
+            os.close(self._fd)
+            raise InvalidToken()
+        if not os.path.exists(self.index_path):
+            open(self.index_path, "wb").close()
+
+        self._live: Dict[int, Tuple[int, int]] = {}  # id -> (offset, size)
+        self._garbage = 0
+        self._next_id = 0
+        self._end = len(MAGIC)
+        log_size = os.fstat(self._fd).st_size
+
+        # The index is a prefix of the log: keep entries that fit, then index the tail
+        with open(self.index_path, "rb") as f:
+            raw = f.read()
+        indexed = 0
+        for entry in INDEX_ENTRY.iter_unpack(raw[:len(raw) - len(raw) % INDEX_ENTRY.size]):
+            if entry[1] + entry[2] > log_size:
+                break
+            self._apply(entry)
+            indexed += INDEX_ENTRY.size
+        self._index_file = open(self.index_path, "r+b")
+        self._index_file.truncate(indexed)
+        self._index_file.seek(indexed)
+        self._index_tail(log_size)
+
+    def _index_tail(self, log_size: int):
+        """Index frames the log gained after the index was last written; cut off a torn frame"""
+        tail: List[Entry] = []
+        offset = self._end
+        while offset + FRAME_HEADER.size <= log_size:
+            length, kind, record_id = FRAME_HEADER.unpack(os.pread(self._fd, FRAME_HEADER.size, offset))
+            size = FRAME_HEADER.size + length
+            if offset + size > log_size:
+                break
+            tail.append((record_id, offset, size, kind))
+            offset += size
+        if offset < log_size:
+            os.ftruncate(self._fd, offset)
+        self._commit_entries(tail)
+
+    def _apply(self, entry: Entry):
+        record_id, offset, size, kind = entry
+        self._next_id = max(self._next_id, record_id + 1)
+        if kind == DATA:
+            self._live[record_id] = (offset, size)
+        else:
+            dead = self._live.pop(record_id, None)
+            self._garbage += size + (dead[1] if dead else 0)
+        self._end = offset + size
+
+    def _commit_entries(self, entries: List[Entry]):
+        for entry in entries:
+            self._apply(entry)
+        if entries:
+            self._index_file.write(b"".join(INDEX_ENTRY.pack(*entry) for entry in entries))
+            self._index_file.flush()
+
+    def _frame(self, kind: int, record_id: int, payload: bytes) -> bytes:
+        nonce = os.urandom(NONCE_SIZE)
+        sealed = nonce + self._aead.encrypt(nonce, payload, _aad(kind, record_id))
+        return FRAME_HEADER.pack(len(sealed), kind, record_id) + sealed
+
+    def _write_frames(self, frames: List[Tuple[int, int, bytes]]) -> List[int]:
+        """
+        Append (kind, id, frame) triples, then index them. os.write may write less than
+        asked; loop until done, and on error cut the log back to the last whole frame.
+        """
+        offset = self._end
+        entries = []
+        for kind, record_id, frame in frames:
+            entries.append((record_id, offset, len(frame), kind))
+            offset += len(frame)
+        buffer = memoryview(b"".join(frame for _, _, frame in frames))
+        try:
+            while buffer:
+                buffer = buffer[os.write(self._fd, buffer):]
+        except BaseException:
+            os.ftruncate(self._fd, self._end)
+            raise
+        self._commit_entries(entries)
+        return [record_id for _, record_id, _ in frames]
+
+    def append(self, record: Any) -> int:
+        """Encrypt and append one record; returns its id"""
+        return self.append_many([record])[0]
+
+    def append_many(self, records: Iterable[Any]) -> List[int]:
+        records = list(records)
+        payloads = [json.dumps(record).encode("utf-8") for record in records]
+        tokens = [self.blind_index.tokens(record_text(record)) for record in records] if self.blind_index else None
+        with self._lock:
+            first = self._next_id
+            frames = [(DATA, first + i, self._frame(DATA, first + i, payload)) for i, payload in enumerate(payloads)]
+            ids = self._write_frames(frames) if frames else []
+            if tokens is not None:
+                for record_id, record_tokens in zip(ids, tokens):
+                    self.blind_index.add(record_id, record_tokens)
+            return ids
+
+    def get(self, record_id: int) -> Any:
+        """Read and decrypt a single record by id (KeyError when missing or deleted)"""
+        with self._lock:
+            offset, size = self._live[record_id]
+            frame = os.pread(self._fd, size, offset)
+        return self._open_frame(frame)
+
+    def _open_frame(self, frame: bytes) -> Any:
+        _, kind, record_id = FRAME_HEADER.unpack_from(frame)
+        nonce = frame[FRAME_HEADER.size:FRAME_HEADER.size + NONCE_SIZE]
+        try:
+            payload = self._aead.decrypt(nonce, frame[FRAME_HEADER.size + NONCE_SIZE:], _aad(kind, record_id))
+        except InvalidTag:
+            raise InvalidToken() from None
+        return json.loads(payload)
+
+    def delete(self, record_id: int) -> bool:
+        """Append a tombstone; the record's bytes are reclaimed by compaction"""
+        with self._lock:
+            if record_id not in self._live:
+                return False
+            self._write_frames([(TOMBSTONE, record_id, self._frame(TOMBSTONE, record_id, b""))])
+            return True
+
+    def ids(self) -> List[int]:
+        with self._lock:
+            return sorted(self._live)
+
+    def iter_records(self, start: int = 0) -> Iterator[Tuple[int, Any]]:
+        """(id, record) pairs for live records with id >= start, in id order"""
+        for record_id in self.ids():
+            if record_id >= start:
+                try:
+                    yield record_id, self.get(record_id)
+                except KeyError:
+                    continue  # Deleted while iterating
+
+    def search(self, query: str) -> List[Tuple[int, Any]]:
+        """
+        (id, record) pairs containing the word or phrase, in id order. Only blind-index
+        candidates are decrypted; phrases are then checked for word order.
+        """
+        if self.blind_index is None:
+            raise ValueError("Log was opened without a search key")
+        with self._lock:
+            candidates = sorted(self.blind_index.lookup(query) & self._live.keys())
+        phrase = " ".join(words(query))
+        matches = []
+        for record_id in candidates:
+            try:
+                record = self.get(record_id)
+            except KeyError:
+                continue
+            if " " not in phrase or f" {phrase} " in f" {' '.join(words(record_text(record)))} ":
+                matches.append((record_id, record))
+        return matches
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    # ---- compaction ----
+
+    def garbage_ratio(self) -> float:
+        with self._lock:
+            return self._garbage / max(self._end - len(MAGIC), 1)
+
+    def compact(self) -> int:
+        """
+        Rewrite the log with live records only; returns bytes reclaimed.
+        Live frames are copied without the lock held, so appends and deletes keep
+        flowing; whatever landed meanwhile is replayed under the lock before the swap.
+        """
+        with self._lock:
+            snapshot_end = self._end
+            live = sorted(self._live.items())
+            fd = os.dup(self._fd)
+        tmp_path = self.path + ".compact"
+        tmp_index_path = self.index_path + ".compact"
+        try:
+            with open(tmp_path, "wb") as log, open(tmp_index_path, "wb") as index:
+                log.write(MAGIC)
+                new: Dict[int, Tuple[int, int]] = {}
+                offset = len(MAGIC)
+                for record_id, (old_offset, size) in live:
+                    log.write(os.pread(fd, size, old_offset))
+                    new[record_id] = (offset, size)
+                    offset += size
+
+                with self._lock:
+                    # Replay frames appended since the snapshot (new records and tombstones)
+                    tail = os.pread(self._fd, self._end - snapshot_end, snapshot_end)
+                    position = 0
+                    while position < len(tail):
+                        length, kind, record_id = FRAME_HEADER.unpack_from(tail, position)
+                        size = FRAME_HEADER.size + length
+                        if kind == DATA:
+                            log.write(tail[position:position + size])
+                            new[record_id] = (offset, size)
+                            offset += size
+                        else:
+                            new.pop(record_id, None)
+                        position += size
+                    if self._next_id and self._next_id - 1 not in new:
+                        # Keep a tombstone for the highest id so deleted ids are never reused
+                        frame = self._frame(TOMBSTONE, self._next_id - 1, b"")
+                        log.write(frame)
+                        index_tail = INDEX_ENTRY.pack(self._next_id - 1, offset, len(frame), TOMBSTONE)
+                        offset += len(frame)
+                    else:
+                        index_tail = b""
+                    index.write(b"".join(
+                        INDEX_ENTRY.pack(record_id, record_offset, size, DATA)
+                        for record_id, (record_offset, size) in sorted(new.items(), key=lambda item: item[1][0])
+                    ) + index_tail)
+                    for f in (log, index):
+                        f.flush()
+                        os.fsync(f.fileno())
+
+                    reclaimed = self._end - offset
+                    # Drop the old index first: a crash between the renames leaves
+                    # no index (rebuilt by scanning) rather than a mismatched one
+                    os.remove(self.index_path)
+                    os.replace(tmp_path, self.path)
+                    os.replace(tmp_index_path, self.index_path)
+                    os.close(self._fd)
+                    self._index_file.close()
+                    self._open()
+                    if self.blind_index is not None:
+                        self.blind_index.rewrite(set(self._live))
+                    self.compactions += 1
+                    return reclaimed
+        finally:
+            os.close(fd)
+            for leftover in (tmp_path, tmp_index_path):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+    def start_compacting(self, interval: float = 60.0, garbage_ratio: float = DEFAULT_GARBAGE_RATIO) -> threading.Thread:
+        """Compact on a daemon thread whenever the dead share of the log passes garbage_ratio"""
+        if self._compact_thread is None or not self._compact_thread.is_alive():
+            self._compact_stop.clear()
+            self._compact_thread = threading.Thread(
+                target=self._compact_loop, args=(interval, garbage_ratio), name="healwise-log-compactor", daemon=True
+            )
+            self._compact_thread.start()
+        return self._compact_thread
+
+    def stop_compacting(self):
+        self._compact_stop.set()
+        if self._compact_thread is not None:
+            self._compact_thread.join(timeout=5)
+            self._compact_thread = None
+
+    def _compact_loop(self, interval: float, garbage_ratio: float):
+        while not self._compact_stop.wait(interval):
+            try:
+                if self.garbage_ratio() >= garbage_ratio:
+                    self.compact()
+            except Exception as e:
+                print(f"⚠️ Record log compaction error: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "records": len(self._live),
+                "next_id": self._next_id,
+                "log_bytes": self._end,
+                "garbage_bytes": self._garbage,
+                "compactions": self.compactions,
+            }
+
+    def sync(self):
+        """
+        fsync the log and the blind index postings; the offset index needs no fsync since
+        it is rebuilt from the log tail on open
+        """
+        with self._lock:
+            fd = os.dup(self._fd)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if self.blind_index is not None:
+            self.blind_index.sync()
+
+    def close(self):
+        self.stop_compacting()
+        with self._lock:
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._index_file.close()
+                if self.blind_index is not None:
+                    self.blind_index.close()
+                self._fd = -1
+
+    def __enter__(self) -> "RecordLog":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,16 +1,125 @@
-import json , os 
+import json , os , uuid
+from typing import Any, Iterator
 from cryptography.fernet import Fernet
 
+from privacy.record_log import RecordLog
+from privacy.stream import DEFAULT_CHUNK_SIZE, StreamWriter, derive_stream_key, is_stream, iter_chunks
+
+def fsync_dir(path):
+    """Persist a rename: fsync the directory that holds path"""
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class RecordWriter:
+    """
+    Streams newline-delimited JSON records into a SecureStore file.
+    Writes go to a temp file that replaces path only on a clean close(), so a
+    crash mid-write never leaves a half-written file behind.
+    """
+
+    def __init__(self, path, stream_key: bytes|None, chunk_size: int = DEFAULT_CHUNK_SIZE, durable: bool = True):
+        self.path = os.fspath(path)
+        self.tmp_path = f"{self.path}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+        self.durable = durable
+        self.file = open(self.tmp_path, "wb")
+        try:
+            self.stream = StreamWriter(self.file, stream_key, chunk_size) if stream_key else self.file
+        except BaseException:
+            self.file.close()
+            os.remove(self.tmp_path)
+            raise
+        self.encoder = json.JSONEncoder()
+        self.records = 0
+
+    def write_record(self, record: Any):
+        # iterencode keeps big objects from being rendered into one string first
+        for piece in self.encoder.iterencode(record):
+            self.stream.write(piece.encode("utf-8"))
+        self.stream.write(b"\n")
+        self.records += 1
+
+    def close(self, commit: bool = True):
+        """Finish the file and rename it into place (fsynced first when durable); commit=False discards it"""
+        if self.file.closed:
+            return
+        try:
+            if commit:
+                if self.stream is not self.file:
+                    self.stream.close()
+                self.file.flush()
+                if self.durable:
+                    os.fsync(self.file.fileno())
+        finally:
+            self.file.close()
+        if commit:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
 class SecureStore:
     def __init__(self,key:bytes|None):
         self.fernet = Fernet(key) if key else None
-    
-    def save(self , path , data:dict):
-        raw = json.dumps(data).encode("utf-8")
-        blob = self.fernet.encrypt(raw) if self.fernet else raw
-        with open (path , "wb") as f:f.write(blob)
-        
+        self.fernet_key = key
+        self.stream_key = derive_stream_key(key) if key else None
+
+    def save(self , path , data:dict, durable: bool = True):
+        """
+        Write data as a single-record chunked container (bounded memory while encrypting).
+        Atomic: temp file + fsync + rename, then the directory is fsynced when durable.
+        """
+        with self.open_writer(path, durable=durable) as writer:
+            writer.write_record(data)
+        if durable:
+            fsync_dir(path)
+
+    def open_writer(self, path, chunk_size: int = DEFAULT_CHUNK_SIZE, durable: bool = True) -> RecordWriter:
+        """Streaming writer for exports/backups: call write_record() per record"""
+        return RecordWriter(path, self.stream_key, chunk_size, durable)
+
+    def open_log(self, path, searchable: bool = False) -> RecordLog:
+        """
+        Append-only record log: per-record encryption, so adding a turn never rewrites history.
+        searchable=True also keeps a blind keyword index so RecordLog.search() decrypts only matches.
+        """
+        if not self.fernet:
+            raise ValueError("Record logs are always encrypted; SecureStore needs a key")
+        search_key = derive_stream_key(self.fernet_key, b"healwise-securestore-blind-index-v1") if searchable else None
+        return RecordLog(path, derive_stream_key(self.fernet_key, b"healwise-securestore-log-v1"), search_key)
+
+    def iter_records(self, path) -> Iterator[Any]:
+        """Yield records one at a time, decrypting one chunk at a time (legacy Fernet files: one record)"""
+        with open(path, "rb") as f:
+            if self.fernet and not is_stream(f):
+                yield json.loads(self.fernet.decrypt(f.read()))
+                return
+            chunks = iter_chunks(f, self.stream_key) if self.fernet else iter(lambda: f.read(DEFAULT_CHUNK_SIZE), b"")
+            pending = b""
+            for chunk in chunks:
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    if line:
+                        yield json.loads(line)
+            if pending.strip():
+                yield json.loads(pending)
+
     def load(self,path):
-        blob = open(path , "rb").read()
-        raw  = self.fernet.decrypt(blob) if self.fernet else blob
-        return json.loads(raw)
\ No newline at end of file
+        """The saved object (as written by save); multi-record files are read with iter_records"""
+        records = self.iter_records(path)
+        try:
+            record = next(records)
+        except StopIteration:
+            raise ValueError(f"{path} holds no record") from None
+        if next(records, records) is not records:
+            records.close()
+            raise ValueError(f"{path} holds several records - read it with iter_records")
+        return record
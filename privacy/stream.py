@@ -0,0 +1,127 @@
+"""
+Chunked authenticated-encryption container for HealWise SecureStore
+Plaintext is split into fixed-size chunks, each sealed with AES-GCM under a
+STREAM-style nonce (random prefix || chunk counter || last-chunk flag), so files
+are written and read with bounded memory and truncation, reordering or splicing
+of chunks fails authentication.
+
+Layout:
+    header  = MAGIC (4) | chunk_size (u32 BE) | nonce_prefix (7)
+    chunk_i = AES-GCM(key, nonce_prefix | i (u32 BE) | last (1), plaintext_i, aad=header)
+Every chunk but the last holds exactly chunk_size plaintext bytes; the last holds
+0..chunk_size, so even an empty stream ends with one authenticated chunk.
+"""
+import base64
+import os
+import struct
+from typing import BinaryIO, Iterator
+
+from cryptography.fernet import InvalidToken
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+MAGIC = b"HWS1"
+DEFAULT_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+NONCE_PREFIX_SIZE = 7
+TAG_SIZE = 16
+HEADER = struct.Struct(">4sI7s")
+MAX_CHUNKS = 2 ** 32
+
+
+def derive_stream_key(fernet_key: bytes, info: bytes = b"healwise-securestore-stream-v1") -> bytes:
+    """AES-256 key for the container, derived from a Fernet key with HKDF-SHA256"""
+    raw = base64.urlsafe_b64decode(fernet_key)
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=info).derive(raw)
+
+
+def _nonce(prefix: bytes, counter: int, last: bool) -> bytes:
+    if counter >= MAX_CHUNKS:
+        raise ValueError("Stream too long for the chunk counter")
+    return prefix + struct.pack(">I?", counter, last)
+
+
+class StreamWriter:
+    """Encrypts bytes written to it into fileobj, one chunk at a time"""
+
+    def __init__(self, fileobj: BinaryIO, key: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk_size must be in 1..{MAX_CHUNK_SIZE}")
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self._aead = AESGCM(key)
+        self._prefix = os.urandom(NONCE_PREFIX_SIZE)
+        self._header = HEADER.pack(MAGIC, chunk_size, self._prefix)
+        self._buffer = bytearray()
+        self._counter = 0
+        self.closed = False
+        fileobj.write(self._header)
+
+    def write(self, data: bytes) -> int:
+        if self.closed:
+            raise ValueError("write to closed StreamWriter")
+        self._buffer += data
+        # Keep at least one byte back so close() always has a final chunk to seal
+        while len(self._buffer) > self.chunk_size:
+            self._seal(bytes(self._buffer[:self.chunk_size]), last=False)
+            del self._buffer[:self.chunk_size]
+        return len(data)
+
+    def _seal(self, plaintext: bytes, last: bool):
+        nonce = _nonce(self._prefix, self._counter, last)
+        self.fileobj.write(self._aead.encrypt(nonce, plaintext, self._header))
+        self._counter += 1
+
+    def close(self):
+        """Seal the final chunk; the stream is unreadable without it"""
+        if not self.closed:
+            self._seal(bytes(self._buffer), last=True)
+            self._buffer.clear()
+            self.closed = True
+
+    def __enter__(self) -> "StreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_chunks(fileobj: BinaryIO, key: bytes) -> Iterator[bytes]:
+    """
+    Decrypt a container chunk by chunk. Raises InvalidToken on a wrong key, any
+    tampering, or a stream cut off before its final chunk.
+    """
+    header = fileobj.read(HEADER.size)
+    if len(header) != HEADER.size:
+        raise InvalidToken()
+    magic, chunk_size, prefix = HEADER.unpack(header)
+    if magic != MAGIC or not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise InvalidToken()
+
+    aead = AESGCM(key)
+    block_size = chunk_size + TAG_SIZE
+    counter = 0
+    block = fileobj.read(block_size)
+    while True:
+        # One block of lookahead tells us whether the current block is the last
+        following = fileobj.read(block_size) if len(block) == block_size else b""
+        last = not following
+        try:
+            yield aead.decrypt(_nonce(prefix, counter, last), block, header)
+        except InvalidTag:
+            raise InvalidToken() from None
+        if last:
+            return
+        block = following
+        counter += 1
+
+
+def is_stream(fileobj: BinaryIO) -> bool:
+    """True when fileobj (at its current position) starts a container; position is restored"""
+    position = fileobj.tell()
+    try:
+        return fileobj.read(len(MAGIC)) == MAGIC
+    finally:
+        fileobj.seek(position)
@@ -7,7 +7,11 @@ Enhanced for therapeutic response quality
 import subprocess
 import json
 from enum import Enum
-from typing import Dict, Any, Tuple
+import re
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from utils.bulkhead import Bulkhead, BulkheadFull
+from utils.circuit_breaker import CircuitBreaker, CircuitOpen
 
 class Risk(Enum):
     """Risk levels per copilot-instructions.md: SAFE/LOW/MODERATE/HIGH/CRISIS"""
@@ -17,31 +21,47 @@ class Risk(Enum):
     HIGH = "HIGH"
     CRISIS = "CRISIS"
 
+# Immediate crisis keywords - these override the LLM and every usage limit
+CRISIS_KEYWORDS = [
+    "kill myself", "end my life", "suicide plan", "want to die",
+    "going to hurt myself", "end it all", "tonight", "right now"
+]
+
+def has_crisis_keywords(text: str) -> bool:
+    """Cheap lexicon check, safe to run before any model or LLM call"""
+    text_lower = (text or "").lower()
+    return any(keyword in text_lower for keyword in CRISIS_KEYWORDS)
+
 def assess_crisis_signals(text: str, probs: Dict[str, float]) -> Risk:
     """
     Assess crisis signals with enhanced therapeutic context
     Per copilot-instructions.md: uses mistral:latest for nuanced assessment
     """
+    return assess_risk(text, probs)[0]
+
+def assess_risk(text: str, probs: Dict[str, float]) -> Tuple[Risk, bool]:
+    """
+    assess_crisis_signals that also reports (risk, llm_skipped): when the LLM bulkhead
+    is saturated or Ollama's circuit is open the heuristic answers at once.
+    """
     if not text or not text.strip():
-        return Risk.SAFE
+        return Risk.SAFE, False
     
     text_lower = text.lower()
     
     # Immediate crisis keywords (override LLM for safety)
-    crisis_keywords = [
-        "kill myself", "end my life", "suicide plan", "want to die",
-        "going to hurt myself", "end it all", "tonight", "right now"
-    ]
-    
-    if any(keyword in text_lower for keyword in crisis_keywords):
-        return Risk.CRISIS
-    
-    # Get LLM therapeutic assessment
-    llm_risk, therapeutic_context = _therapeutic_llm_assessment(text, probs)
+    if has_crisis_keywords(text_lower):
+        return Risk.CRISIS, False
     
     # Get heuristic baseline
     heuristic_risk = _heuristic_assessment(text_lower, probs)
     
+    # Get LLM therapeutic assessment
+    llm_result = _guarded_llm_assessment(text, probs)
+    if llm_result is None:
+        return heuristic_risk, True
+    llm_risk, therapeutic_context = llm_result
+    
     # Take higher risk for safety, but preserve therapeutic context
     final_risk = _max_risk(heuristic_risk, llm_risk)
     
@@ -49,7 +69,170 @@ def assess_crisis_signals(text: str, probs: Dict[str, float]) -> Risk:
     if hasattr(assess_crisis_signals, '_last_therapeutic_context'):
         assess_crisis_signals._last_therapeutic_context = therapeutic_context
     
-    return final_risk
+    return final_risk, False
+
+def assess_provisional(text: str, probs: Dict[str, float]) -> Tuple[Risk, bool]:
+    """
+    Deferred-LLM variant of assess_crisis_signals: returns (risk, provisional).
+    Crisis keywords answer at once; a SAFE/LOW heuristic is returned provisionally
+    (refine_risk confirms it later); anything higher still waits for the full assessment,
+    and is provisional too if the LLM was saturated.
+    """
+    if not text or not text.strip():
+        return Risk.SAFE, False
+    if has_crisis_keywords(text):
+        return Risk.CRISIS, False
+    heuristic_risk = _heuristic_assessment(text.lower(), probs)
+    if heuristic_risk in (Risk.SAFE, Risk.LOW):
+        return heuristic_risk, True
+    return assess_risk(text, probs)
+
+def refine_risk(text: str, probs: Dict[str, float], provisional: Risk) -> Risk:
+    """LLM pass for a provisional risk; like assess_crisis_signals it never lowers the risk"""
+    llm_result = _guarded_llm_assessment(text, probs)
+    if llm_result is None:
+        return provisional
+    llm_risk, therapeutic_context = llm_result
+    if hasattr(assess_crisis_signals, '_last_therapeutic_context'):
+        assess_crisis_signals._last_therapeutic_context = therapeutic_context
+    return _max_risk(provisional, llm_risk)
+
+DEFAULT_BATCH_SIZE = 8
+
+def assess_batch(texts: Sequence[str], probs_list: Sequence[Dict[str, float]],
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> List[Risk]:
+    """
+    assess_crisis_signals for many texts (offline re-scoring, /analyze/batch): up to
+    batch_size texts share one Ollama generation that answers with a JSON array of
+    risk levels. Items the batch answer doesn't cover are retried one by one, until a
+    retry fails or the circuit opens: from then on the heuristic answers alone, so a
+    hanging Ollama costs one timeout per chunk and retry, not one per text.
+    """
+    results: List[Optional[Risk]] = [None] * len(texts)
+    pending = []
+    for i, (text, probs) in enumerate(zip(texts, probs_list)):
+        if not text or not text.strip():
+            results[i] = Risk.SAFE
+        elif has_crisis_keywords(text):
+            results[i] = Risk.CRISIS
+        else:
+            pending.append(i)
+
+    llm_down = False
+    for start in range(0, len(pending), batch_size):
+        chunk = pending[start:start + batch_size]
+        if llm_down or get_ollama_breaker().is_open():
+            llm_risks = [None] * len(chunk)
+        else:
+            llm_risks = _guarded_batch_assessment([texts[i] for i in chunk], [probs_list[i] for i in chunk])
+        for i, llm_risk in zip(chunk, llm_risks):
+            if llm_risk is None and not llm_down:
+                # Failed item - retry it alone (a batch of one, so a failure shows as None)
+                llm_risk = _guarded_batch_assessment([texts[i]], [probs_list[i]])[0]
+                llm_down = llm_risk is None
+            heuristic_risk = _heuristic_assessment(texts[i].lower(), probs_list[i])
+            results[i] = heuristic_risk if llm_risk is None else _max_risk(heuristic_risk, llm_risk)
+    return results
+
+def _batched_llm_assessment(texts: Sequence[str], probs_list: Sequence[Dict[str, float]]) -> List[Optional[Risk]]:
+    """One generation for several texts; None for every item the answer doesn't cover"""
+    items = []
+    for number, (text, probs) in enumerate(zip(texts, probs_list), 1):
+        top_emotions = sorted(probs.items(), key=lambda x: x[1], reverse=True)[:3]
+        emotions_str = ", ".join([f"{emotion}: {prob:.2f}" for emotion, prob in top_emotions])
+        items.append(f"{number}. {json.dumps(text)} (key emotions: {emotions_str or 'none'})")
+    texts_str = "\n".join(items)
+
+    prompt = f"""You are a mental health assessment AI. Rate the crisis risk of each numbered text below.
+
+{texts_str}
+
+Use exactly one of SAFE, LOW, MODERATE, HIGH or CRISIS per text.
+
+Guidelines:
+- SAFE: Positive content, mild everyday concerns
+- LOW: Stress, worry, but coping mechanisms intact  
+- MODERATE: Significant distress, hopelessness, isolation
+- HIGH: Self-harm ideation, severe depression, substance abuse
+- CRISIS: Immediate suicide risk, specific plans, imminent danger
+
+Respond with only a JSON array of {len(items)} risk levels in the same order, e.g. ["SAFE", "MODERATE"].
+
+Assessment:"""
+
+    try:
+        result = get_ollama_breaker().call(_run_ollama, prompt)
+    except CircuitOpen:
+        raise
+    except Exception:
+        return [None] * len(items)
+    return _parse_risk_array(result.stdout, len(items))
+
+def _parse_risk_array(output: str, count: int) -> List[Optional[Risk]]:
+    """
+    Risk levels from a batched answer: the first [...] in the output, as JSON or, failing
+    that, the risk words inside it. Entries may be strings or {"risk": ...} objects.
+    A list of the wrong length can't be aligned with the texts, so every item fails.
+    """
+    start = output.find("[")
+    end = output.find("]", start)
+    if start < 0 or end < 0:
+        return [None] * count
+    body = output[start:end + 1]
+    try:
+        entries = json.loads(body)
+    except ValueError:
+        entries = re.findall(r"[A-Za-z]+", body)
+    if not isinstance(entries, list) or len(entries) != count:
+        return [None] * count
+
+    risks: List[Optional[Risk]] = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            entry = entry.get("risk")
+        try:
+            risks.append(Risk(str(entry).strip().upper()))
+        except ValueError:
+            risks.append(None)
+    return risks
+
+_llm_bulkhead = None
+_ollama_breaker = None
+
+def get_llm_bulkhead():
+    """Concurrency limit shared by every LLM assessment (HEALWISE_LLM_* env, created on first use)"""
+    global _llm_bulkhead
+    if _llm_bulkhead is None:
+        _llm_bulkhead = Bulkhead.from_env()
+    return _llm_bulkhead
+
+def get_ollama_breaker():
+    """Circuit breaker around the Ollama subprocess (HEALWISE_LLM_BREAKER_* env, created on first use)"""
+    global _ollama_breaker
+    if _ollama_breaker is None:
+        _ollama_breaker = CircuitBreaker.from_env(probe=_ollama_healthy)
+    return _ollama_breaker
+
+def _guarded_llm_assessment(text: str, probs: Dict[str, float]) -> Optional[Tuple[Risk, str]]:
+    """
+    _therapeutic_llm_assessment behind the circuit breaker and the bulkhead; None when
+    the circuit is open or no slot is free in time
+    """
+    if get_ollama_breaker().is_open():
+        return None  # Ollama is down - don't even queue for it
+    try:
+        return get_llm_bulkhead().call(_therapeutic_llm_assessment, text, probs)
+    except (BulkheadFull, CircuitOpen):
+        return None
+
+def _guarded_batch_assessment(texts: Sequence[str], probs_list: Sequence[Dict[str, float]]) -> List[Optional[Risk]]:
+    """_batched_llm_assessment with the same guards; the whole batch takes one bulkhead slot"""
+    if get_ollama_breaker().is_open():
+        return [None] * len(texts)
+    try:
+        return get_llm_bulkhead().call(_batched_llm_assessment, texts, probs_list)
+    except (BulkheadFull, CircuitOpen):
+        return [None] * len(texts)
 
 def _therapeutic_llm_assessment(text: str, probs: Dict[str, float]) -> Tuple[Risk, str]:
     """
@@ -80,14 +263,7 @@ Then on a new line, provide therapeutic context in 1-2 sentences describing the
 
 Assessment:"""
 
-        result = subprocess.run([
-            "ollama", "run", "mistral:latest"
-        ], 
-        input=prompt, 
-        text=True, 
-        capture_output=True, 
-        timeout=30
-        )
+        result = get_ollama_breaker().call(_run_ollama, prompt)
         
         if result.returncode == 0:
             response_lines = result.stdout.strip().split('\n')
@@ -112,10 +288,30 @@ Assessment:"""
         else:
             return Risk.SAFE, ""
             
+    except CircuitOpen:
+        raise  # Not an answer - the caller skips the LLM
     except Exception:
         # Fallback to SAFE per copilot-instructions.md
         return Risk.SAFE, ""
 
+def _run_ollama(prompt: str) -> subprocess.CompletedProcess:
+    """One generation; a non-zero exit raises so the circuit breaker counts it as a failure"""
+    result = subprocess.run([
+        "ollama", "run", "mistral:latest"
+    ], 
+    input=prompt, 
+    text=True, 
+    capture_output=True, 
+    timeout=30
+    )
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, "ollama run", result.stdout, result.stderr)
+    return result
+
+def _ollama_healthy() -> bool:
+    """Breaker probe: `ollama list` answers without loading a model"""
+    return subprocess.run(["ollama", "list"], capture_output=True, timeout=5).returncode == 0
+
 def _heuristic_assessment(text_lower: str, probs: Dict[str, float]) -> Risk:
     """Enhanced heuristic assessment with therapeutic patterns"""
     
@@ -1,11 +1,157 @@
 # safety/bias.py
+"""
+Person-first language rewriting for HealWise
+All rules are compiled into one alternation, so de_stigmatize() makes a single
+pass over the text however many rules there are. Each rule is wrapped in its own
+capturing group and the group index of a match maps back to its replacement.
+At any position the first listed rule that matches wins.
+Extra rules can be loaded from a JSON file ({pattern: replacement}, same shape as
+REPLACEMENTS) named by HEALWISE_BIAS_RULES, and reloaded with reload_rules().
+Rule patterns can't use backreferences or named groups: inside the alternation the
+group numbers shift and names may clash, so such rules are rejected at load time.
+StreamingDeStigmatizer applies the same rules to text that arrives in chunks.
+"""
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+MAX_RULE_WIDTH = 256  # Holdback cap for rules with unbounded repeats
+
+# A backslash-digit backreference preceded by an even number of backslashes
+_BACKREFERENCE = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]|\(\?P=")
+
 REPLACEMENTS = {
     r"\baddict\b": "person with a substance use disorder",
     r"\bschizo(phrenic)?\b": "person living with schizophrenia",
 }
 
-import re
+
+def _max_match_width(pattern: str) -> int:
+    """
+    Longest text the pattern can match, capped at MAX_RULE_WIDTH. Only the stdlib's
+    private regex parser knows this; if it is missing or changed, the cap is used,
+    which just makes streaming hold back more text.
+    """
+    try:
+        try:
+            from re import _parser as sre_parse  # Python 3.11+
+        except ImportError:
+            import sre_parse
+        width = sre_parse.parse(pattern, re.IGNORECASE).getwidth()[1]
+    except Exception:
+        return MAX_RULE_WIDTH
+    return min(width, MAX_RULE_WIDTH)
+
+
+def _check_rule(pattern: str, compiled: re.Pattern):
+    if compiled.groupindex or _BACKREFERENCE.search(pattern):
+        raise ValueError(
+            f"Bias rule {pattern!r} uses a backreference or named group; rules share one "
+            "alternation, so use plain (unnamed) groups without backreferences"
+        )
+
+
+class Rewriter:
+    """Compiled rule set: one regex, group index → replacement"""
+
+    def __init__(self, rules: Dict[str, str]):
+        self.rules = dict(rules)
+        parts: List[str] = []
+        self._group_rule: Dict[int, Tuple[str, Optional[re.Pattern]]] = {}
+        self.max_width = 0  # Longest text any rule can match (capped)
+        group = 1
+        for pattern, replacement in self.rules.items():
+            compiled = re.compile(pattern, re.IGNORECASE)
+            _check_rule(pattern, compiled)
+            self.max_width = max(self.max_width, _max_match_width(pattern))
+            parts.append(f"({pattern})")
+            # Replacements with backreferences are expanded by the rule's own regex
+            self._group_rule[group] = (replacement, compiled if "\\" in replacement else None)
+            group += 1 + compiled.groups  # Skip the rule's inner groups
+        self.pattern = re.compile("|".join(parts), re.IGNORECASE) if parts else None
+
+    def _replace(self, match: re.Match) -> str:
+        replacement, own_pattern = self._group_rule[match.lastindex]
+        if own_pattern is None:
+            return replacement
+        return own_pattern.sub(replacement, match.group(match.lastindex), count=1)
+
+    def rewrite(self, text: str) -> str:
+        if self.pattern is None or not text:
+            return text
+        return self.pattern.sub(self._replace, text)
+
+
+class StreamingDeStigmatizer:
+    """
+    Rewrites a chunked text stream (e.g. LLM tokens). feed() returns the text that
+    can no longer change and holds back only the last max_width + 1 characters:
+    a match starting earlier already has all its text plus the character after it
+    (for word boundaries). One emitted character is kept as left-hand context.
+    """
+
+    def __init__(self, rewriter: Optional[Rewriter] = None):
+        self.rewriter = rewriter or get_rewriter()
+        self.holdback = self.rewriter.max_width + 1
+        self._buffer = ""
+        self._context = 0  # Leading buffer characters that were already emitted
+
+    def _rewrite(self, limit: Optional[int]) -> str:
+        """Emit the buffer up to limit (None: everything), rewriting matches that start before it"""
+        buffer, pattern = self._buffer, self.rewriter.pattern
+        pieces: List[str] = []
+        position = self._context
+        if pattern is not None:
+            for match in pattern.finditer(buffer, self._context):
+                if limit is not None and match.start() >= limit:
+                    break
+                pieces.append(buffer[position:match.start()])
+                pieces.append(self.rewriter._replace(match))
+                position = match.end()
+        end = len(buffer) if limit is None else max(limit, position)
+        pieces.append(buffer[position:end])
+        self._buffer = buffer[end - 1:] if end else ""
+        self._context = 1 if self._buffer else 0
+        return "".join(pieces)
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        limit = len(self._buffer) - self.holdback
+        if limit <= self._context:
+            return ""
+        return self._rewrite(limit)
+
+    def flush(self) -> str:
+        """Emit whatever is held back; the filter can then take a new stream"""
+        text = self._rewrite(None)
+        self._buffer, self._context = "", 0
+        return text
+
+
+def load_rules(path: Optional[str] = None) -> Dict[str, str]:
+    """REPLACEMENTS plus the rules file (path or HEALWISE_BIAS_RULES), file rules last"""
+    rules = dict(REPLACEMENTS)
+    path = path or os.environ.get("HEALWISE_BIAS_RULES")
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            rules.update(json.load(f))
+    return rules
+
+
+_rewriter: Optional[Rewriter] = None
+
+
+def reload_rules(path: Optional[str] = None) -> Rewriter:
+    """Recompile the rule set; the swap is a single assignment, so concurrent callers are safe"""
+    global _rewriter
+    _rewriter = Rewriter(load_rules(path))
+    return _rewriter
+
+
+def get_rewriter() -> Rewriter:
+    return _rewriter or reload_rules()
+
+
 def de_stigmatize(text: str) -> str:
-    for pat, repl in REPLACEMENTS.items():
-        text = re.sub(pat, repl, text, flags=re.IGNORECASE)
-    return text
+    return get_rewriter().rewrite(text)
@@ -1,8 +1,166 @@
-import time 
-MAX_MINTUES = 30 
+"""
+Working-session usage limits for HealWise
+Per copilot instructions: safety extension point - nudges users to take breaks
+UsageLimitService tracks every user against one monotonic clock in flat
+NumPy arrays (one slot per user), so checks are O(1) and sweeps are vectorised.
+Crisis messages are never blocked - callers must skip enforcement for them.
+Limits are advisory: HealWise has no authentication, so the user id is whatever
+the client asserts and a client can reset its clock by changing or dropping it.
+They nudge cooperating clients towards breaks; they are not access control.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+MAX_MINUTES = 30    # Continuous working-session length before a break is required
+BREAK_MINUTES = 10  # Idle time that ends a working session (and lifts a block)
+
 
 class SessionTimer:
-    def __inits__(self): self.start = time.time()
-    def minutes(self): return (time.time()-self.start)/60
+    """Single-user timer (kept for compatibility; UsageLimitService handles many users)"""
+
+    def __init__(self): self.start = time.monotonic()
+    def minutes(self): return (time.monotonic()-self.start)/60
     def over_limit(self): return self.minutes()>MAX_MINUTES
-    
\ No newline at end of file
+
+
+class UsageLimitService:
+    def __init__(self, max_minutes: float = MAX_MINUTES, break_minutes: float = BREAK_MINUTES,
+                 capacity: int = 1024, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_minutes: Working-session length after which requests are refused
+            break_minutes: Gap without allowed activity that starts a fresh session
+            capacity: Initial user slots (arrays double when full)
+            clock: Monotonic time source shared by every user
+        """
+        self.max_seconds = max_minutes * 60
+        self.break_seconds = break_minutes * 60
+        self.clock = clock
+        self._slots: Dict[str, int] = {}
+        self._users: List[Optional[str]] = [None] * capacity
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        self._session_start = np.zeros(capacity, dtype=np.float64)
+        self._last_seen = np.zeros(capacity, dtype=np.float64)
+        self._active = np.zeros(capacity, dtype=bool)
+        # Bookkeeping for sweep()/stats() only: check() decides from the timestamps
+        self._over = np.zeros(capacity, dtype=bool)
+        self._lock = threading.Lock()
+        self._sweep_stop = threading.Event()
+        self._sweep_thread: Optional[threading.Thread] = None
+        self.blocked = 0
+
+    @classmethod
+    def from_env(cls) -> "UsageLimitService":
+        return cls(
+            max_minutes=float(os.environ.get("HEALWISE_MAX_SESSION_MINUTES", MAX_MINUTES)),
+            break_minutes=float(os.environ.get("HEALWISE_BREAK_MINUTES", BREAK_MINUTES)),
+        )
+
+    def _grow(self):
+        old = len(self._users)
+        new = old * 2
+        self._users.extend([None] * old)
+        self._free.extend(range(new - 1, old - 1, -1))
+        for name in ("_session_start", "_last_seen", "_active", "_over"):
+            array = getattr(self, name)
+            grown = np.zeros(new, dtype=array.dtype)
+            grown[:old] = array
+            setattr(self, name, grown)
+
+    def _slot(self, user_id: str, now: float) -> int:
+        slot = self._slots.get(user_id)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+            self._slots[user_id] = slot
+            self._users[slot] = user_id
+            self._session_start[slot] = now
+            self._last_seen[slot] = now
+            self._active[slot] = True
+            self._over[slot] = False
+        return slot
+
+    def check(self, user_id: str) -> Dict:
+        """
+        Record a request from user_id and decide whether it may proceed.
+        Refused requests don't count as activity, so stepping away lifts the block.
+        Returns {"allowed", "minutes_used", "retry_after"} (retry_after in seconds).
+        """
+        with self._lock:
+            now = self.clock()
+            slot = self._slot(user_id, now)
+            if now - self._last_seen[slot] >= self.break_seconds:
+                self._session_start[slot] = now  # Took a break - new working session
+                self._over[slot] = False
+            used = now - self._session_start[slot]
+            if used >= self.max_seconds:
+                self._over[slot] = True
+                self.blocked += 1
+                retry_after = self._last_seen[slot] + self.break_seconds - now
+                return {"allowed": False, "minutes_used": round(used / 60, 1), "retry_after": max(1, int(retry_after + 0.999))}
+            self._last_seen[slot] = now
+            return {"allowed": True, "minutes_used": round(used / 60, 1), "retry_after": 0}
+
+    def sweep(self) -> List[str]:
+        """
+        Batch pass over every slot: flag users whose working session has run past
+        the limit and free slots of users idle long enough that their session ended.
+        Returns the users newly flagged as over the limit (e.g. to send a break nudge).
+        Enforcement doesn't depend on it: check() alone refuses over-limit requests,
+        the sweep only bounds memory and feeds stats()["over_limit"].
+        """
+        with self._lock:
+            now = self.clock()
+            active = self._active
+            idle = active & (now - self._last_seen >= self.break_seconds)
+            for slot in np.flatnonzero(idle):
+                del self._slots[self._users[slot]]
+                self._users[slot] = None
+                self._free.append(int(slot))
+            active &= ~idle
+            self._over &= active
+
+            over = active & (now - self._session_start >= self.max_seconds) & ~self._over
+            self._over |= over
+            return [self._users[slot] for slot in np.flatnonzero(over)]
+
+    def start_sweeping(self, interval: float = 60.0,
+                       on_over_limit: Optional[Callable[[List[str]], None]] = None) -> threading.Thread:
+        """Run sweep() on a daemon thread every interval seconds, passing newly over-limit users to on_over_limit"""
+        if self._sweep_thread is None or not self._sweep_thread.is_alive():
+            self._sweep_stop.clear()
+            self._sweep_thread = threading.Thread(
+                target=self._sweep_loop, args=(interval, on_over_limit), name="healwise-usage-sweeper", daemon=True
+            )
+            self._sweep_thread.start()
+        return self._sweep_thread
+
+    def stop_sweeping(self):
+        self._sweep_stop.set()
+        if self._sweep_thread is not None:
+            self._sweep_thread.join(timeout=5)
+            self._sweep_thread = None
+
+    def _sweep_loop(self, interval: float, on_over_limit: Optional[Callable[[List[str]], None]]):
+        while not self._sweep_stop.wait(interval):
+            try:
+                over = self.sweep()
+                if over and on_over_limit is not None:
+                    on_over_limit(over)
+            except Exception as e:
+                print(f"⚠️ Usage sweep error: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "tracked_users": len(self._slots),
+                "over_limit": int(self._over.sum()),
+                "blocked_requests": self.blocked,
+                "capacity": len(self._users),
+                "max_minutes": self.max_seconds / 60,
+            }
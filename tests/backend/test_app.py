@@ -134,4 +134,209 @@ def test_analyze_model_error_handling(mock_score_probs, fastapi_client, sample_u
     assert response.status_code == 500
 
 def test_hello_world():
-    assert 1 + 1 == 2
\ No newline at end of file
+    assert 1 + 1 == 2
+
+
+def _receive_until_done(websocket):
+    events = []
+    while True:
+        event = websocket.receive_json()
+        events.append(event)
+        if event["type"] in ("done", "error", "closed"):
+            return events
+
+def test_ws_session_streams_stages(fastapi_client, sample_user_text):
+    """One connection streams each analysis stage and keeps session state across messages"""
+    with fastapi_client.websocket_connect("/ws/session") as websocket:
+        hello = websocket.receive_json()
+        assert hello["type"] == "session" and hello["session_id"]
+
+        websocket.send_json({"text": sample_user_text["negative"]})
+        events = _receive_until_done(websocket)
+        assert [e["type"] for e in events] == ["emotions", "risk", "support", "recommendations", "done"]
+        assert isinstance(events[2]["empathy"], str)
+
+        # Plain text frames work too; trend state carries over between messages
+        websocket.send_text("I still feel alone")
+        events = _receive_until_done(websocket)
+        assert events[1]["trend"]["messages_seen"] == 2
+        assert events[1]["insights"]["rolling"]["messages_seen"] == 2
+
+        websocket.send_json({"text": "   "})
+        assert websocket.receive_json()["type"] == "error"
+
+def test_ws_session_idle_ttl(fastapi_client, monkeypatch):
+    """Idle sessions are closed after the TTL"""
+    import app as app_module
+    monkeypatch.setattr(app_module, "WS_IDLE_TTL_SECONDS", 0.1)
+    with fastapi_client.websocket_connect("/ws/session") as websocket:
+        assert websocket.receive_json()["type"] == "session"
+        assert websocket.receive_json() == {"type": "closed", "reason": "idle"}
+
+def test_ws_session_resume(fastapi_client):
+    """Reconnecting with session_id resumes the cached session state"""
+    with fastapi_client.websocket_connect("/ws/session") as websocket:
+        session_id = websocket.receive_json()["session_id"]
+        websocket.send_json({"text": "Work keeps getting worse"})
+        _receive_until_done(websocket)
+
+    with fastapi_client.websocket_connect(f"/ws/session?session_id={session_id}") as websocket:
+        hello = websocket.receive_json()
+        assert hello["session_id"] == session_id and hello["resumed"] is True
+        websocket.send_json({"text": "Still worse today"})
+        events = _receive_until_done(websocket)
+        assert events[1]["trend"]["messages_seen"] == 2
+    assert fastapi_client.get("/health").json()["sessions"]["hits"] >= 1
+
+def test_ws_session_persists_user_and_bot_turns(fastapi_client, monkeypatch, tmp_path):
+    """With a session store, each exchange is written (off the event loop) as user + bot rows"""
+    import app as app_module
+    from services.session_store import SessionStore
+    from services.therapy_session import TherapySessionManager
+
+    store = SessionStore(tmp_path / "sessions.sqlite3")
+    monkeypatch.setattr(app_module, "session_manager", TherapySessionManager(store=store))
+    with fastapi_client.websocket_connect("/ws/session?user_id=u1") as websocket:
+        session_id = websocket.receive_json()["session_id"]
+        websocket.send_json({"text": "Work keeps getting worse"})
+        events = _receive_until_done(websocket)
+
+    messages = store.last_messages(session_id)
+    assert [m["role"] for m in messages] == ["user", "bot"]
+    assert messages[0]["meta"]["risk"] == events[1]["risk"]
+    assert messages[1]["text"] == events[2]["supportive_message"]
+    assert {m["user_id"] for m in messages} == {"u1"}
+
+
+def test_analyze_usage_limit_returns_429_but_never_blocks_crisis(fastapi_client):
+    """Users past their session limit get 429 + Retry-After; crisis text still goes through"""
+    import app as app_module
+    from safety.use_limits import UsageLimitService
+
+    previous = app_module.usage_limits
+    app_module.usage_limits = UsageLimitService(max_minutes=0)
+    try:
+        response = fastapi_client.post("/analyze", json={"text": "hello"}, headers={"X-User-Id": "tired"})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+        assert response.json()["allowed"] is False
+
+        response = fastapi_client.post("/analyze", json={"text": "I want to die"}, headers={"X-User-Id": "tired"})
+        assert response.status_code == 200
+        assert response.json()["risk"] == "CRISIS"
+
+        # No identity, no limit: a client address may be a proxy shared by many users
+        assert fastapi_client.post("/analyze", json={"text": "hello"}).status_code == 200
+    finally:
+        app_module.usage_limits = previous
+
+
+def test_deferred_risk_is_provisional_and_refined_over_websocket(fastapi_client, monkeypatch):
+    """With HEALWISE_DEFER_LLM_RISK, SAFE/LOW answers come first and the LLM result follows"""
+    import app as app_module
+    from safety import assessor
+    from utils.circuit_breaker import CircuitBreaker
+
+    monkeypatch.setattr(app_module, "DEFER_LLM_RISK", True)
+    monkeypatch.setattr(app_module, "risk_refiner", None)
+    monkeypatch.setattr(assessor, "_ollama_breaker", CircuitBreaker())  # Closed whatever earlier tests hit
+    monkeypatch.setattr(assessor, "_therapeutic_llm_assessment", lambda text, probs: (assessor.Risk.HIGH, ""))
+
+    with fastapi_client.websocket_connect("/ws/session") as websocket:
+        websocket.receive_json()
+        websocket.send_json({"text": "Had an ok day at work"})
+        events = _receive_until_done(websocket)
+        assert events[1]["provisional"] is True and events[1]["risk"] in ("SAFE", "LOW")
+
+        refined = websocket.receive_json()
+        assert refined["type"] == "risk_refined"
+        assert refined["risk"] == "HIGH" and refined["escalated"] is True
+        escalation = websocket.receive_json()
+        assert escalation["type"] == "escalation" and escalation["previous_risk"] == events[1]["risk"]
+        assert escalation["suggested_next_steps"]
+
+        # Crisis keywords never wait for (or defer to) the LLM
+        websocket.send_json({"text": "I want to kill myself"})
+        events = _receive_until_done(websocket)
+        assert events[1]["risk"] == "CRISIS" and events[1]["provisional"] is False
+
+
+def test_deferred_risk_analyze_returns_refinement_id(fastapi_client, monkeypatch):
+    import app as app_module
+    from safety import assessor
+    from utils.circuit_breaker import CircuitBreaker
+
+    monkeypatch.setattr(app_module, "DEFER_LLM_RISK", True)
+    monkeypatch.setattr(app_module, "risk_refiner", None)
+    monkeypatch.setattr(assessor, "_ollama_breaker", CircuitBreaker())  # Closed whatever earlier tests hit
+    monkeypatch.setattr(assessor, "_therapeutic_llm_assessment", lambda text, probs: (assessor.Risk.SAFE, ""))
+
+    data = fastapi_client.post("/analyze", json={"text": "Had an ok day at work"}).json()
+    assert data["risk_provisional"] is True
+    assert data["refinement_id"]
+
+
+def test_crisis_fast_lane_skips_llm_and_recommendations(fastapi_client, monkeypatch):
+    """Crisis keywords get the precomputed crisis payload without waiting on the LLM"""
+    from safety import assessor
+
+    def no_llm(text, probs):
+        raise AssertionError("the crisis fast lane must not call the LLM")
+
+    monkeypatch.setattr(assessor, "_therapeutic_llm_assessment", no_llm)
+    data = fastapi_client.post("/analyze", json={"text": "I want to kill myself"}).json()
+    assert data["risk"] == "CRISIS"
+    assert data["suggested_next_steps"][0].startswith("Call 988")
+    assert list(data["recommendations"]) == ["resources"]
+
+    with fastapi_client.websocket_connect("/ws/session") as websocket:
+        websocket.receive_json()
+        websocket.send_json({"text": "I want to kill myself"})
+        events = _receive_until_done(websocket)
+        assert [e["type"] for e in events] == ["emotions", "risk", "support", "done"]
+        assert events[-1]["fast_lane"] is True
+
+    crisis = fastapi_client.get("/metrics").json()["latency"]["crisis"]
+    assert crisis["count"] >= 2 and crisis["slo_p99_ms"] > 0
+
+
+def test_saturated_llm_marks_analyze_response(fastapi_client, monkeypatch):
+    from safety import assessor
+    from utils.bulkhead import Bulkhead
+    from utils.circuit_breaker import CircuitBreaker
+
+    monkeypatch.setattr(assessor, "_llm_bulkhead", Bulkhead(capacity=0, max_queue=0))
+    monkeypatch.setattr(assessor, "_ollama_breaker", CircuitBreaker())
+    data = fastapi_client.post("/analyze", json={"text": "I feel hopeless"}).json()
+    assert data["llm_skipped"] is True
+
+    bulkhead = fastapi_client.get("/metrics").json()["llm_bulkhead"]
+    assert bulkhead["rejected"] == 1 and bulkhead["queue_depth"] == 0
+
+
+def test_analyze_batch_scores_every_text(fastapi_client, monkeypatch):
+    from safety import assessor
+
+    monkeypatch.setattr(assessor, "_guarded_batch_assessment", lambda texts, probs_list: [assessor.Risk.LOW] * len(texts))
+    response = fastapi_client.post("/analyze/batch", json={"texts": ["Had an ok day", "I want to kill myself"]})
+    assert response.status_code == 200
+    assert [r["risk"] for r in response.json()["results"]] == ["LOW", "CRISIS"]
+
+    too_many = fastapi_client.post("/analyze/batch", json={"texts": ["hi"] * 101})
+    assert too_many.status_code == 413
+
+
+@pytest.mark.parametrize("probs,risk,tag", [
+    ({"joy": 0.9}, "SAFE", "positive"),
+    ({"joy": 0.9}, "MODERATE", "supportive"),  # Never cheerful at elevated risk
+    ({"anger": 0.8}, "LOW", "supportive"),
+    ({"neutral": 0.8}, "SAFE", "neutral"),
+    ({"fear": 0.7}, "LOW", "anxiety_high"),
+    ({"joy": 0.9}, "HIGH", "suicide_high"),
+])
+def test_empathy_tag_only_cheers_clearly_positive_low_risk(probs, risk, tag):
+    from app import _empathy_tag
+    from utils.empathy import RESPONSES
+
+    assert _empathy_tag(probs, risk) == tag
+    assert tag in RESPONSES
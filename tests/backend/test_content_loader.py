@@ -0,0 +1,122 @@
+"""
+Tests for HealWise ContentLoader hot reload
+Edits to backend/data/*.json must go live atomically without a restart
+"""
+import json
+import os
+import sys
+import time
+
+import pytest
+
+# Follow HealWise sys.path pattern
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+backend_path = os.path.join(repo_root, 'backend')
+for path in [repo_root, backend_path]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from services.content_loader import ContentLoader, ContentValidationError
+from services.recommendation_engine import RecommendationEngine
+
+
+def _write(data_dir, filename, data, bump=0):
+    path = data_dir / filename
+    path.write_text(json.dumps(data), encoding="utf-8")
+    # Guarantee a visible mtime change even on coarse-grained filesystems
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump * 1_000_000_000))
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Minimal content catalog covering two categories"""
+    _write(tmp_path, "quotes.json", {"SAFE": ["Keep going."], "crisis": ["You matter."]})
+    _write(tmp_path, "movies.json", {"safe": [{"title": "Paddington", "description": "Kind bear"}]})
+    return tmp_path
+
+
+def test_initial_load_normalizes_risk_keys(data_dir):
+    """Risk keys are lowercased and missing files load as empty"""
+    loader = ContentLoader(data_dir)
+    assert loader.version == 1
+    assert loader.get_content_by_risk("quotes", "SAFE") == ["Keep going."]
+    assert loader.get_content_by_risk("books", "safe") == []
+    assert "safe" in loader.quotes
+
+
+def test_reload_swaps_snapshot_and_bumps_version(data_dir):
+    """Changed files are re-parsed and published as a new version"""
+    loader = ContentLoader(data_dir)
+    old_snapshot = loader.snapshot
+    assert loader.reload() is False  # Nothing changed
+
+    _write(data_dir, "quotes.json", {"safe": ["Fresh start."]}, bump=5)
+    assert loader.reload() is True
+    assert loader.version == 2
+    assert loader.get_content_by_risk("quotes", "safe") == ["Fresh start."]
+    # A request holding the old snapshot keeps a consistent view
+    assert old_snapshot.get_content_by_risk("quotes", "safe") == ["Keep going."]
+    # Untouched categories carry over without rebuilding their indexes
+    assert loader.get_content_by_risk("movies", "safe")[0]["title"] == "Paddington"
+    assert loader.snapshot._indexes["movies"] is old_snapshot._indexes["movies"]
+
+
+def test_invalid_reload_keeps_current_snapshot(data_dir):
+    """Broken JSON or missing fields never replace live content"""
+    loader = ContentLoader(data_dir)
+
+    (data_dir / "quotes.json").write_text("{not json", encoding="utf-8")
+    os.utime(data_dir / "quotes.json", ns=(0, 10**18))
+    assert loader.reload() is False
+    assert loader.version == 1
+    assert loader.last_error
+
+    _write(data_dir, "quotes.json", {"safe": ["Fixed."]}, bump=9)
+    _write(data_dir, "movies.json", {"safe": [{"title": "No description"}]}, bump=7)
+    assert loader.reload() is False
+    assert loader.version == 1
+    assert "description" in loader.last_error
+    assert loader.get_content_by_risk("movies", "safe")[0]["description"] == "Kind bear"
+
+
+def test_reload_rejects_bad_emotion_weights(data_dir):
+    """Non-numeric or negative emotion weights are rejected and recorded, not raised"""
+    loader = ContentLoader(data_dir)
+    for bump, weight in enumerate(["high", None, -1.0, float("nan")], 1):
+        _write(data_dir, "movies.json", {"safe": [
+            {"title": "Paddington", "description": "Kind bear", "emotions": {"joy": weight}}]}, bump=bump)
+        assert loader.reload() is False
+        assert "emotions.joy" in loader.last_error
+    assert loader.version == 1
+    assert loader.get_content_by_risk("movies", "safe")[0]["description"] == "Kind bear"
+
+
+def test_initial_load_rejects_invalid_content(tmp_path):
+    """Invalid content fails loudly at startup"""
+    _write(tmp_path, "books.json", {"safe": [{"title": "Missing author", "description": "x"}]})
+    with pytest.raises(ContentValidationError):
+        ContentLoader(tmp_path)
+
+
+def test_watcher_picks_up_changes(data_dir):
+    """Background watcher reloads without an explicit call"""
+    loader = ContentLoader(data_dir)
+    loader.start_watching(interval=0.05)
+    try:
+        _write(data_dir, "quotes.json", {"safe": ["Watched."]}, bump=3)
+        deadline = time.time() + 5
+        while loader.version == 1 and time.time() < deadline:
+            time.sleep(0.05)
+        assert loader.version == 2
+    finally:
+        loader.stop_watching()
+
+
+def test_recommendations_use_current_content(data_dir):
+    """RecommendationEngine reads from the live snapshot"""
+    loader = ContentLoader(data_dir)
+    engine = RecommendationEngine(loader)
+    recs = engine.get_personalized_recommendations("SAFE", {"joy": 0.9})
+    assert recs["quotes"] == ["Keep going."]
+    assert recs["movies"] == ["Paddington - Kind bear"]
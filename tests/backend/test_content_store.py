@@ -0,0 +1,159 @@
+"""
+Tests for the HealWise SQLite content catalog
+The database must serve the same content as the JSON files it was built from
+"""
+import json
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# Follow HealWise sys.path pattern
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+backend_path = os.path.join(repo_root, 'backend')
+for path in [repo_root, backend_path]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from services.content_attributes import duration_minutes, item_attributes, preference_filters
+from services.content_loader import ContentLoader
+from services.content_store import SQLiteContentStore, build_database
+
+MOVIES = {
+    "SAFE": [
+        {"title": "Paddington", "genre": "Family, Comedy", "description": "Kind bear brings joy and laughs"},
+        {"title": "Inside Out", "genre": "Animation", "description": "Understanding sadness and comfort"},
+        {"title": "Free Solo", "genre": "Documentary", "description": "Courage and focus"},
+    ]
+}
+EXERCISES = {
+    "safe": [
+        {"exercise": "Box Breathing", "duration": "5 minutes", "benefit": "Calms anxiety"},
+        {"exercise": "Long Walk", "duration": "1-2 hours", "benefit": "Clears the mind"},
+        {"exercise": "Check-in", "duration": "As needed", "benefit": "Grounding"},
+    ]
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    (tmp_path / "movies.json").write_text(json.dumps(MOVIES), encoding="utf-8")
+    (tmp_path / "exercises.json").write_text(json.dumps(EXERCISES), encoding="utf-8")
+    (tmp_path / "quotes.json").write_text(json.dumps({"safe": ["Keep going."]}), encoding="utf-8")
+    return tmp_path
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("5 minutes", 5.0),
+    ("5-10 minutes", 10.0),
+    ("1-2 hours", 120.0),
+    ("As needed", None),
+])
+def test_duration_minutes(text, expected):
+    """Durations parse to their upper bound in minutes"""
+    assert duration_minutes(text) == expected
+
+
+def test_item_attributes():
+    """Genres split on commas; numeric attributes stay numeric"""
+    assert item_attributes("movies", MOVIES["SAFE"][0]) == {"genre": ["family", "comedy"]}
+    assert item_attributes("exercises", EXERCISES["safe"][1]) == {"duration_minutes": 120.0}
+    assert item_attributes("quotes", "Keep going.") == {}
+
+
+def test_store_matches_json(data_dir, tmp_path):
+    """The database serves the same buckets, in order, as the JSON files"""
+    db_path = tmp_path / "content.sqlite3"
+    sizes = build_database(data_dir, db_path)
+    assert sizes["movies/safe"] == 3
+    store = SQLiteContentStore(db_path)
+    assert store.get_content_by_risk("movies", "SAFE") == MOVIES["SAFE"]
+    assert store.get_content_by_risk("books", "safe") == []
+    assert store.category("quotes") == {"safe": ["Keep going."]}
+
+
+def test_attribute_filters(data_dir, tmp_path):
+    """Genre and duration filters use the attribute indexes"""
+    db_path = tmp_path / "content.sqlite3"
+    build_database(data_dir, db_path)
+    store = SQLiteContentStore(db_path)
+    comedies = store.sample("movies", "safe", k=5, filters=(("any", "genre", ("comedy",)),))
+    assert [m["title"] for m in comedies] == ["Paddington"]
+    short = store.sample("exercises", "safe", k=5, filters=(("max", "duration_minutes", 30.0),))
+    # "As needed" has no duration, so a maximum never excludes it
+    assert sorted(e["exercise"] for e in short) == ["Box Breathing", "Check-in"]
+
+
+@pytest.mark.parametrize("preferences", [
+    {"exclude_genres": ["documentary", "family"]},
+    {"genres": "Animation"},
+    {"max_exercise_minutes": 10},
+    {"exclude_genres": ["drama"], "max_exercise_minutes": 200},
+])
+def test_store_filters_match_snapshot(data_dir, tmp_path, preferences):
+    """SQL filters and in-memory bitsets select the same items"""
+    db_path = tmp_path / "content.sqlite3"
+    build_database(data_dir, db_path)
+    store = SQLiteContentStore(db_path)
+    snapshot = ContentLoader(data_dir).snapshot
+    for content_type, filters in preference_filters(preferences).items():
+        expected = snapshot.select(content_type, "safe", {}, k=10, jitter=0, filters=filters)
+        actual = store.select(content_type, "safe", {}, k=10, jitter=0, filters=filters)
+        key = lambda item: json.dumps(item, sort_keys=True)
+        assert sorted(actual, key=key) == sorted(expected, key=key)
+
+
+def test_select_ranks_by_emotion(data_dir, tmp_path):
+    """Emotion scoring matches the in-memory snapshot"""
+    db_path = tmp_path / "content.sqlite3"
+    build_database(data_dir, db_path)
+    store = SQLiteContentStore(db_path)
+    json_snapshot = ContentLoader(data_dir).snapshot
+    for emotions in ({"joy": 0.9}, {"sadness": 0.9}):
+        expected = json_snapshot.select("movies", "safe", emotions, k=3, jitter=0)
+        assert store.select("movies", "safe", emotions, k=3, jitter=0) == expected
+
+
+def test_loader_sqlite_backend_builds_once_and_reloads(data_dir):
+    """The database is built on first start and swapped in when replaced"""
+    loader = ContentLoader(data_dir, backend="sqlite")
+    db_path = data_dir / "content.sqlite3"
+    assert db_path.exists()
+    assert loader.get_content_by_risk("quotes", "safe") == ["Keep going."]
+    assert loader.reload() is False
+
+    (data_dir / "quotes.json").write_text(json.dumps({"safe": ["Fresh start."]}), encoding="utf-8")
+    assert loader.reload(force=True) is True
+    assert loader.version == 2
+    assert loader.quotes == {"safe": ["Fresh start."]}
+
+
+def test_loader_sqlite_backend_rebuilds_on_json_edits_and_closes_old_store(data_dir, monkeypatch):
+    """Editing the JSON source rebuilds the database; the replaced store's connections are closed"""
+    from services import content_loader
+
+    monkeypatch.setattr(content_loader, "RETIRED_STORE_GRACE_SECONDS", 0)
+    loader = ContentLoader(data_dir, backend="sqlite")
+    old_store = loader.snapshot
+    old_store.get_content_by_risk("quotes", "safe")
+    assert len(old_store._connections) == 1
+
+    path = data_dir / "quotes.json"
+    path.write_text(json.dumps({"safe": ["Fresh start."]}), encoding="utf-8")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 5_000_000_000))
+    assert loader.reload() is True
+    assert loader.quotes == {"safe": ["Fresh start."]}
+    assert old_store._connections == []
+    assert loader.reload() is False
+
+    # A restart sees the database is older than its JSON source and rebuilds it
+    path.write_text(json.dumps({"safe": ["Newer still."]}), encoding="utf-8")
+    os.utime(path, ns=(0, (data_dir / "content.sqlite3").stat().st_mtime_ns + 5_000_000_000))
+    assert ContentLoader(data_dir, backend="sqlite").quotes == {"safe": ["Newer still."]}
+
+
+def test_loader_rejects_unknown_backend(data_dir):
+    with pytest.raises(ValueError):
+        ContentLoader(data_dir, backend="redis")
@@ -155,4 +155,51 @@ def test_early_warning_limits():
         assert len(warnings) <= 3  # Should limit to top 3 warnings
         
     except ImportError:
-        pytest.skip("early warning system not available")
\ No newline at end of file
+        pytest.skip("early warning system not available")
+
+
+def test_session_trend_rising_distress():
+    """Distress climbing over the last 5 messages raises a trend warning"""
+    from backend.safety.early_warning import SessionTrend, generate_early_warnings, RISING_WARNING
+
+    trend = SessionTrend()
+    sadness_levels = [0.1, 0.3, 0.5, 0.7, 0.9]
+    for i, sadness in enumerate(sadness_levels):
+        warnings = generate_early_warnings("Today was hard", {"sadness": sadness}, "LOW", trend=trend)
+        if i < len(sadness_levels) - 1:
+            assert RISING_WARNING not in warnings  # Window not full yet
+    assert RISING_WARNING in warnings
+    assert trend.slope == pytest.approx(0.1)
+
+
+def test_session_trend_sliding_slope_matches_refit():
+    """Running sums give the same slope as refitting the window from scratch"""
+    from backend.safety.early_warning import SessionTrend
+
+    trend = SessionTrend(window=5)
+    scores = []
+    for sadness in [0.9, 0.2, 0.6, 0.1, 0.8, 0.4, 0.7, 0.3]:
+        scores.append(trend.update({"sadness": sadness}, "SAFE"))
+    window = scores[-5:]
+    n = len(window)
+    mean_x, mean_y = (n - 1) / 2, sum(window) / n
+    expected = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(window)) / sum((x - mean_x) ** 2 for x in range(n))
+    assert trend.slope == pytest.approx(expected)
+    assert len(trend.scores) == 5
+
+
+def test_session_trend_elevated_run_accepts_enum_and_string():
+    """Risk run-length works with the Risk enum and plain strings"""
+    from backend.safety.early_warning import SessionTrend, ELEVATED_RUN_WARNING
+    from safety.assessor import Risk
+
+    trend = SessionTrend()
+    for risk in [Risk.MODERATE, "HIGH", Risk.HIGH]:
+        trend.update({"fear": 0.5}, risk)
+    assert trend.elevated_run == 3
+    assert trend.risk_run == 2
+    assert ELEVATED_RUN_WARNING in trend.warnings()
+
+    trend.update({"joy": 0.9}, Risk.SAFE)
+    assert trend.elevated_run == 0
+    assert ELEVATED_RUN_WARNING not in trend.warnings()
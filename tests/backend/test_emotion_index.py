@@ -0,0 +1,68 @@
+"""
+Tests for HealWise emotion-indexed recommendation selection
+Top-k items come from one matrix-vector product over item emotion weights
+"""
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# Follow HealWise sys.path pattern
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+backend_path = os.path.join(repo_root, 'backend')
+for path in [repo_root, backend_path]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from services.emotion_index import EmotionIndex, emotion_vector, item_emotion_weights, GO_EMOTIONS_LABELS
+
+ITEMS = [
+    {"exercise": "Box Breathing", "benefit": "Calms anxiety and stress", "duration": "5 minutes"},
+    {"exercise": "Dance Break", "benefit": "Fun way to celebrate and laugh", "duration": "10 minutes"},
+    {"exercise": "Letter to Self", "benefit": "Self-compassion", "duration": "15 minutes",
+     "emotions": {"sadness": 1.0}},
+]
+
+
+def test_explicit_tags_override_inference():
+    """Items with an "emotions" tag use it verbatim"""
+    assert item_emotion_weights(ITEMS[2]) == {"sadness": 1.0}
+    inferred = item_emotion_weights(ITEMS[0])
+    assert inferred.get("nervousness", 0) > 0
+
+
+def test_emotion_vector_ignores_unknown_labels():
+    """Request dicts map onto the 28 go_emotions dimensions"""
+    vector = emotion_vector({"sadness": 0.7, "not_a_label": 1.0})
+    assert vector.shape == (len(GO_EMOTIONS_LABELS),)
+    assert vector.sum() == pytest.approx(0.7)
+
+
+@pytest.mark.parametrize("emotions,expected", [
+    ({"nervousness": 0.9}, 0),
+    ({"joy": 0.9}, 1),
+    ({"sadness": 0.9}, 2),
+])
+def test_top_k_prefers_matching_items(emotions, expected):
+    """Without jitter the best emotional match ranks first"""
+    index = EmotionIndex(ITEMS)
+    ranked = index.top_k(emotions, k=3, jitter=0)
+    assert ranked[0] == expected
+    assert sorted(ranked) == [0, 1, 2]
+
+
+def test_top_k_bounds():
+    """k larger than the bucket or empty buckets are handled"""
+    assert EmotionIndex([]).top_k({"joy": 1.0}, k=3) == []
+    assert len(EmotionIndex(ITEMS).top_k({"joy": 1.0}, k=10)) == 3
+    assert len(EmotionIndex(ITEMS).top_k({"joy": 1.0}, k=2)) == 2
+
+
+def test_jitter_rotates_ties():
+    """Equal-scoring items are not always returned in the same order"""
+    index = EmotionIndex(["Plain quote"] * 20)
+    rng = np.random.default_rng(7)
+    picks = {tuple(index.top_k({"neutral": 1.0}, k=3, rng=rng)) for _ in range(20)}
+    assert len(picks) > 1
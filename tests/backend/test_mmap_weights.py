@@ -0,0 +1,63 @@
+"""
+Tests for HealWise memory-mapped safetensors loading
+Tensors must be zero-copy views into the weights file
+"""
+import json
+import os
+import struct
+import sys
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+# Follow HealWise sys.path pattern
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+backend_path = os.path.join(repo_root, 'backend')
+for path in [repo_root, backend_path]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from models.mmap_weights import load_mmap_state_dict
+
+
+def _write_safetensors(path, tensors):
+    """Minimal safetensors writer (header + raw little-endian data)"""
+    header, blobs, offset = {}, [], 0
+    for name, tensor in tensors.items():
+        data = tensor.contiguous().numpy().tobytes()
+        header[name] = {"dtype": "F32", "shape": list(tensor.shape), "data_offsets": [offset, offset + len(data)]}
+        blobs.append(data)
+        offset += len(data)
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (-len(header_bytes) % 8)
+    with open(path, "wb") as f:
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for blob in blobs:
+            f.write(blob)
+
+
+def test_load_mmap_state_dict_round_trip(tmp_path):
+    """Loaded tensors match what was written"""
+    tensors = {"layer.weight": torch.arange(12, dtype=torch.float32).view(3, 4), "layer.bias": torch.ones(4)}
+    weights = tmp_path / "model.safetensors"
+    _write_safetensors(weights, tensors)
+
+    state_dict, mapped = load_mmap_state_dict(weights)
+    assert set(state_dict) == set(tensors)
+    for name, tensor in tensors.items():
+        assert state_dict[name].shape == tensor.shape
+        assert torch.equal(state_dict[name], tensor)
+
+
+def test_mmap_tensors_assign_into_module(tmp_path):
+    """load_state_dict(assign=True) keeps the mmap-backed storage instead of copying"""
+    module = torch.nn.Linear(4, 3)
+    _write_safetensors(tmp_path / "model.safetensors", {"weight": torch.zeros(3, 4), "bias": torch.ones(3)})
+
+    state_dict, mapped = load_mmap_state_dict(tmp_path / "model.safetensors")
+    module.load_state_dict(state_dict, strict=True, assign=True)
+    assert module.weight.data_ptr() == state_dict["weight"].data_ptr()
+    with torch.no_grad():
+        assert torch.equal(module(torch.ones(1, 4)), torch.ones(1, 3))
@@ -0,0 +1,115 @@
+"""
+Tests for HealWise background model loading and /ready endpoint
+Server must answer immediately with keyword fallback while the model loads
+"""
+import pytest
+import sys
+import os
+import threading
+
+# Follow HealWise sys.path pattern
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+backend_path = os.path.join(repo_root, 'backend')
+for path in [repo_root, backend_path]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from services.model_loader import ModelLoader, READY, FAILED, LOADING
+from models.keyword_classifier import KeywordClassifier
+
+
+class FakeClassifier:
+    def __init__(self):
+        self.warmed = []
+
+    def score_probs(self, text, top_k=5):
+        return {"joy": 1.0}
+
+    def warmup(self, lengths):
+        self.warmed = list(lengths)
+        return {length: 0.0 for length in lengths}
+
+
+def test_model_loader_reaches_ready_with_timings():
+    """Loader goes loading → warming → ready and records timings"""
+    published = []
+    loader = ModelLoader(FakeClassifier, warmup_lengths=(8, 32), on_ready=published.append)
+    loader.start()
+    assert loader.wait(timeout=5)
+
+    status = loader.status()
+    assert status["status"] == READY
+    assert status["serving"] == "model"
+    for key in ["load_seconds", "warmup_seconds", "total_seconds"]:
+        assert key in status["timings"]
+    assert set(status["timings"]["warmup_by_length"]) == {"8", "32"}
+    assert loader.classifier.warmed == [8, 32]
+    assert published == [loader]
+
+
+def test_model_loader_does_not_publish_before_ready():
+    """Classifier is not exposed while the factory is still running"""
+    release = threading.Event()
+
+    def slow_factory():
+        release.wait(5)
+        return FakeClassifier()
+
+    loader = ModelLoader(slow_factory)
+    loader.start()
+    assert loader.state in (LOADING, "pending")
+    assert loader.classifier is None
+    assert loader.status()["serving"] == "keyword_fallback"
+    release.set()
+    assert loader.wait(timeout=5)
+
+
+def test_model_loader_failure_keeps_fallback():
+    """A failing factory leaves the loader in failed state without raising"""
+    def broken_factory():
+        raise RuntimeError("no weights")
+
+    loader = ModelLoader(broken_factory)
+    loader.start()
+    assert loader.wait(timeout=5) is False
+    status = loader.status()
+    assert status["status"] == FAILED
+    assert "no weights" in status["error"]
+
+
+def test_integrity_failure_after_ready_unpublishes_model():
+    """verify_integrity runs after READY (not on the cold-start path); failure falls back"""
+    class TamperedClassifier(FakeClassifier):
+        def verify_integrity(self):
+            raise ValueError("Checksum mismatch for model.safetensors")
+
+    published, failed = [], []
+    loader = ModelLoader(TamperedClassifier, on_ready=published.append, on_failed=failed.append)
+    loader.start()
+    loader._thread.join(timeout=5)
+    assert published == [loader] and failed == [loader]
+    status = loader.status()
+    assert status["status"] == FAILED and status["serving"] == "keyword_fallback"
+    assert "Checksum mismatch" in status["error"]
+    assert loader.classifier is None
+    assert "verify_seconds" in status["timings"]
+
+
+def test_keyword_classifier_probs():
+    """Keyword fallback returns go_emotions labels with valid probabilities"""
+    classifier = KeywordClassifier()
+    probs = classifier.score_probs("I feel so anxious and overwhelmed", top_k=3)
+    assert next(iter(probs)) == "nervousness"
+    assert len(probs) <= 3
+    assert all(0 <= p <= 1 for p in probs.values())
+    assert classifier.score_probs("") == {"neutral": 1.0}
+    # Whole-word matching: "made" must not count as "mad"
+    assert "anger" not in classifier.score_probs("I made dinner")
+
+
+def test_ready_endpoint_before_startup(fastapi_client):
+    """/ready reports not ready (503) while liveness stays healthy"""
+    assert fastapi_client.get("/health").status_code == 200
+    response = fastapi_client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["serving"] == "keyword_fallback"
@@ -0,0 +1,127 @@
+"""
+Tests for HealWise offline model snapshots
+Checksum verification must catch tampered or missing artifacts without needing transformers
+"""
+import json
+import os
+import sys
+
+import pytest
+
+# Follow HealWise sys.path pattern
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+backend_path = os.path.join(repo_root, 'backend')
+for path in [repo_root, backend_path]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from models.model_snapshot import (
+    MANIFEST_NAME,
+    OFFLINE_ENV,
+    ModelSnapshot,
+    SnapshotError,
+    build_manifest,
+    enforce_offline,
+    enforce_offline_if_staged,
+)
+
+
+@pytest.fixture
+def staged_snapshot(tmp_path):
+    """A snapshot directory with fake artifacts and a valid manifest"""
+    snap_dir = tmp_path / "snapshot"
+    snap_dir.mkdir()
+    (snap_dir / "config.json").write_text('{"id2label": {"0": "joy"}}')
+    (snap_dir / "model.safetensors").write_bytes(b"\x00" * 4096)
+    (snap_dir / "tokenizer.json").write_text("{}")
+    manifest = build_manifest(snap_dir, "fake/model")
+    (snap_dir / MANIFEST_NAME).write_text(json.dumps(manifest))
+    return ModelSnapshot(snap_dir, "fake/model")
+
+
+def test_verify_accepts_intact_snapshot(staged_snapshot):
+    """Intact snapshot verifies and lists every staged file"""
+    manifest = staged_snapshot.verify()
+    assert set(manifest["files"]) == {"config.json", "model.safetensors", "tokenizer.json"}
+    # Second verify with the opt-in stamp cache must still pass
+    staged_snapshot.verify(trust_mtime=True)
+
+
+def test_verify_detects_tampering(staged_snapshot, monkeypatch):
+    """Same-size content change with a preserved mtime is still caught by default"""
+    monkeypatch.delenv("HEALWISE_SNAPSHOT_TRUST_MTIME", raising=False)
+    staged_snapshot.verify()
+    weights = staged_snapshot.weights_path
+    stat = weights.stat()
+    weights.write_bytes(b"\x01" * 4096)
+    os.utime(weights, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    with pytest.raises(SnapshotError, match="Checksum mismatch"):
+        staged_snapshot.verify()
+
+
+def test_verify_trusts_stamp_only_when_opted_in(staged_snapshot, monkeypatch):
+    """HEALWISE_SNAPSHOT_TRUST_MTIME=1 skips hashing files whose size + mtime match the stamp"""
+    staged_snapshot.verify()
+    weights = staged_snapshot.weights_path
+    stat = weights.stat()
+    weights.write_bytes(b"\x01" * 4096)
+    os.utime(weights, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    monkeypatch.setenv("HEALWISE_SNAPSHOT_TRUST_MTIME", "1")
+    staged_snapshot.verify()
+    os.utime(weights, ns=(1, 1))
+    with pytest.raises(SnapshotError, match="Checksum mismatch"):
+        staged_snapshot.verify()
+
+
+def test_quick_verify_checks_sizes_without_hashing(staged_snapshot):
+    """hash_files=False (pre-load check) catches missing or resized files, not same-size edits"""
+    weights = staged_snapshot.weights_path
+    weights.write_bytes(b"\x01" * 4096)
+    staged_snapshot.verify(hash_files=False)
+    assert not (staged_snapshot.path / ".verified.json").exists()
+    weights.write_bytes(b"\x01" * 10)
+    with pytest.raises(SnapshotError, match="Size mismatch"):
+        staged_snapshot.verify(hash_files=False)
+
+
+def test_enforce_offline_if_staged(staged_snapshot, tmp_path, monkeypatch):
+    """Offline mode is set at startup only when a snapshot is staged (or required)"""
+    for key in OFFLINE_ENV:
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.delenv("HEALWISE_REQUIRE_SNAPSHOT", raising=False)
+    assert enforce_offline_if_staged(tmp_path / "none") is False
+    assert all(key not in os.environ for key in OFFLINE_ENV)
+    assert enforce_offline_if_staged(staged_snapshot.path) is True
+    assert all(os.environ[key] == value for key, value in OFFLINE_ENV.items())
+
+
+def test_verify_detects_missing_file(staged_snapshot):
+    """Missing artifacts fail verification"""
+    (staged_snapshot.path / "tokenizer.json").unlink()
+    with pytest.raises(SnapshotError, match="missing"):
+        staged_snapshot.verify()
+
+
+def test_verify_without_manifest(tmp_path):
+    """No manifest means no snapshot"""
+    snapshot = ModelSnapshot(tmp_path / "empty")
+    assert snapshot.exists() is False
+    with pytest.raises(SnapshotError):
+        snapshot.verify()
+
+
+def test_enforce_offline_sets_env(monkeypatch):
+    """Offline mode env vars are set for transformers/huggingface_hub"""
+    monkeypatch.delenv("HF_HUB_OFFLINE", raising=False)
+    monkeypatch.delenv("TRANSFORMERS_OFFLINE", raising=False)
+    enforce_offline()
+    assert os.environ["HF_HUB_OFFLINE"] == "1"
+    assert os.environ["TRANSFORMERS_OFFLINE"] == "1"
+
+
+def test_load_model_falls_back_when_mmap_loading_fails(staged_snapshot, monkeypatch, capsys):
+    """Weights the mmap path can't load (the fake snapshot's) degrade to from_pretrained"""
+    loaded = object()
+    monkeypatch.setattr(staged_snapshot, "_load_pretrained", lambda: loaded)
+    assert staged_snapshot.load_model(mmap_weights=True) is loaded
+    assert "falling back to from_pretrained" in capsys.readouterr().out
@@ -99,4 +99,49 @@ def test_pattern_analyzer_empty_input():
         assert isinstance(insights, dict)
         
     except ImportError:
-        pytest.skip("pattern_analyzer not available")
\ No newline at end of file
+        pytest.skip("pattern_analyzer not available")
+def test_conversation_state_rolling_window():
+    """Window counts add new messages and subtract evicted ones"""
+    from backend.models.pattern_analyzer import ConversationState, analyze_conversation_patterns
+
+    state = ConversationState(window_size=3)
+    analyze_conversation_patterns("It keeps happening again", state=state)
+    analyze_conversation_patterns("Things are getting worse", state=state)
+    patterns = analyze_conversation_patterns("Still worse today", state=state)
+
+    rolling = patterns["rolling"]
+    assert rolling["window_counts"] == {"concern": 3, "escalation": 2, "improvement": 0}
+    assert rolling["recurring"]["escalation"] is True
+
+    # Three neutral messages push everything out of the window
+    for _ in range(3):
+        patterns = analyze_conversation_patterns("Just a normal day at work", state=state)
+    assert patterns["rolling"]["window_counts"] == {"concern": 0, "escalation": 0, "improvement": 0}
+    assert patterns["rolling"]["messages_seen"] == 6
+
+def test_conversation_state_emotion_ewma_and_engagement():
+    """Emotion EWMA tracks the dominant emotion; shrinking replies read as falling engagement"""
+    from backend.models.pattern_analyzer import ConversationState, analyze_conversation_patterns, get_conversation_insights
+
+    state = ConversationState()
+    long_message = "I have been thinking about a lot of things lately and wanted to talk them through in detail " * 2
+    for _ in range(5):
+        analyze_conversation_patterns(long_message, state=state, emotions={"sadness": 0.8, "neutral": 0.2})
+    for _ in range(4):
+        analyze_conversation_patterns("ok", state=state, emotions={"neutral": 0.9})
+
+    assert state.engagement_trend == "falling"
+    assert set(state.emotion_ewma) == {"sadness", "neutral"}
+    insights = get_conversation_insights({}, state=state)
+    assert "declining_engagement" in insights["flags"]
+    assert "9 messages" in insights["summary"]
+
+def test_history_seeds_state_without_rescanning_per_call():
+    """Legacy callers passing history still get rolling aggregates"""
+    from backend.models.pattern_analyzer import analyze_conversation_patterns
+
+    history = ["I feel worse", {"text": "Still worse"}]
+    patterns = analyze_conversation_patterns("Getting worse again", history=history)
+    assert patterns["escalating_risk"] is True
+    assert patterns["rolling"]["window_counts"]["escalation"] == 3
+    assert patterns["rolling"]["recurring"]["escalation"] is True
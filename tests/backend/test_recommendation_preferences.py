@@ -0,0 +1,116 @@
+"""
+Tests for HealWise preference-filtered recommendations
+user_preferences compile to attribute filters evaluated over precomputed bitsets
+"""
+import json
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# Follow HealWise sys.path pattern
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+backend_path = os.path.join(repo_root, 'backend')
+for path in [repo_root, backend_path]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from services.content_attributes import AttributeBitsets, dietary_tags, preference_filters
+from services.content_loader import ContentLoader
+from services.recommendation_engine import RecommendationEngine
+
+MOVIES = [
+    {"title": "Paddington", "genre": "Adventure, Comedy, Family", "description": "Kind bear"},
+    {"title": "Soul", "genre": "Animation, Family, Drama", "description": "Purpose"},
+    {"title": "Chef", "genre": "Comedy, Drama", "description": "Food truck"},
+    {"title": "The Intouchables", "genre": "Biography, Drama", "description": "Friendship"},
+]
+EXERCISES = [
+    {"exercise": "Box Breathing", "duration": "2-5 minutes", "benefit": "Calm"},
+    {"exercise": "Yoga Flow", "duration": "20-30 minutes", "benefit": "Release tension"},
+    {"exercise": "Long Run", "duration": "60-90 minutes", "benefit": "Energy"},
+    {"exercise": "Check-in", "duration": "As needed", "benefit": "Grounding"},
+]
+NUTRITION = [
+    {"food": "Fatty Fish", "description": "Salmon or sardines", "benefit": "Omega-3", "dietary": ["dairy-free", "nut-free"]},
+    {"food": "Warm Oatmeal", "description": "Comforting bowl with honey", "benefit": "Steady energy",
+     "dietary": ["vegetarian", "nut-free"]},
+    {"food": "Dark Leafy Greens", "description": "Spinach and kale", "benefit": "Folate",
+     "dietary": ["vegan", "vegetarian", "nut-free"]},
+    {"food": "Trail Mix", "description": "Almonds and raisins", "benefit": "Snack", "dietary": ["Vegan"]},
+]
+
+
+def test_preference_filters_compile():
+    """Known keys map to per-category filters; unknown and empty ones are ignored"""
+    filters = preference_filters({
+        "exclude_genres": ["Drama", "drama"],
+        "max_exercise_minutes": "15",
+        "dietary_restrictions": [],
+        "favourite_colour": "blue",
+    })
+    assert filters == {
+        "movies": (("none", "genre", ("drama",)),),
+        "exercises": (("max", "duration_minutes", 15.0),),
+    }
+    assert preference_filters(None) == {}
+
+
+def test_dietary_tags():
+    """Only explicit tags count; conflicting ingredients veto a (mis)tagged diet"""
+    assert dietary_tags(NUTRITION[1]) == ["nut-free", "vegetarian"]
+    assert dietary_tags(NUTRITION[3]) == ["vegan"]
+    assert dietary_tags({"food": "Smoothie", "description": "Banana with almond milk"}) == []
+    assert dietary_tags({"food": "Omelette", "description": "Two eggs", "dietary": ["vegan", "vegetarian"]}) == ["vegetarian"]
+
+
+def test_untagged_items_never_match_dietary_restrictions():
+    items = NUTRITION + [{"food": "Mystery Stew", "description": "Chef's choice", "benefit": "Warmth"}]
+    mask = AttributeBitsets("nutrition", items).mask(preference_filters({"dietary_restrictions": ["nut-free"]})["nutrition"])
+    assert np.flatnonzero(mask).tolist() == [0, 1, 2]
+
+
+def test_shipped_nutrition_items_are_tagged():
+    path = os.path.join(backend_path, "data", "nutrition.json")
+    with open(path, encoding="utf-8") as f:
+        catalog = json.load(f)
+    for items in catalog.values():
+        for item in items:
+            assert isinstance(item.get("dietary"), list), f"{item['food']} has no dietary tags"
+
+
+@pytest.mark.parametrize("content_type,items,preferences,expected", [
+    ("movies", MOVIES, {"exclude_genres": ["drama"]}, [0]),
+    ("movies", MOVIES, {"genres": ["comedy"], "exclude_genres": ["family"]}, [2]),
+    ("exercises", EXERCISES, {"max_exercise_minutes": 30}, [0, 1, 3]),
+    ("exercises", EXERCISES, {"max_exercise_minutes": 1}, [3]),
+    ("nutrition", NUTRITION, {"dietary_restrictions": ["vegetarian", "nut-free"]}, [1, 2]),
+])
+def test_bitset_masks(content_type, items, preferences, expected):
+    """Bitset masks agree with a straightforward reading of the preferences"""
+    bitsets = AttributeBitsets(content_type, items)
+    mask = bitsets.mask(preference_filters(preferences)[content_type])
+    assert np.flatnonzero(mask).tolist() == expected
+    assert bitsets.mask(()) is None
+
+
+def test_engine_honours_preferences(tmp_path):
+    """Filtered categories only return matching items; others are unaffected"""
+    for filename, items in [("movies.json", MOVIES), ("exercises.json", EXERCISES), ("nutrition.json", NUTRITION)]:
+        (tmp_path / filename).write_text(json.dumps({"safe": items}), encoding="utf-8")
+    engine = RecommendationEngine(ContentLoader(tmp_path), rng=np.random.default_rng(0))
+
+    recommendations = engine.get_personalized_recommendations(
+        "SAFE", {"joy": 0.8},
+        {"exclude_genres": ["drama"], "max_exercise_minutes": 10, "dietary_restrictions": ["vegan"]},
+    )
+    assert recommendations["movies"] == ["Paddington - Kind bear"]
+    assert sorted(recommendations["exercises"]) == [
+        "Box Breathing (2-5 minutes) - Calm", "Check-in (As needed) - Grounding",
+    ]
+    assert sorted(recommendations["nutrition"]) == ["Dark Leafy Greens - Folate", "Trail Mix - Snack"]
+
+    unfiltered = engine.get_personalized_recommendations("SAFE", {"joy": 0.8})
+    assert len(unfiltered["movies"]) == 3
@@ -0,0 +1,53 @@
+"""
+Tests for background LLM risk refinement (deferred risk mode)
+"""
+import asyncio
+import threading
+
+from services.risk_refiner import RiskRefiner, is_escalation
+
+
+def test_refinement_result_and_publish():
+    published = []
+
+    async def publish(result):
+        published.append(result)
+
+    async def run():
+        refiner = RiskRefiner(lambda text, probs, provisional: "MODERATE")
+        refinement_id = await refiner.submit("text", {}, "LOW", publish)
+        result = await refiner.result(refinement_id, timeout=5)
+        await asyncio.sleep(0)
+        return refinement_id, result, refiner.stats()
+
+    refinement_id, result, stats = asyncio.run(run())
+    assert result == {"refinement_id": refinement_id, "provisional_risk": "LOW", "risk": "MODERATE", "escalated": True}
+    assert published == [result]
+    assert stats["completed"] == 1 and stats["escalations"] == 1
+
+
+def test_full_queue_drops_and_failures_keep_provisional():
+    release = threading.Event()
+
+    def slow_refine(text, probs, provisional):
+        release.wait(5)
+        raise RuntimeError("ollama down")
+
+    async def run():
+        refiner = RiskRefiner(slow_refine, max_pending=1)
+        first = await refiner.submit("a", {}, "SAFE")
+        await asyncio.sleep(0.05)  # Worker takes the first job
+        second = await refiner.submit("b", {}, "SAFE")
+        dropped = await refiner.submit("c", {}, "SAFE")
+        release.set()
+        return await refiner.result(first, timeout=5), second, dropped, refiner.stats()
+
+    result, second, dropped, stats = asyncio.run(run())
+    assert result["risk"] == "SAFE" and result["escalated"] is False
+    assert second is not None and dropped is None
+    assert stats["dropped"] == 1
+
+
+def test_is_escalation():
+    assert is_escalation("SAFE", "HIGH")
+    assert not is_escalation("LOW", "LOW")
@@ -0,0 +1,119 @@
+"""
+Tests for the HealWise session store
+Messages are appended individually and read back in bounded windows
+"""
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+# Follow HealWise sys.path pattern
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+backend_path = os.path.join(repo_root, 'backend')
+for path in [repo_root, backend_path]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from services.session_store import SessionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(tmp_path / "sessions.sqlite3")
+    yield store
+    store.close()
+
+
+def test_wal_mode(store):
+    """The database runs in WAL mode so readers don't block the writer"""
+    assert store._connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_last_messages_bounded_and_ordered(store):
+    """last_messages returns the newest n, oldest first"""
+    for i in range(10):
+        store.append("s1", "user", f"message {i}", user_id="u1", ts=1000 + i)
+    store.append("s2", "user", "other session", user_id="u1", ts=2000)
+
+    last = store.last_messages("s1", n=3)
+    assert [m["text"] for m in last] == ["message 7", "message 8", "message 9"]
+    assert store.last_messages("missing") == []
+
+
+def test_messages_for_user_time_range(store):
+    """Per-user reads span sessions and respect the time window"""
+    store.append_many([
+        {"session_id": "a", "user_id": "u1", "role": "user", "text": "early", "ts": 100},
+        {"session_id": "b", "user_id": "u1", "role": "bot", "text": "late", "ts": 300, "meta": {"risk": "LOW"}},
+        {"session_id": "b", "user_id": "u2", "role": "user", "text": "someone else", "ts": 200},
+    ])
+    messages = store.messages_for_user("u1")
+    assert [m["text"] for m in messages] == ["late", "early"]
+    assert messages[0]["meta"] == {"risk": "LOW"}
+    assert [m["text"] for m in store.messages_for_user("u1", since=200)] == ["late"]
+
+
+def test_import_conversations_json(store, tmp_path):
+    """The frontend export format imports once; re-imports skip existing sessions"""
+    export = {
+        "welcome_chat": {
+            "createdAt": "2024-01-01T10:00:00.000Z",
+            "messages": [
+                {"from": "bot", "text": "Hey there!", "timestamp": "2024-01-01T10:00:00.000Z"},
+                {"from": "user", "text": "I feel anxious", "timestamp": "2024-01-01T10:01:00.000Z"},
+                {"from": "bot", "text": "I'm here.", "timestamp": "2024-01-01T10:01:05.000Z", "risk": "LOW"},
+            ],
+        }
+    }
+    path = tmp_path / "conversations.json"
+    path.write_text(json.dumps(export), encoding="utf-8")
+
+    assert store.import_conversations_json(path, user_id="u1") == 3
+    assert store.import_conversations_json(path, user_id="u1") == 0
+    messages = store.last_messages("welcome_chat")
+    assert [m["role"] for m in messages] == ["bot", "user", "bot"]
+    assert messages[2]["meta"] == {"risk": "LOW"}
+    assert messages[1]["ts"] - messages[0]["ts"] == pytest.approx(60)
+
+
+def test_concurrent_appends(store):
+    """Threads append through their own connections without losing messages"""
+    def writer(worker):
+        for i in range(50):
+            store.append(f"s{worker}", "user", f"{worker}-{i}")
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(len(store.last_messages(f"s{w}", n=100)) == 50 for w in range(4))
+
+
+def test_import_legacy_exchange_pairs(store, tmp_path):
+    """The backend's {session: [{"user", "bot"}]} file imports as alternating turns"""
+    path = tmp_path / "conversations.json"
+    path.write_text(json.dumps({"default": [
+        {"user": "i am feeling lonely", "bot": "I'm here with you."},
+        {"user": "thanks", "bot": "Any time."},
+    ]}), encoding="utf-8")
+
+    assert store.import_conversations_json(path) == 4
+    messages = store.last_messages("default")
+    assert [(m["role"], m["text"]) for m in messages] == [
+        ("user", "i am feeling lonely"), ("bot", "I'm here with you."), ("user", "thanks"), ("bot", "Any time."),
+    ]
+
+
+def test_rescore_messages_scores_user_turns(store, monkeypatch):
+    from safety import assessor
+    from services.session_store import rescore_messages
+
+    monkeypatch.setattr(assessor, "_guarded_batch_assessment", lambda texts, probs_list: [assessor.Risk.LOW] * len(texts))
+    store.append("s1", "user", "long day", user_id="u1", ts=1.0)
+    store.append("s1", "bot", "that sounds tiring", user_id="u1", ts=2.0)
+    store.append("s1", "user", "I want to die", user_id="u1", ts=3.0)
+    rows = rescore_messages(store.messages_for_user("u1"))
+    assert [(row["ts"], row["risk"]) for row in rows] == [(3.0, "CRISIS"), (1.0, "LOW")]
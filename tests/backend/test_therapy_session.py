@@ -0,0 +1,126 @@
+"""
+Tests for the HealWise bounded therapy session cache
+LRU and memory caps bound the cache; a timer wheel expires idle sessions
+"""
+import os
+import sys
+
+# Follow HealWise sys.path pattern
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+backend_path = os.path.join(repo_root, 'backend')
+for path in [repo_root, backend_path]:
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from services.session_store import SessionStore
+from services.therapy_session import SESSION_BASE_BYTES, TherapySessionManager
+
+
+def test_hits_misses_and_resume(clock):
+    """Live sessions resume by id; unknown ids count as misses"""
+    manager = TherapySessionManager(clock=clock)
+    session = manager.get_or_create(user_id="u1")
+    assert manager.get_or_create(session.session_id, user_id="u1") is session
+    # Another user presenting the id gets a fresh session
+    assert manager.get_or_create(session.session_id, user_id="u2").session_id != session.session_id
+    assert manager.get("unknown") is None
+    stats = manager.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+
+
+def test_lru_eviction_by_count(clock):
+    """The least recently used session goes first when the count cap is hit"""
+    manager = TherapySessionManager(max_sessions=2, clock=clock)
+    a = manager.get_or_create("a")
+    manager.get_or_create("b")
+    manager.get("a")  # b is now least recently used
+    manager.get_or_create("c")
+    assert manager.get("b") is None
+    assert manager.get("a") is a
+    assert manager.stats()["evictions"]["lru"] == 1
+
+
+def test_memory_cap_evicts_and_accounts(clock):
+    """Message growth is accounted and evicts other sessions past the memory cap"""
+    manager = TherapySessionManager(max_memory_bytes=3 * SESSION_BASE_BYTES, history_limit=5, clock=clock)
+    old = manager.get_or_create("old")
+    active = manager.get_or_create("active")
+    assert manager.memory_bytes == 2 * SESSION_BASE_BYTES
+
+    for _ in range(5):
+        manager.record_message(active, "x" * 1000)
+    assert manager.get("old") is None  # Evicted to make room
+    assert manager.get("active") is active
+    assert manager.memory_bytes == active.memory_bytes <= 3 * SESSION_BASE_BYTES
+
+    # A full history replaces its oldest message, so memory stops growing
+    before = active.memory_bytes
+    manager.record_message(active, "x" * 1000)
+    assert active.memory_bytes == before
+    assert len(active.history) == 5
+    assert old.session_id not in manager._sessions
+
+
+def test_idle_ttl_expiry_via_timer_wheel(clock):
+    """Idle sessions expire after the TTL; activity pushes the deadline out"""
+    manager = TherapySessionManager(idle_ttl=10, tick_seconds=1, clock=clock)
+    idle = manager.get_or_create("idle")
+    busy = manager.get_or_create("busy")
+
+    clock.now += 6
+    manager.record_message(busy, "still here")
+    clock.now += 5
+    assert manager.expire() == 1
+    assert manager.get("idle") is None
+    assert manager.get("busy") is busy
+    assert manager.stats()["evictions"]["ttl"] == 1
+    assert manager.memory_bytes == busy.memory_bytes
+
+    # A long pause expires everything without walking more than one revolution
+    clock.now += 10_000
+    assert manager.expire() == 1
+    assert len(manager) == 0
+    assert idle.session_id not in manager._sessions
+
+
+def test_persisted_session_resumes_after_expiry(clock, tmp_path):
+    """With a store, exchanges are appended and an expired session is seeded from its user turns"""
+    store = SessionStore(tmp_path / "sessions.sqlite3")
+    manager = TherapySessionManager(idle_ttl=10, tick_seconds=1, history_limit=2, clock=clock, store=store)
+    session = manager.get_or_create("s1", user_id="u1")
+    for text in ["first", "second", "third"]:
+        manager.record_message(session, text)
+        assert manager.persist_exchange(session, text, f"reply to {text}") == 2
+    assert [(m["role"], m["text"]) for m in store.last_messages("s1", 2)] == [
+        ("user", "third"), ("bot", "reply to third")]
+
+    clock.now += 100
+    manager.expire()
+    resumed = manager.get_or_create("s1", user_id="u1")
+    assert resumed is not session
+    assert list(resumed.history) == ["second", "third"]
+    assert resumed.user_id == "u1" and resumed.messages == 2
+    assert manager.memory_bytes == resumed.memory_bytes
+    assert TherapySessionManager(clock=clock).persist_exchange(resumed, "no store", "reply") == 0
+
+
+def test_persisted_session_resumes_only_for_its_owner_with_trend_state(clock, tmp_path):
+    """Stored sessions need the owning user_id; replayed probs/risk rebuild pattern and trend state"""
+    store = SessionStore(tmp_path / "sessions.sqlite3")
+    store.append("default", "user", "imported without an owner")
+    manager = TherapySessionManager(clock=clock, store=store)
+    session = manager.get_or_create("s1", user_id="u1")
+    for sadness in [0.2, 0.5, 0.8]:
+        manager.record_message(session, "feeling low")
+        session.trend.update({"sadness": sadness}, "MODERATE")
+        manager.persist_exchange(session, "feeling low", "reply", {"probs": {"sadness": sadness}, "risk": "MODERATE"})
+    manager.remove("s1")
+
+    for session_id, user_id in [("s1", "u2"), ("s1", None), ("default", "u1"), ("default", None)]:
+        stranger = manager.get_or_create(session_id, user_id=user_id)
+        assert stranger.session_id != session_id and stranger.messages == 0
+
+    resumed = manager.get_or_create("s1", user_id="u1")
+    assert resumed.session_id == "s1" and resumed.messages == 3
+    assert resumed.trend.summary() == session.trend.summary()
+    assert resumed.patterns.messages_seen == 3
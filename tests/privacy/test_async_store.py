@@ -0,0 +1,71 @@
+"""
+Tests for async, atomic SecureStore I/O with group commit
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+from cryptography.fernet import Fernet
+from privacy.async_store import AsyncSecureStore, GroupCommitter
+from privacy.store import SecureStore
+
+
+@pytest.fixture
+def async_store():
+    store = AsyncSecureStore(SecureStore(Fernet.generate_key()), commit_window=0.01)
+    yield store
+    store.close()
+
+
+def test_concurrent_saves_share_directory_fsyncs(async_store, tmp_path):
+    async def save_all():
+        await asyncio.gather(*(async_store.save(tmp_path / f"user{i}.bin", {"user": i}) for i in range(20)))
+        return await asyncio.gather(*(async_store.load(tmp_path / f"user{i}.bin") for i in range(20)))
+
+    assert asyncio.run(save_all()) == [{"user": i} for i in range(20)]
+    stats = async_store.committer.stats()
+    assert stats["requests"] == 20
+    assert stats["syncs"] < 20
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_log_appends_are_group_committed(async_store, tmp_path):
+    log = async_store.store.open_log(tmp_path / "history.log")
+
+    async def append_all():
+        return await asyncio.gather(*(async_store.append(log, {"turn": i}) for i in range(30)))
+
+    assert sorted(asyncio.run(append_all())) == list(range(30))
+    assert async_store.committer.stats()["syncs"] < 30
+    log.close()
+
+
+def test_failed_write_leaves_previous_file_intact(tmp_path):
+    store = SecureStore(Fernet.generate_key())
+    path = tmp_path / "user.bin"
+    store.save(path, {"version": 1})
+    with pytest.raises(RuntimeError):
+        with store.open_writer(path) as writer:
+            writer.write_record({"version": 2})
+            raise RuntimeError("crash mid-write")
+    assert store.load(path) == {"version": 1}
+    assert os.listdir(tmp_path) == ["user.bin"]
+
+
+def test_group_committer_propagates_sync_errors():
+    committer = GroupCommitter(window=0)
+
+    def failing_sync():
+        raise OSError("disk gone")
+
+    try:
+        with pytest.raises(OSError):
+            committer.submit("log", failing_sync).result(timeout=5)
+    finally:
+        committer.close()
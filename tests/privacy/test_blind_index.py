@@ -0,0 +1,95 @@
+"""
+Tests for blind-index keyword search over the encrypted record log
+"""
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+from cryptography.fernet import Fernet
+from privacy.store import SecureStore
+
+TURNS = [
+    {"role": "user", "text": "I had a long day at work"},
+    {"role": "user", "text": "Sometimes I want to die, honestly"},
+    {"role": "bot", "text": "Thank you for telling me. You are not alone."},
+    {"role": "user", "text": "I don't want to talk about why I die inside"},
+    {"role": "user", "text": "Work is better this week"},
+]
+
+
+@pytest.fixture
+def log(tmp_path):
+    with SecureStore(Fernet.generate_key()).open_log(tmp_path / "history.log", searchable=True) as log:
+        log.append_many(TURNS)
+        yield log
+
+
+def test_search_words_and_phrases(log):
+    assert [record_id for record_id, _ in log.search("work")] == [0, 4]
+    assert [record_id for record_id, _ in log.search("WANT TO DIE")] == [1]
+    assert log.search("want to die")[0][1] == TURNS[1]
+    assert log.search("kill myself") == []
+
+
+def test_search_decrypts_only_matching_records(log):
+    with patch.object(type(log), "get", autospec=True, side_effect=lambda self, record_id: TURNS[record_id]) as get:
+        log.search("alone")
+    assert [call.args[1] for call in get.call_args_list] == [2]
+
+
+def test_index_holds_no_plaintext(tmp_path):
+    path = tmp_path / "history.log"
+    with SecureStore(Fernet.generate_key()).open_log(path, searchable=True) as log:
+        log.append({"text": "crisis hotline please"})
+    raw = (tmp_path / "history.log.bidx").read_bytes()
+    assert b"crisis" not in raw and b"hotline" not in raw
+
+
+def test_deleted_records_drop_out_of_search_and_index_survives_compaction(tmp_path):
+    store = SecureStore(Fernet.generate_key())
+    path = tmp_path / "history.log"
+    with store.open_log(path, searchable=True) as log:
+        log.append_many(TURNS)
+        log.delete(0)
+        assert [record_id for record_id, _ in log.search("work")] == [4]
+        log.compact()
+        assert log.blind_index.stats()["postings"] < 100
+        assert [record_id for record_id, _ in log.search("work")] == [4]
+
+    with store.open_log(path, searchable=True) as log:
+        assert [record_id for record_id, _ in log.search("better this week")] == [4]
+
+
+def test_reindexes_records_missing_from_blind_index(tmp_path):
+    store = SecureStore(Fernet.generate_key())
+    path = tmp_path / "history.log"
+    with store.open_log(path) as log:  # Written without search
+        log.append_many(TURNS)
+    with store.open_log(path, searchable=True) as log:
+        assert [record_id for record_id, _ in log.search("alone")] == [2]
+
+
+def test_reindexes_record_whose_postings_were_torn(tmp_path):
+    """A crash that cut the last record's postings at an entry boundary is repaired on open"""
+    from privacy.blind_index import ENTRY
+
+    store = SecureStore(Fernet.generate_key())
+    path = tmp_path / "history.log"
+    with store.open_log(path, searchable=True) as log:
+        log.append_many(TURNS)
+        log.sync()
+    bidx = str(path) + ".bidx"
+    os.truncate(bidx, os.path.getsize(bidx) - 8 * ENTRY.size)  # Record 4 keeps 1 of its 9 entries
+
+    with store.open_log(path, searchable=True) as log:
+        for query in ["work", "better", "this week"]:
+            assert 4 in [record_id for record_id, _ in log.search(query)]
+        postings = log.blind_index.stats()["postings"]
+    with store.open_log(path, searchable=True) as log:
+        assert log.blind_index.stats()["postings"] == postings  # Repaired once, no duplicates
@@ -0,0 +1,112 @@
+"""
+Tests for HealWise envelope encryption (per-user data keys wrapped by a master key)
+"""
+import os
+import sys
+
+import pytest
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+from cryptography.fernet import Fernet, InvalidToken
+from privacy.keys import KeyManager
+
+
+def test_per_user_keys_are_isolated_and_persisted(tmp_path):
+    master = Fernet.generate_key()
+    keyring = tmp_path / "keyring.sqlite3"
+    keys = KeyManager(master, keyring)
+    keys.store_for("alice").save(tmp_path / "alice.bin", {"mood": "ok"})
+
+    with pytest.raises(InvalidToken):
+        keys.store_for("bob").load(tmp_path / "alice.bin")
+    assert KeyManager(master, keyring).has_key("alice")
+
+    reopened = KeyManager(master, keyring)
+    assert reopened.store_for("alice").load(tmp_path / "alice.bin") == {"mood": "ok"}
+    with pytest.raises(ValueError):
+        KeyManager(Fernet.generate_key(), keyring)
+
+
+def test_cache_is_lru_bounded_with_ttl(clock, tmp_path):
+    keys = KeyManager(Fernet.generate_key(), tmp_path / "keyring.sqlite3", cache_size=2, cache_ttl=10, clock=clock)
+    alice = keys.store_for("alice")
+    assert keys.store_for("alice") is alice
+    keys.store_for("bob")
+    keys.store_for("carol")  # Evicts alice (least recently used)
+    assert keys.store_for("alice") is not alice
+    stats = keys.stats()
+    assert (stats["hits"], stats["misses"], stats["cached"]) == (1, 4, 2)
+
+    carol = keys.store_for("carol")
+    clock.now += 11
+    assert keys.store_for("carol") is not carol  # Expired, unwrapped again
+
+
+def test_rotation_rewraps_without_touching_payloads(tmp_path):
+    old_master, new_master = Fernet.generate_key(), Fernet.generate_key()
+    keyring = tmp_path / "keyring.sqlite3"
+    keys = KeyManager(old_master, keyring)
+    keys.store_for("alice").save(tmp_path / "alice.bin", {"turns": 3})
+    payload = (tmp_path / "alice.bin").read_bytes()
+
+    assert keys.rotate_master(new_master) == 1
+    assert (tmp_path / "alice.bin").read_bytes() == payload
+    with pytest.raises(ValueError):
+        KeyManager(old_master, keyring)
+    assert KeyManager(new_master, keyring).store_for("alice").load(tmp_path / "alice.bin") == {"turns": 3}
+
+
+def test_forget_shreds_user_data(tmp_path):
+    master = Fernet.generate_key()
+    keys = KeyManager(master, tmp_path / "keyring.sqlite3")
+    keys.store_for("alice").save(tmp_path / "alice.bin", {"secret": 1})
+    assert keys.forget("alice")
+    assert not keys.has_key("alice")
+    with pytest.raises(InvalidToken):
+        keys.store_for("alice").load(tmp_path / "alice.bin")
+
+
+def test_processes_sharing_a_keyring_keep_every_key(tmp_path):
+    """Two managers on one keyring (as two processes would): no user's key is lost or replaced"""
+    master = Fernet.generate_key()
+    keyring = tmp_path / "keyring.sqlite3"
+    first, second = KeyManager(master, keyring), KeyManager(master, keyring)
+    first.store_for("alice").save(tmp_path / "alice.bin", {"from": "first"})
+    second.store_for("bob").save(tmp_path / "bob.bin", {"from": "second"})
+    assert second.store_for("alice").load(tmp_path / "alice.bin") == {"from": "first"}
+
+    reopened = KeyManager(master, keyring)
+    assert reopened.store_for("bob").load(tmp_path / "bob.bin") == {"from": "second"}
+    assert reopened.stats()["users"] == 2
+
+    first.rotate_master(Fernet.generate_key())
+    with pytest.raises(ValueError):
+        second.store_for("carol")  # Stale master can't add keys after a rotation
+
+
+def test_miss_waiting_on_keyring_writer_does_not_block_cache_hits(tmp_path):
+    """Another process holding the keyring's write lock only delays the new user's miss"""
+    import sqlite3
+    import threading
+
+    keyring = tmp_path / "keyring.sqlite3"
+    keys = KeyManager(Fernet.generate_key(), keyring)
+    alice = keys.store_for("alice")
+
+    writer = sqlite3.connect(keyring, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    created = []
+    miss = threading.Thread(target=lambda: created.append(keys.store_for("bob")))
+    miss.start()
+    try:
+        miss.join(timeout=0.2)
+        assert miss.is_alive()  # Waiting for the writer
+        assert keys.store_for("alice") is alice  # Hits go through meanwhile
+    finally:
+        writer.execute("COMMIT")
+        writer.close()
+    miss.join(timeout=5)
+    assert created and keys.has_key("bob")
@@ -0,0 +1,139 @@
+"""
+Tests for the HealWise append-only encrypted record log
+"""
+import os
+import sys
+
+import pytest
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+from cryptography.fernet import Fernet, InvalidToken
+from privacy.store import SecureStore
+
+
+@pytest.fixture
+def store():
+    return SecureStore(Fernet.generate_key())
+
+
+def test_append_get_and_reopen(store, tmp_path):
+    path = tmp_path / "history.log"
+    with store.open_log(path) as log:
+        ids = [log.append({"turn": i, "text": f"message {i}"}) for i in range(50)]
+        assert ids == list(range(50))
+        assert log.get(17) == {"turn": 17, "text": "message 17"}
+
+    with store.open_log(path) as log:
+        assert len(log) == 50
+        assert log.append({"turn": 50}) == 50
+        assert [record["turn"] for _, record in log.iter_records(start=48)] == [48, 49, 50]
+
+
+def test_append_cost_does_not_depend_on_history(store, tmp_path):
+    path = tmp_path / "history.log"
+    with store.open_log(path) as log:
+        log.append_many({"turn": i} for i in range(1000))
+        before = os.path.getsize(path)
+        log.append({"turn": 1000})
+        # One frame: header + nonce + tag + the JSON payload
+        assert os.path.getsize(path) - before == 13 + 12 + 16 + len(b'{"turn": 1000}')
+
+
+def test_delete_and_compaction_reclaims_space(store, tmp_path):
+    path = tmp_path / "history.log"
+    with store.open_log(path) as log:
+        log.append_many({"turn": i, "text": "x" * 100} for i in range(100))
+        for record_id in range(0, 100, 2):
+            assert log.delete(record_id)
+        log.delete(99)
+        assert log.delete(99) is False
+        with pytest.raises(KeyError):
+            log.get(0)
+        assert log.garbage_ratio() > 0.5
+
+        size = os.path.getsize(path)
+        assert log.compact() > 0
+        assert os.path.getsize(path) < size
+        assert log.ids() == list(range(1, 99, 2))
+        assert log.get(97) == {"turn": 97, "text": "x" * 100}
+        assert log.append({"turn": 100}) == 100  # Deleted ids are never reused
+
+    with store.open_log(path) as log:
+        assert log.ids() == list(range(1, 99, 2)) + [100]
+
+
+def test_recovers_unindexed_and_torn_tail(store, tmp_path):
+    path = tmp_path / "history.log"
+    with store.open_log(path) as log:
+        log.append_many({"turn": i} for i in range(10))
+    index_path = str(path) + ".idx"
+    with open(index_path, "r+b") as f:
+        f.truncate(os.path.getsize(index_path) - 21 * 3 - 5)  # Lose 3 entries and tear one
+    with open(path, "ab") as f:
+        f.write(b"\x00\x00\x01\x00partial")
+
+    with store.open_log(path) as log:
+        assert log.ids() == list(range(10))
+        assert log.get(9) == {"turn": 9}
+        assert log.append({"turn": 10}) == 10
+        assert log.get(10) == {"turn": 10}
+
+
+def test_wrong_key_cannot_read(tmp_path):
+    path = tmp_path / "history.log"
+    with SecureStore(Fernet.generate_key()).open_log(path) as log:
+        log.append({"secret": True})
+    with SecureStore(Fernet.generate_key()).open_log(path) as log:
+        with pytest.raises(InvalidToken):
+            log.get(0)
+
+
+def test_background_compactor_runs_when_garbage_builds_up(store, tmp_path):
+    import time
+
+    with store.open_log(tmp_path / "history.log") as log:
+        log.append_many({"turn": i} for i in range(20))
+        for record_id in range(15):
+            log.delete(record_id)
+        log.start_compacting(interval=0.01)
+        deadline = time.time() + 5
+        while log.stats()["compactions"] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert log.stats()["compactions"] >= 1
+        assert log.ids() == list(range(15, 20))
+
+
+def test_short_and_failed_writes(store, tmp_path, monkeypatch):
+    import privacy.record_log as record_log
+
+    path = tmp_path / "history.log"
+    real_write = os.write
+    with store.open_log(path) as log:
+        log.append({"turn": 0})
+
+        # The kernel may take a few bytes at a time - the frame must still land whole
+        monkeypatch.setattr(record_log.os, "write", lambda fd, data: real_write(fd, bytes(data[:7])))
+        assert log.append({"turn": 1}) == 1
+        assert log.get(1) == {"turn": 1}
+
+        calls = []
+
+        def fail_midway(fd, data):
+            calls.append(len(data))
+            if len(calls) > 1:
+                raise OSError("disk full")
+            return real_write(fd, bytes(data[:5]))
+
+        size = os.path.getsize(path)
+        monkeypatch.setattr(record_log.os, "write", fail_midway)
+        with pytest.raises(OSError):
+            log.append({"turn": 2})
+        assert os.path.getsize(path) == size  # Partial frame cut off
+        monkeypatch.setattr(record_log.os, "write", real_write)
+        assert log.append({"turn": 2}) == 2
+
+    with store.open_log(path) as log:
+        assert [record["turn"] for _, record in log.iter_records()] == [0, 1, 2]
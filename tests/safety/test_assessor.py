@@ -119,4 +119,58 @@ def test_crisis_keywords_detection(crisis_phrase, sample_emotion_probs):
         assert result in [Risk.LOW, Risk.MODERATE, Risk.HIGH, Risk.CRISIS], \
             f"Expected elevated risk for '{crisis_phrase}', got {result}"
     except ImportError:
-        pytest.skip("safety.assessor not available")
\ No newline at end of file
+        pytest.skip("safety.assessor not available")
+
+def test_parse_risk_array_is_robust():
+    from safety.assessor import Risk, _parse_risk_array
+
+    assert _parse_risk_array('Here you go:\n["safe", {"risk": "HIGH"}, "unsure"]', 3) == [Risk.SAFE, Risk.HIGH, None]
+    assert _parse_risk_array("[SAFE, LOW,]", 2) == [Risk.SAFE, Risk.LOW]  # Not JSON - risk words
+    assert _parse_risk_array('["SAFE"]', 2) == [None, None]  # Can't align
+    assert _parse_risk_array("MODERATE", 1) == [None]
+
+
+def test_assess_batch_retries_only_failed_items(monkeypatch):
+    from safety import assessor
+    from safety.assessor import Risk
+    from utils.bulkhead import Bulkhead
+    from utils.circuit_breaker import CircuitBreaker
+
+    batches = []
+
+    def batched(texts, probs_list):
+        batches.append(list(texts))
+        return [Risk.MODERATE] if len(texts) == 1 else [Risk.HIGH, None, Risk.SAFE][:len(texts)]
+
+    monkeypatch.setattr(assessor, "_batched_llm_assessment", batched)
+    monkeypatch.setattr(assessor, "_llm_bulkhead", Bulkhead())
+    monkeypatch.setattr(assessor, "_ollama_breaker", CircuitBreaker())
+
+    texts = ["rough week", "I want to kill myself", "not sure how I feel", "", "fine"]
+    risks = assessor.assess_batch(texts, [{}] * len(texts), batch_size=8)
+    assert risks == [Risk.HIGH, Risk.CRISIS, Risk.MODERATE, Risk.SAFE, Risk.SAFE]
+    # Crisis and empty never reach the LLM; the uncovered item is retried alone
+    assert batches == [["rough week", "not sure how I feel", "fine"], ["not sure how I feel"]]
+
+
+def test_assess_batch_stops_calling_a_failing_llm(monkeypatch):
+    """Once a retry fails, the remaining items (and chunks) get the heuristic alone"""
+    from safety import assessor
+    from safety.assessor import Risk
+    from utils.bulkhead import Bulkhead
+    from utils.circuit_breaker import CircuitBreaker
+
+    batches = []
+
+    def hanging(texts, probs_list):
+        batches.append(len(texts))
+        return [None] * len(texts)  # What a timed-out generation yields
+
+    monkeypatch.setattr(assessor, "_batched_llm_assessment", hanging)
+    monkeypatch.setattr(assessor, "_llm_bulkhead", Bulkhead())
+    monkeypatch.setattr(assessor, "_ollama_breaker", CircuitBreaker(min_calls=100))
+
+    texts = [f"ordinary day number {i}" for i in range(20)]
+    risks = assessor.assess_batch(texts, [{}] * len(texts), batch_size=8)
+    assert risks == [Risk.SAFE] * 20
+    assert batches == [8, 1]
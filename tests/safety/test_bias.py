@@ -0,0 +1,113 @@
+"""
+Tests for HealWise person-first language rewriting
+"""
+import json
+import os
+import re
+import sys
+
+import pytest
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+from safety import bias
+from safety.bias import REPLACEMENTS, Rewriter, de_stigmatize, reload_rules
+
+
+def _sequential(text, rules):
+    """The original one-re.sub-per-rule implementation"""
+    for pattern, replacement in rules.items():
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    return text
+
+
+def test_default_rules_match_sequential_rewrite():
+    text = "My Schizophrenic cousin is an ADDICT, not a schizo; addiction is treatable."
+    assert de_stigmatize(text) == _sequential(text, REPLACEMENTS)
+    assert de_stigmatize("") == ""
+
+
+def test_inner_groups_do_not_shift_replacements():
+    rewriter = Rewriter({r"\b(w)ord\b": r"<\1>", r"(a)(b)c": "X", r"\bzed\b": "Z"})
+    assert rewriter.rewrite("word abc Word zed") == "<w> X <W> Z"
+
+
+def test_large_rule_set_in_one_pass():
+    rules = {rf"\bterm{i}\b": f"person-first {i}" for i in range(300)}
+    text = " ".join(f"term{i}" for i in range(0, 300, 7))
+    assert Rewriter(rules).rewrite(text) == _sequential(text, rules)
+
+
+@pytest.mark.parametrize("pattern", [r"\b(\w+) \1\b", r"(?P<word>\w+)-(?P=word)", r"(?P<x>crazy)"])
+def test_backreferences_and_named_groups_are_rejected(pattern):
+    with pytest.raises(ValueError, match="backreference or named group"):
+        Rewriter({r"\baddict\b": "person", pattern: "X"})
+    # An escaped backslash before a digit is not a backreference
+    assert Rewriter({r"a\\1": "X"}).rewrite("a\\1") == "X"
+
+
+def test_max_match_width_survives_a_missing_regex_parser(monkeypatch):
+    assert bias._max_match_width(r"\baddict\b") == len("addict")
+    assert bias._max_match_width(r"\bsome\w*\b") == bias.MAX_RULE_WIDTH  # Unbounded: capped
+    monkeypatch.setattr(re, "_parser", None, raising=False)  # Private API gone
+    assert bias._max_match_width(r"\baddict\b") == bias.MAX_RULE_WIDTH
+
+
+def test_reload_rules_from_file(tmp_path):
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(json.dumps({r"\balcoholic\b": "person with alcohol use disorder"}))
+    try:
+        reload_rules(str(rules_path))
+        assert de_stigmatize("an alcoholic addict") == (
+            "an person with alcohol use disorder person with a substance use disorder"
+        )
+    finally:
+        bias._rewriter = None
+    assert de_stigmatize("alcoholic") == "alcoholic"
+
+
+def test_streaming_filter_matches_whole_text_rewrite_for_any_chunking():
+    import random
+
+    from safety.bias import StreamingDeStigmatizer
+
+    text = "An addict and a schizophrenic friend; addiction vs addicts. schizo! ADDICT" * 3
+    expected = de_stigmatize(text)
+    rng = random.Random(7)
+    for _ in range(100):
+        stream = StreamingDeStigmatizer()
+        pieces, i = [], 0
+        while i < len(text):
+            size = rng.randint(1, 8)
+            pieces.append(stream.feed(text[i:i + size]))
+            i += size
+        pieces.append(stream.flush())
+        assert "".join(pieces) == expected
+
+
+def test_streaming_filter_holds_back_only_the_longest_rule():
+    from safety.bias import StreamingDeStigmatizer
+
+    stream = StreamingDeStigmatizer(Rewriter({r"\baddict\b": "person with a substance use disorder"}))
+    assert stream.holdback == len("addict") + 1
+    assert stream.feed("hello there, an addi") == "hello there, "
+    assert stream.feed("ct said") == "an person with a substance use disorder"
+    assert stream.flush() == " said"
+
+
+def test_llm_connector_streams_de_stigmatized_text():
+    from unittest.mock import MagicMock, patch
+
+    backend_dir = os.path.join(repo_root, 'backend')
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+    from models import llm_connector
+
+    lines = [json.dumps({"response": token, "done": False}).encode() for token in ["He is an ad", "dict", " today"]]
+    lines.append(json.dumps({"response": "", "done": True}).encode())
+    response = MagicMock()
+    response.__enter__.return_value.iter_lines.return_value = lines
+    with patch.object(llm_connector.requests, "post", return_value=response):
+        assert "".join(llm_connector.stream_gemma("hi")) == "He is an person with a substance use disorder today"
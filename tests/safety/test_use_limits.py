@@ -0,0 +1,82 @@
+"""
+Tests for HealWise working-session usage limits
+Per copilot-instructions.md: safety extension points must never block crisis messages
+"""
+import os
+import sys
+
+repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if repo_root not in sys.path:
+    sys.path.insert(0, repo_root)
+
+from safety.use_limits import SessionTimer, UsageLimitService
+
+
+def test_session_timer_constructs():
+    timer = SessionTimer()
+    assert timer.minutes() >= 0
+    assert timer.over_limit() is False
+
+
+def test_check_blocks_after_limit_and_resets_after_break(clock):
+    limits = UsageLimitService(max_minutes=30, break_minutes=10, clock=clock)
+
+    for _ in range(30):
+        assert limits.check("alice")["allowed"]
+        clock.now += 60
+    result = limits.check("alice")
+    assert result["allowed"] is False
+    assert result["minutes_used"] == 30.0
+    assert result["retry_after"] == 540  # Break counts from the last allowed request
+
+    # Refused requests don't extend the session; the break lifts the block
+    clock.now += 539
+    assert limits.check("alice")["allowed"] is False
+    clock.now += 1
+    assert limits.check("alice") == {"allowed": True, "minutes_used": 0.0, "retry_after": 0}
+
+
+def test_users_are_tracked_independently_and_arrays_grow(clock):
+    limits = UsageLimitService(max_minutes=1, capacity=2, clock=clock)
+    for user in range(5):
+        assert limits.check(f"user-{user}")["allowed"]
+    assert limits.stats()["capacity"] == 8
+    assert limits.stats()["tracked_users"] == 5
+
+
+def test_sweep_flags_over_limit_and_reclaims_idle_slots(clock):
+    limits = UsageLimitService(max_minutes=5, break_minutes=10, clock=clock)
+    limits.check("busy")
+    for minute in range(4):
+        clock.now += 60
+        limits.check("busy")
+        if minute == 1:
+            limits.check("idle")
+    clock.now += 60
+
+    assert limits.sweep() == ["busy"]
+    assert limits.sweep() == []  # Only newly flagged users are reported
+    assert limits.stats()["over_limit"] == 1
+
+    clock.now += 10 * 60
+    limits.sweep()
+    stats = limits.stats()
+    assert stats["tracked_users"] == 0
+    assert stats["over_limit"] == 0
+    assert limits.check("new")["allowed"]
+
+
+def test_sweeper_reports_newly_over_limit_users(clock):
+    import threading
+
+    limits = UsageLimitService(max_minutes=1, clock=clock)
+    limits.check("busy")
+    clock.now += 61
+    reported = threading.Event()
+    seen = []
+    limits.start_sweeping(0.01, on_over_limit=lambda users: seen.extend(users) or reported.set())
+    try:
+        assert reported.wait(timeout=5)
+    finally:
+        limits.stop_sweeping()
+    assert seen == ["busy"]
@@ -0,0 +1,52 @@
+"""
+Tests for the LLM bulkhead and the assessor's heuristic fallback on saturation
+"""
+import threading
+import time
+
+import pytest
+
+from utils.bulkhead import Bulkhead, BulkheadFull
+
+
+def test_bulkhead_rejects_when_queue_is_full():
+    bulkhead = Bulkhead(capacity=1, max_queue=0, max_wait=1.0)
+    bulkhead.acquire()
+    with pytest.raises(BulkheadFull):
+        bulkhead.acquire()
+    bulkhead.release()
+    assert bulkhead.call(lambda: "ok") == "ok"
+    stats = bulkhead.stats()
+    assert stats["admitted"] == 2 and stats["rejected"] == 1 and stats["active"] == 0
+
+
+def test_bulkhead_queued_caller_times_out_or_gets_the_slot():
+    bulkhead = Bulkhead(capacity=1, max_queue=1, max_wait=0.05)
+    bulkhead.acquire()
+    with pytest.raises(BulkheadFull):
+        bulkhead.acquire()
+    assert bulkhead.stats()["timed_out"] == 1
+
+    bulkhead.max_wait = 5.0
+    waited = []
+    waiter = threading.Thread(target=lambda: waited.append(bulkhead.acquire()))
+    waiter.start()
+    while bulkhead.stats()["queue_depth"] == 0:
+        time.sleep(0.001)
+    bulkhead.release()
+    waiter.join(timeout=5)
+    assert waited and waited[0] >= 0
+    assert bulkhead.stats()["wait"]["count"] == 2
+
+
+def test_saturated_llm_returns_marked_heuristic(monkeypatch):
+    from safety import assessor
+
+    def no_llm(text, probs):
+        raise AssertionError("a saturated bulkhead must not reach the LLM")
+
+    monkeypatch.setattr(assessor, "_therapeutic_llm_assessment", no_llm)
+    monkeypatch.setattr(assessor, "_llm_bulkhead", Bulkhead(capacity=0, max_queue=0))
+    risk, llm_skipped = assessor.assess_risk("I feel hopeless", {"sadness": 0.5})
+    assert risk == assessor.Risk.MODERATE and llm_skipped is True
+    assert assessor.refine_risk("fine", {}, assessor.Risk.LOW) == assessor.Risk.LOW
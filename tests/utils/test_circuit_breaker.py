@@ -0,0 +1,86 @@
+"""
+Tests for the Ollama circuit breaker and the assessor's zero-cost skip while it is open
+"""
+import subprocess
+
+import pytest
+
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+
+
+def _fail():
+    raise OSError("ollama not found")
+
+
+def _breaker(now, **kwargs):
+    return CircuitBreaker(min_calls=2, error_rate=0.5, open_seconds=30, clock=lambda: now[0], **kwargs)
+
+
+def test_errors_open_and_half_open_trial_closes():
+    now = [0.0]
+    breaker = _breaker(now)
+    for _ in range(2):
+        with pytest.raises(OSError):
+            breaker.call(_fail)
+    assert breaker.state == OPEN and breaker.is_open()
+    with pytest.raises(CircuitOpen):
+        breaker.call(lambda: "never runs")
+    assert breaker.stats()["short_circuited"] == 1
+
+    now[0] = 31.0
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+    assert breaker.stats()["transitions"] == {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1}
+
+
+def test_slow_calls_open_and_failed_trial_reopens():
+    now = [0.0]
+    breaker = _breaker(now, slow_call_seconds=1.0)
+
+    def slow():
+        now[0] += 2.0
+        return "late"
+
+    breaker.call(slow)
+    breaker.call(slow)
+    assert breaker.state == OPEN
+
+    now[0] += 31.0
+    with pytest.raises(OSError):
+        breaker.call(_fail)
+    assert breaker.state == OPEN and breaker.is_open()
+
+
+def test_probe_moves_open_circuit_to_half_open():
+    now = [0.0]
+    healthy = [False]
+    breaker = _breaker(now, probe=lambda: healthy[0])
+    for _ in range(2):
+        with pytest.raises(OSError):
+            breaker.call(_fail)
+    assert breaker.probe_once() is False and breaker.state == OPEN
+    healthy[0] = True
+    assert breaker.probe_once() is True and breaker.state == HALF_OPEN
+    assert breaker.probe_once() is None  # Only probes while open
+
+
+def test_open_circuit_skips_ollama(monkeypatch):
+    from safety import assessor
+    from utils.bulkhead import Bulkhead
+
+    calls = []
+
+    def down(*args, **kwargs):
+        calls.append(args)
+        raise FileNotFoundError("ollama")
+
+    monkeypatch.setattr(subprocess, "run", down)
+    monkeypatch.setattr(assessor, "_llm_bulkhead", Bulkhead())
+    monkeypatch.setattr(assessor, "_ollama_breaker", CircuitBreaker(min_calls=2))
+    for _ in range(2):
+        assert assessor.assess_risk("I feel hopeless", {})[1] is False  # Failed call, SAFE fallback
+    assert assessor.get_ollama_breaker().state == OPEN
+
+    risk, llm_skipped = assessor.assess_risk("I feel hopeless", {})
+    assert risk == assessor.Risk.MODERATE and llm_skipped is True
+    assert len(calls) == 2
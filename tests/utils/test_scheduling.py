@@ -0,0 +1,53 @@
+"""
+Tests for the crisis fast lane building blocks: PriorityExecutor and LatencyTracker
+"""
+import threading
+
+from utils.metrics import LatencyTracker, percentile
+from utils.scheduling import CRISIS, STANDARD, PriorityExecutor
+
+
+def test_crisis_work_jumps_the_queue():
+    executor = PriorityExecutor(max_workers=1)
+    started, gate = threading.Event(), threading.Event()
+    order = []
+    try:
+        blocker = executor.submit(lambda: started.set() or gate.wait())
+        assert started.wait(timeout=5)
+        futures = [executor.submit(order.append, f"standard-{i}") for i in range(3)]
+        futures.append(executor.submit(order.append, "crisis", priority=CRISIS))
+        assert executor.queued() == 4
+        gate.set()
+        for future in [blocker] + futures:
+            future.result(timeout=5)
+        assert order == ["crisis", "standard-0", "standard-1", "standard-2"]
+        assert executor.stats()["submitted"] == {CRISIS: 1, STANDARD: 4}
+    finally:
+        executor.shutdown()
+
+
+def test_executor_propagates_exceptions():
+    executor = PriorityExecutor(max_workers=1)
+    try:
+        future = executor.submit(lambda: 1 / 0)
+        try:
+            future.result(timeout=5)
+            assert False, "expected ZeroDivisionError"
+        except ZeroDivisionError:
+            pass
+    finally:
+        executor.shutdown()
+
+
+def test_latency_tracker_percentiles_and_slo():
+    tracker = LatencyTracker(window=100, slo_ms={"crisis": 50})
+    for ms in range(1, 101):
+        tracker.record("crisis", ms / 1000)
+    summary = tracker.summary("crisis")
+    assert summary["count"] == 100
+    assert round(summary["p50_ms"]) == 50 and round(summary["p99_ms"]) == 99
+    assert summary["slo_met"] is False
+
+    tracker.record("standard", 0.2)
+    assert "slo_met" not in tracker.snapshot()["standard"]
+    assert percentile([], 99) is None
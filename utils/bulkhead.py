@@ -0,0 +1,104 @@
+"""
+Bulkhead for HealWise's LLM calls
+Ollama on one box serves only a generation or two at a time. Bulkhead admits that
+many callers, lets a short queue wait up to max_wait for a slot and rejects the
+rest at once with BulkheadFull, so a burst degrades to the heuristic instead of
+piling up behind the model until every request times out.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from utils.metrics import LatencyTracker
+
+
+class BulkheadFull(Exception):
+    """No slot: the queue is full or the wait exceeded max_wait"""
+
+
+class Bulkhead:
+    def __init__(self, capacity: int = 1, max_queue: int = 4, max_wait: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            capacity: Concurrent calls (the backend's real parallelism)
+            max_queue: Callers allowed to wait for a slot
+            max_wait: Seconds a queued caller waits before giving up
+            clock: Monotonic time source
+        """
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.clock = clock
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._active = 0
+        self._waiting = 0
+        self._condition = threading.Condition()
+        self._waits = LatencyTracker()
+
+    @classmethod
+    def from_env(cls) -> "Bulkhead":
+        return cls(
+            capacity=int(os.environ.get("HEALWISE_LLM_CONCURRENCY", "1")),
+            max_queue=int(os.environ.get("HEALWISE_LLM_MAX_QUEUE", "4")),
+            max_wait=float(os.environ.get("HEALWISE_LLM_MAX_WAIT_SECONDS", "2")),
+        )
+
+    def acquire(self) -> float:
+        """Take a slot; returns the seconds waited, raises BulkheadFull"""
+        with self._condition:
+            if self._active < self.capacity and not self._waiting:
+                self._admit(0.0)
+                return 0.0
+            if self._waiting >= self.max_queue:
+                self.rejected += 1
+                raise BulkheadFull(f"LLM queue full ({self._waiting} waiting)")
+            started = self.clock()
+            deadline = started + self.max_wait
+            self._waiting += 1
+            try:
+                while self._active >= self.capacity:
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        self.timed_out += 1
+                        raise BulkheadFull(f"no LLM slot within {self.max_wait}s")
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting -= 1
+            waited = self.clock() - started
+            self._admit(waited)
+            return waited
+
+    def _admit(self, waited: float):
+        self._active += 1
+        self.admitted += 1
+        self._waits.record("wait", waited)
+
+    def release(self):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify()
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        self.acquire()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.release()
+
+    def stats(self) -> Dict:
+        with self._condition:
+            active, waiting = self._active, self._waiting
+        return {
+            "capacity": self.capacity,
+            "active": active,
+            "queue_depth": waiting,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "wait": self._waits.summary("wait"),
+        }
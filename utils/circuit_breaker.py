@@ -0,0 +1,173 @@
+"""
+Circuit breaker for HealWise's Ollama dependency
+CLOSED: calls go through and their outcomes fill a sliding window; too many errors
+or slow calls in it open the circuit.
+OPEN: calls are refused at once (CircuitOpen) - no process spawn, no timeout.
+After open_seconds, or as soon as the prober's health check succeeds, the circuit
+goes HALF_OPEN.
+HALF_OPEN: one trial call at a time; success closes the circuit, failure reopens it.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """The circuit is open (or its half-open trial is taken): skip the dependency"""
+
+
+class CircuitBreaker:
+    def __init__(self, window: int = 20, min_calls: int = 5, error_rate: float = 0.5,
+                 slow_call_seconds: float = 10.0, slow_rate: float = 0.5, open_seconds: float = 30.0,
+                 probe: Optional[Callable[[], bool]] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            window: Recent calls the rates are computed over
+            min_calls: Calls needed in the window before it can open the circuit
+            error_rate: Failure fraction that opens the circuit
+            slow_call_seconds: Calls at least this long count as slow
+            slow_rate: Slow-call fraction that opens the circuit
+            open_seconds: Time open before a real call may try again (half-open)
+            probe: Cheap health check run by the prober while open
+            clock: Monotonic time source
+        """
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.probe = probe
+        self.clock = clock
+        self.state = CLOSED
+        self.transitions: Dict[str, int] = {}
+        self.short_circuited = 0
+        self.probes = 0
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)  # (failed, slow)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, probe: Optional[Callable[[], bool]] = None) -> "CircuitBreaker":
+        return cls(
+            error_rate=float(os.environ.get("HEALWISE_LLM_BREAKER_ERROR_RATE", "0.5")),
+            slow_call_seconds=float(os.environ.get("HEALWISE_LLM_BREAKER_SLOW_SECONDS", "10")),
+            open_seconds=float(os.environ.get("HEALWISE_LLM_BREAKER_OPEN_SECONDS", "30")),
+            probe=probe,
+        )
+
+    def _transition(self, state: str):
+        """Caller holds the lock"""
+        key = f"{self.state}->{state}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        self.state = state
+        if state == OPEN:
+            self._opened_at = self.clock()
+        elif state == CLOSED:
+            self._outcomes.clear()
+        self._trial_in_flight = False
+
+    def is_open(self) -> bool:
+        """True while calls would be refused; no state change, safe as a pre-check"""
+        with self._lock:
+            if self.state == OPEN:
+                return self.clock() - self._opened_at < self.open_seconds
+            return self.state == HALF_OPEN and self._trial_in_flight
+
+    def _admit(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record(self, failed: bool, elapsed: float):
+        slow = elapsed >= self.slow_call_seconds
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN if failed or slow else CLOSED)
+                return
+            if self.state != CLOSED:
+                return  # A call admitted before the circuit opened
+            self._outcomes.append((failed, slow))
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for failed_call, _ in self._outcomes if failed_call)
+            slow_calls = sum(1 for _, slow_call in self._outcomes if slow_call)
+            if failures / calls >= self.error_rate or slow_calls / calls >= self.slow_rate:
+                self._transition(OPEN)
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """fn(*args, **kwargs) through the breaker; raises CircuitOpen when refused"""
+        if not self._admit():
+            raise CircuitOpen(f"circuit {self.state}")
+        started = self.clock()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record(True, self.clock() - started)
+            raise
+        self.record(False, self.clock() - started)
+        return result
+
+    def probe_once(self) -> Optional[bool]:
+        """Run the health check if the circuit is open; success moves it to half-open"""
+        if self.probe is None or self.state != OPEN:
+            return None
+        self.probes += 1
+        try:
+            healthy = bool(self.probe())
+        except Exception:
+            healthy = False
+        with self._lock:
+            if self.state == OPEN:
+                if healthy:
+                    self._transition(HALF_OPEN)
+                else:
+                    self._opened_at = self.clock()  # Still down - wait a full open period again
+        return healthy
+
+    def start_probing(self, interval: float = 5.0):
+        if self._thread is not None or self.probe is None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.probe_once()
+
+        self._thread = threading.Thread(target=loop, name="healwise-breaker-probe", daemon=True)
+        self._thread.start()
+
+    def stop_probing(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = sum(1 for failed, _ in self._outcomes if failed)
+            return {
+                "state": self.state,
+                "window_calls": calls,
+                "window_error_rate": failures / calls if calls else 0.0,
+                "short_circuited": self.short_circuited,
+                "probes": self.probes,
+                "transitions": dict(self.transitions),
+            }
@@ -16,10 +16,20 @@ RESPONSES = {
         "It sounds like things feel really heavy. You're not alone—I’m here with you.",
         "That sadness must be hard to carry. I want you to know your feelings are valid."
     ],
-    "neutral": [
+    "supportive": [
+        "That sounds really frustrating. It makes sense to feel this way, and I'm here to listen.",
+        "Thank you for telling me what's going on. Whatever you're feeling is valid.",
+        "It sounds like a lot is weighing on you right now. Let's take it one step at a time."
+    ],
+    "positive": [
     "I’m glad to hear that. It's important to notice the good moments.",
     "That’s great—thanks for sharing something positive with me.",
     "I can sense you’re in a lighter mood. That’s wonderful!"
+    ],
+    "neutral": [
+        "Thanks for sharing that with me. I'm here whenever you want to talk it through.",
+        "I'm listening. Tell me more about how things are going for you.",
+        "Thank you for checking in. How are you feeling about it all?"
     ]
 
 }
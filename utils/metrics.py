@@ -0,0 +1,64 @@
+"""
+Lightweight in-process metrics for HealWise
+LatencyTracker keeps the most recent samples per lane in a fixed ring, so
+percentiles reflect current behaviour and memory stays bounded. Served by
+GET /metrics alongside the other services' stats.
+"""
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+DEFAULT_WINDOW = 2048
+
+
+def percentile(sorted_values, q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return None
+    rank = math.ceil(q / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+class LatencyTracker:
+    def __init__(self, window: int = DEFAULT_WINDOW, slo_ms: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            window: Samples kept per lane
+            slo_ms: Lane -> p99 target in milliseconds (e.g. {"crisis": 500})
+        """
+        self.window = window
+        self.slo_ms = dict(slo_ms or {})
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, lane: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(lane)
+            if samples is None:
+                samples = self._samples[lane] = deque(maxlen=self.window)
+            samples.append(seconds * 1000)
+            self._counts[lane] = self._counts.get(lane, 0) + 1
+
+    def summary(self, lane: str) -> Dict:
+        with self._lock:
+            samples = sorted(self._samples.get(lane, ()))
+            count = self._counts.get(lane, 0)
+        p99 = percentile(samples, 99)
+        summary = {
+            "count": count,
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "p99_ms": p99,
+            "max_ms": samples[-1] if samples else None,
+        }
+        if lane in self.slo_ms:
+            summary["slo_p99_ms"] = self.slo_ms[lane]
+            summary["slo_met"] = None if p99 is None else p99 <= self.slo_ms[lane]
+        return summary
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            lanes = list(self._samples)
+        return {lane: self.summary(lane) for lane in lanes}
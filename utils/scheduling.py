@@ -0,0 +1,78 @@
+"""
+Priority scheduling for HealWise inference and LLM work
+PriorityExecutor is a thread pool whose queue is a heap: crisis work queued
+behind a backlog of ordinary requests starts as soon as a worker frees up.
+Equal priorities run first-in, first-out.
+"""
+import asyncio
+import concurrent.futures
+import heapq
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+CRISIS = 0    # Crisis fast lane - always dequeued first
+STANDARD = 1  # Everything else
+
+
+class PriorityExecutor:
+    def __init__(self, max_workers: int = 2, name: str = "healwise-priority"):
+        """
+        Args:
+            max_workers: Worker threads (size to the backend's real parallelism)
+            name: Thread name prefix
+        """
+        self._heap: List[Tuple[int, int, concurrent.futures.Future, Callable, tuple, dict]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self.submitted = {CRISIS: 0, STANDARD: 0}
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True) for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable, *args, priority: int = STANDARD, **kwargs) -> concurrent.futures.Future:
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("PriorityExecutor is shut down")
+            heapq.heappush(self._heap, (priority, next(self._sequence), future, fn, args, kwargs))
+            self.submitted[priority] = self.submitted.get(priority, 0) + 1
+            self._condition.notify()
+        return future
+
+    async def run(self, fn: Callable, *args, priority: int = STANDARD, **kwargs) -> Any:
+        """Await fn(*args, **kwargs) on the pool"""
+        return await asyncio.wrap_future(self.submit(fn, *args, priority=priority, **kwargs))
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._heap and not self._shutdown:
+                    self._condition.wait()
+                if not self._heap:
+                    return
+                _, _, future, fn, args, kwargs = heapq.heappop(self._heap)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def queued(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+    def stats(self) -> Dict:
+        return {"queued": self.queued(), "workers": len(self._threads), "submitted": dict(self.submitted)}
+
+    def shutdown(self, wait: bool = True):
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join(timeout=5)